@@ -2,26 +2,73 @@
 # Import libraries and functions
 # ##########################################################################################################################
 
-import copy
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import re
+import numpy as np
 import os
-import tkinter as tk
-from tkinter import filedialog
-import io
+import time
+from contextlib import contextmanager
 
 from Functions import *
+from Cache import ResultCache
+from Diagnostics import StageTimer, time_stage
+from Validation import validate_table
+from Batch import machine_columns, operating_columns
+from Sweep import sweep_quantities, sweep_operating_values, get_quantity_limit
 
 # ##########################################################################################################################
 # Define relevant functions
 # ##########################################################################################################################
 
+# Result cache shared by all sessions (optional disk tier in the directory of the environment variable ASM_CACHE_DIR)
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    '''Cache of calculate_operating_values() results: A repeated input returns the stored results and PNG without recalculation'''
+    return ResultCache(disk_dir=os.environ.get("ASM_CACHE_DIR"))
+
+# Size of the calculation results stored in the session
+def get_session_result_bytes() -> int:
+    '''Bytes of the calculation text, PNG and result tables stored in st.session_state'''
+    size = 0
+    for key in ["calc_print", "calc_print_save", "calc_plot", "change_percent", "result_values", "result_values_rotor", "sweep_plot"]:
+        value = st.session_state.get(key)
+        if isinstance(value, (bytes, str)):
+            size += len(value)
+        elif isinstance(value, pd.DataFrame):
+            size += int(value.memory_usage(deep=True).sum())
+    return size
+
+# Keep the session below the memory limit
+def limit_session_memory(max_bytes: int):
+    '''Drop the downloads (plot, calculation text), if the results of the session exceed max_bytes'''
+    if get_session_result_bytes() > max_bytes:
+        st.session_state.calc_plot = None
+        st.session_state.calc_print_save = None
+        st.session_state.error_print += '\n\n:red[' + 'Plot and download not stored: session memory limit exceeded' + ']'
+
+# Measure the rerun latency of a page section
+@contextmanager
+def time_rerun(section: str):
+    '''Store the wall time [ms] of the last run of a section (full app or fragment) in st.session_state.rerun_latency'''
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        st.session_state.rerun_latency[section] = (time.perf_counter() - start) * 1000
+
+# Input table with the edits of its st.data_editor
+def get_edited_table(values_key: str, editor_key: str) -> pd.DataFrame:
+    '''Apply the edited cells of the data editor (widget state "edited_rows") to the table in st.session_state. Also valid in callbacks of other fragments'''
+    df = st.session_state[values_key].copy()
+    for row, changes in st.session_state.get(editor_key, {}).get("edited_rows", {}).items():
+        for column, value in changes.items():
+            df.loc[int(row), column] = value
+    return df
+
 # Copy initial values to operating values
-def copy_values(edited_initial_values: pd.DataFrame):
+def copy_values():
     '''Copy initial values (left streamlit input table) to operating values (middle streamlit input table)'''
-    st.session_state.initial_values = edited_initial_values.copy()
+    st.session_state.initial_values = get_edited_table("initial_values", "initial values")
     st.session_state.operating_values['Value'] = st.session_state.operating_values['Name'].map(
         st.session_state.initial_values.set_index('Name')['Value']
     )
@@ -30,74 +77,63 @@ def copy_values(edited_initial_values: pd.DataFrame):
 def format_df_numeric(df: pd.DataFrame, error_txt_ini: str) -> tuple[pd.DataFrame, str,]:
     ''' 
     Format Input Dataframe, depending on the row: positive numeric, string\n
-    Check if the input values are plausible (e.g. cos_phi can not be >1)\n
+    Check if the input values are plausible (e.g. cos_phi can not be >1), rules: Validation.input_rules\n
     Set all wrong values to <None>
     '''
-    error_txt = error_txt_ini
-    for index, row in df.iterrows():
-        # Convert Table Input to the correct format: Numeric for all appart from Connection Y/D). All wrong values are converted to <None>
-        if df.loc[index, 'Name'] == 'Connection Y/D':
-            if df.loc[index, 'Value'].upper() != 'Y' and df.loc[index, 'Value'].upper() != 'D':
-                df.loc[index, 'Value'] = None
-            else:
-                df.loc[index, 'Value'] = df.loc[index, 'Value'].upper()
-        elif df.loc[index, 'Value'] == '':
-            df.loc[index, 'Value'] = None
-        else:
-            # Convert to numeric value
-            val_num = extract_numeric(df.loc[index, 'Value'])
-            if val_num is not None:
-                df.loc[index, 'Value'] = abs(val_num) # Make absolute, since no negative values make sense
-
-        # Check if freq is in the correct range (a pole extraction is possible)
-        if df.loc[index, 'Name'] == "Nominal Speed [RPM]" and df.loc[index, 'Value'] is not None:
-            try:
-                get_n_synchrone(n=df.loc[index, 'Value'], freq=df[df["Name"] == "Freq [Hz]"].iloc[0]["Value"] )
-            except:
-                df.loc[index, 'Value'] = None
-        
-        # Check if eta is in the correct range [1 - 100]
-        if df.loc[index, 'Name'] == "η [%]" and df.loc[index, 'Value'] is not None:
-            if df.loc[index, 'Value'] == '' or df.loc[index, 'Value'] < 1 or df.loc[index, 'Value'] >= 100: # eta < 100 and eta > 1
-                df.loc[index, 'Value'] = None
-
-        # Check if cos_phi is in correct range [0.1 - 0.99]
-        if df.loc[index, 'Name'] == "cos(φ)" and df.loc[index, 'Value'] is not None:
-            if df.loc[index, 'Value'] == '' or df.loc[index, 'Value'] < 0.1 or df.loc[index, 'Value'] >= 0.99: # cos_phi < 1 and cos_phi > 0.1
-                df.loc[index, 'Value'] = None
-
-        # Update error text, if any values where wrong (<None>)
-        if df.loc[index, 'Value'] == None:
-            error_txt += df.loc[index, 'Name'] + ', '
+    validated_df, wrong_names = validate_table(df)
+    df['Value'] = validated_df['Value']
+    error_txt = error_txt_ini + ''.join(name + ', ' for name in wrong_names)
     return df, error_txt
 
+# Format a value for print
+def format_value(value, value_format: str) -> str:
+    '''Format of values_format: "X"=X_Decimals, '0'=Int, "txt"=Text. Empty/wrong values (None) as '' '''
+    if value is None or value == '':
+        return ''
+    elif value_format == 'txt':
+        return value.upper()
+    elif value_format in ['0']:
+        return str(int(round(value)))
+    elif value_format in ['1', '2', '3', '4', '5', '6', '7', '8', '9']:
+        return str(round(value, ndigits=int(value_format)))
+    raise ValueError(f"Error: function: format_value() --> Wrong format: {value_format} | Value: {value}")
+
 # Calculate Bottom
-def calculate_btm(edited_initial_values, edited_operating_values, values_format, rotor_voltage, change_connection_rotor):
-    '''Button logic for triggering the calculation'''
+def calculate_btm(values_format):
+    '''Button logic for triggering the calculation (inputs: edited tables and slip ring values of the input fragments in st.session_state)'''
     # Create editable variables
-    initial_df = edited_initial_values.copy()
-    operating_df = edited_operating_values.copy()
+    initial_df = get_edited_table("initial_values", "initial values")
+    operating_df = get_edited_table("operating_values", "operating values")
     result_df = initial_df.copy()
+    rotor_voltage = st.session_state.initial_voltage_rotor
+    change_connection_rotor = st.session_state.change_connection_rotor
 
     # Initialize the Error text to be empty
     st.session_state.error_print = ""
+
+    # Record the time of the stages (shown in the expander "Diagnostics")
+    timer = StageTimer(profile=st.session_state.get("diagnostics_profile", False))
+    derived_stats_before = get_derived_cache_stats() # Counters of this thread: other sessions run in their own threads
     
     # Iterate over the input data and convert it to the correct format
     tables_txt = ['Machine', 'Operating']
     make_calculation = True
-    for idx, df in enumerate([initial_df, operating_df]):
-        error_txt_ini=f'Wrong {tables_txt[idx]} Inputs: '
-        df, error_txt = format_df_numeric(df, error_txt_ini)
-        
-        # If error exists: Update error message and don't apply calculation
-        if error_txt != error_txt_ini:
-            st.session_state.error_print += '\n\n:red[' + error_txt[:-2] + ']' # In red color, with line brake and without the last ', '
-            make_calculation = False
+    with time_stage(timer, "validation"):
+        for idx, df in enumerate([initial_df, operating_df]):
+            error_txt_ini=f'Wrong {tables_txt[idx]} Inputs: '
+            df, error_txt = format_df_numeric(df, error_txt_ini)
+            
+            # If error exists: Update error message and don't apply calculation
+            if error_txt != error_txt_ini:
+                st.session_state.error_print += '\n\n:red[' + error_txt[:-2] + ']' # In red color, with line brake and without the last ', '
+                make_calculation = False
 
     # Calculate Results - Only of no input errors
     if make_calculation:
-        # Calculate results
-        result_df, result_rotor_df, calc_str_save, calc_str_print, plt_fig, change_percent = calculate_operating_values(
+        # Calculate results (or get them from the cache)
+        result_df, result_rotor_df, calc_str_save, calc_str_print, plt_png, change_percent = get_result_cache().calculate_operating_values(
+            timer = timer,
+
             # Initial machine values
             Pn = initial_df.loc[0, "Value"],
             Un = initial_df.loc[1, "Value"],
@@ -139,18 +175,10 @@ def calculate_btm(edited_initial_values, edited_operating_values, values_format,
         change_percent = None
 
     # Iterate over table dataframes, format them correctly for print
-    for df in [initial_df, operating_df, result_df]:
-        for idx_p, val_p in df.iterrows():
-            if df.loc[idx_p, 'Value'] == None or df.loc[idx_p, 'Value'] == '':
-                df.loc[idx_p, 'Value'] = ''
-            elif values_format[idx_p] == 'txt': # df.loc[idx_p, 'Format']
-                df.loc[idx_p, 'Value'] = df.loc[idx_p, 'Value'].upper()
-            elif values_format[idx_p] in ['0']:
-                df.loc[idx_p, 'Value'] = str(int(round(df.loc[idx_p, 'Value'])))
-            elif values_format[idx_p] in ['1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                df.loc[idx_p, 'Value'] = str(round(df.loc[idx_p, 'Value'], ndigits=int(values_format[idx_p])))
-            else:
-                raise ValueError(f"Error: function: calculate_btm() --> Wrong format: {values_format[idx_p]} | Row: {val_p}")
+    with time_stage(timer, "table formatting"):
+        for df in [initial_df, operating_df, result_df]:
+            for idx_p in df.index:
+                df.loc[idx_p, 'Value'] = format_value(df.loc[idx_p, 'Value'], values_format[idx_p])
 
     # Save the input data in the corresponding table
     st.session_state.initial_values = initial_df.astype(str).copy()
@@ -159,9 +187,59 @@ def calculate_btm(edited_initial_values, edited_operating_values, values_format,
     if make_calculation:
         st.session_state.calc_print = calc_str_print
         st.session_state.calc_print_save = calc_str_save
-        st.session_state.calc_plot = plt_fig
+        st.session_state.calc_plot = plt_png
         st.session_state.change_percent = change_percent
         st.session_state.result_values_rotor = result_rotor_df
+        limit_session_memory(max_session_bytes)
+    st.session_state.diagnostics = timer.summary()
+    st.session_state.diagnostics_profile_text = timer.get_profile_text()
+    derived_stats = get_derived_cache_stats()
+    st.session_state.diagnostics_derived = {key: derived_stats[key] - derived_stats_before[key] for key in ["hits", "misses", "invalidations"]}
+
+# Sweep Bottom
+def sweep_btm(ranges, no_points, no_panels, quantity_label, limit):
+    '''Button logic of the operating sweep: Evaluate the quantity over Un x Freq x Pn (in % of the operating values) and store the heatmaps as PNG'''
+    st.session_state.sweep_error = ""
+    st.session_state.sweep_plot = None
+    initial_df, wrong_machine = validate_table(get_edited_table("initial_values", "initial values"))
+    operating_df, wrong_operating = validate_table(get_edited_table("operating_values", "operating values"))
+    if len(wrong_machine) > 0 or len(wrong_operating) > 0:
+        st.session_state.sweep_error = "Sweep not conducted: Wrong inputs (" + ', '.join(wrong_machine + wrong_operating) + ")"
+        return
+
+    machine = {machine_columns[name]: value for name, value in zip(initial_df['Name'], initial_df['Value'])}
+    operating = {operating_columns[name]: value for name, value in zip(operating_df['Name'], operating_df['Value'])}
+    axes = {
+        "Un_op": operating["Un_op"] * np.linspace(ranges["Un_op"][0], ranges["Un_op"][1], no_points) / 100,
+        "Freq_op": operating["Freq_op"] * np.linspace(ranges["Freq_op"][0], ranges["Freq_op"][1], no_points) / 100,
+        "Pn_op": operating["Pn_op"] * np.linspace(ranges["Pn_op"][0], ranges["Pn_op"][1], no_panels) / 100,
+    }
+    quantity = sweep_quantity_labels[quantity_label]
+    results = sweep_operating_values(machine, axes, {arg: value for arg, value in operating.items() if arg not in axes})
+    if limit is None:
+        limit = get_quantity_limit(machine, quantity)
+    st.session_state.sweep_plot = fig_to_png(plot_sweep_heatmaps(axes, results[quantity], quantity_label, limit), dpi=100)
+
+# Inputs of the what-if mode
+def get_what_if_inputs() -> tuple[MotorAsm | None, dict, list[str]]:
+    '''
+    Validated inputs of the edited tables and the slip ring: initial machine (None if wrong inputs), operating values (run_operating_stages() arguments), names of the wrong values
+
+    Kept in st.session_state while the inputs are unchanged: A slider tick neither validates the tables nor samples the curves of the initial machine again
+    '''
+    initial_df = get_edited_table("initial_values", "initial values")
+    operating_df = get_edited_table("operating_values", "operating values")
+    key = (tuple(initial_df['Value']), tuple(operating_df['Value']), st.session_state.initial_voltage_rotor)
+    if st.session_state.get("what_if_inputs", (None,))[0] != key:
+        initial_df, wrong_machine = validate_table(initial_df)
+        operating_df, wrong_operating = validate_table(operating_df)
+        operating = {operating_columns[name]: value for name, value in zip(operating_df['Name'], operating_df['Value'])}
+        motor = None
+        if len(wrong_machine) == 0 and len(wrong_operating) == 0:
+            machine = {machine_columns[name]: value for name, value in zip(initial_df['Name'], initial_df['Value'])}
+            motor = MotorAsm(**machine, rotorVoltage=st.session_state.initial_voltage_rotor, motor_label='Machine', trace=False)
+        st.session_state.what_if_inputs = (key, motor, operating, wrong_machine + wrong_operating)
+    return st.session_state.what_if_inputs[1:]
 
 
 # ##########################################################################################################################
@@ -186,7 +264,7 @@ values_format = ["1", '0', '0', '0', '0', "txt", '0', "1", '0', '0', '2', "2", "
 
 # Define Variables for Slip Ring
 if "initial_voltage_rotor" not in st.session_state:
-    st.session_state.initial_voltage_rotor = None
+    st.session_state.initial_voltage_rotor = 0
 if "change_connection_rotor" not in st.session_state:
     st.session_state.change_connection_rotor = 'Do not change'
 if "result_values_rotor" not in st.session_state:
@@ -195,6 +273,34 @@ if "result_values_rotor" not in st.session_state:
         "Value": ["", "", ""]
     })
 
+# Upper limit of the results stored per session [bytes] (only the PNG bytes of the plot are stored, no figure)
+max_session_bytes = 4 * 1024**2
+
+# Operating sweep: label of the quantity --> name in sweep_operating_values()
+sweep_quantity_labels = {name if name.endswith(']') else f'Change {name} [%]': name for name in sweep_quantities}
+if "sweep_plot" not in st.session_state: # PNG bytes of the sweep heatmaps
+    st.session_state.sweep_plot = None
+if "sweep_error" not in st.session_state:
+    st.session_state.sweep_error = ""
+
+# What-if mode: Vega-Lite chart of the starting curves (long format of start_curves_to_frame(), drawn by the browser)
+what_if_chart_spec = {
+    "mark": {"type": "line"},
+    "encoding": {
+        "x": {"field": "n [RPM]", "type": "quantitative"},
+        "y": {"field": "Value [%]", "type": "quantitative", "title": "M, I [% of Machine]"},
+        "color": {"field": "Curve", "type": "nominal"},
+    },
+}
+
+# Stage timing of the last calculation (Diagnostics.StageTimer.summary()) and optional cProfile table
+if "diagnostics" not in st.session_state:
+    st.session_state.diagnostics = []
+if "diagnostics_profile_text" not in st.session_state:
+    st.session_state.diagnostics_profile_text = None
+if "diagnostics_derived" not in st.session_state:
+    st.session_state.diagnostics_derived = None
+
 # Define static variables
 if "error_print" not in st.session_state: # Define String for errors
     st.session_state.error_print = ""
@@ -202,7 +308,7 @@ if "calc_print" not in st.session_state: # Define String for calculation text
     st.session_state.calc_print = ""
 if "calc_print_save" not in st.session_state: # Define String for calculation text
     st.session_state.calc_print_save = ""
-if "calc_plot" not in st.session_state: # # Define figure for plot
+if "calc_plot" not in st.session_state: # # Define PNG bytes of the plot
     st.session_state.calc_plot = None
 if "change_percent" not in st.session_state: # Define Dataframe for storing Percential Change of the values by calculation
     st.session_state.change_percent = pd.DataFrame({
@@ -210,38 +316,28 @@ if "change_percent" not in st.session_state: # Define Dataframe for storing Perc
         "Change": [None, None, None, None, None, None],
     })
 
-# Cyclical variables Variables
-initial_values = st.session_state.initial_values.copy()
-operating_values = st.session_state.operating_values.copy()
-result_values = st.session_state.result_values.copy()
-change_percent = st.session_state.change_percent.copy()
-result_values_rotor = st.session_state.result_values_rotor.copy()
-
-# Define containers
-header_container = st.container()
-input_container = st.container()
+# Wall time of the last run of every page section [ms] (full app and fragments, shown in the expander "Diagnostics")
+if "rerun_latency" not in st.session_state:
+    st.session_state.rerun_latency = {}
+app_start = time.perf_counter()
 
 
 # ##########################################################################################################################
-# Build web site
+# Define the page fragments
 # ##########################################################################################################################
 
-with header_container:
-    st.markdown("<h1 style='text-align: center;'>Asynchronous Machine</h1>", unsafe_allow_html=True)
-    
-with input_container:
-    # Create three columns
-    col1, col2, col3 = st.columns(3)
-
-    # Table 1: On the left, Initial values
-    with col1:
-        st.subheader("Machine")
+# Every fragment reruns on its own: Editing an input table reruns only this table, the plot, the result tables and the calculation text are kept.
+# The button "Calculate" is outside of the fragments and reruns the full app. It reads the inputs from the widget states (get_edited_table())
 
-        row_height = 38
-        height = len(st.session_state.initial_values['Value']) * row_height
+row_height = 38
 
-        edited_initial_values = st.data_editor(
-            initial_values,
+# Table 1: On the left, Initial values
+@st.fragment
+def machine_fragment():
+    with time_rerun("Machine table"):
+        st.subheader("Machine")
+        st.data_editor(
+            st.session_state.initial_values.copy(),
             column_config={
                 "Name": st.column_config.TextColumn('Variable', disabled=True),
                 "Value": st.column_config.TextColumn("", disabled=False)
@@ -249,19 +345,17 @@ with input_container:
             num_rows="fixed",
             hide_index=True,
             use_container_width=True,
-            height=height,
+            height=len(st.session_state.initial_values['Value']) * row_height,
             key='initial values'
         )
 
-    # Table 2: On the middle, Operating values
-    with col2:
+# Table 2: On the middle, Operating values
+@st.fragment
+def operating_fragment():
+    with time_rerun("Operating table"):
         st.subheader("Operating")
-
-        row_height = 38
-        height = len(st.session_state.operating_values) * row_height + int(row_height/2)
-
-        edited_operating_values = st.data_editor(
-            operating_values,
+        st.data_editor(
+            st.session_state.operating_values.copy(),
             column_config={
                 "Name": st.column_config.TextColumn('Variable', disabled=True),
                 "Value": st.column_config.TextColumn("", disabled=False)
@@ -269,25 +363,23 @@ with input_container:
             num_rows="fixed",
             hide_index=True,
             use_container_width=True,
-            height=height,
+            height=len(st.session_state.operating_values) * row_height + int(row_height/2),
             key="operating values"
         )
 
         # Button Copy values from machine values
-        st.button("Copy machine values", on_click=copy_values, args=(edited_initial_values,), use_container_width=True)
+        st.button("Copy machine values", on_click=copy_values, use_container_width=True)
 
         # Print Errors
         st.markdown(f'''{st.session_state.error_print}''')
 
-    # Table 3: On the right, Result Values
-    with col3:
+# Table 3: On the right, Result Values
+@st.fragment
+def result_fragment():
+    with time_rerun("Result table"):
         st.subheader("Result")
-
-        row_height = 38
-        height = len(st.session_state.result_values) * row_height #+ int(row_height/2)
-
-        edited_result = st.data_editor(
-            result_values,
+        st.data_editor(
+            st.session_state.result_values.copy(),
             column_config={
                 "Name": st.column_config.TextColumn('Variable', disabled=True),
                 "Value": st.column_config.TextColumn("", disabled=True)
@@ -295,66 +387,56 @@ with input_container:
             num_rows="fixed",
             hide_index=True,
             use_container_width=True,
-            height=height,
+            height=len(st.session_state.result_values) * row_height,
             key="result values"
         )
-    
-    # Slip Ring Expander
-    with st.expander("Slip Ring Parameters", expanded=False):
+
+# Slip ring inputs and results
+@st.fragment
+def slip_ring_fragment():
+    with time_rerun("Slip ring"):
         colex_1, colex_2, colex_3 = st.columns(3)
         with colex_1:
-            Un_rotor = st.number_input("Un Rotor [V] (Initial Machine)", min_value=0, max_value=50000, step=1)
+            st.number_input("Un Rotor [V] (Initial Machine)", min_value=0, max_value=50000, step=1, key="initial_voltage_rotor")
         with colex_2:
-            change_connection_rotor = st.radio(
-            "Change Rotor Connection Y/D:",
-            ["Do not change", "Y --> D", "D --> Y"]
-        )
+            st.radio("Change Rotor Connection Y/D:", ["Do not change", "Y --> D", "D --> Y"], key="change_connection_rotor")
         with colex_3:
-            edited_result_values_rotor = st.data_editor(result_values_rotor, 
-                                                        column_config={
-                                                                "Name": st.column_config.TextColumn('Variable (Result)', disabled=True),
-                                                                "Value": st.column_config.TextColumn("", disabled=True)
-                                                            },
-                                                        hide_index=True,)
-    
-    # Button Calculate variations
-    st.button("Calculate", on_click=calculate_btm, args=(edited_initial_values, edited_operating_values, values_format, Un_rotor, change_connection_rotor,), use_container_width=True, type='primary')
-
-    # Create three columns
-    col2_1, col2_2= st.columns(2)
-
-    # Save Buttons
-    if st.session_state.calc_print_save is not None and st.session_state.calc_print_save != '' and st.session_state.calc_plot is not None:
-        # Download Calculations.txt
-        st.download_button('Download Calculation (.txt)', data=st.session_state.calc_print_save, file_name="calculations.txt")
-        
-        # Download Plot Immage
-        # Save figure to a BytesIO buffer
-        buf = io.BytesIO()
-        st.session_state.calc_plot.savefig(buf, format="png", bbox_inches='tight')
-        buf.seek(0)  # Reset buffer position to the start
-        st.download_button('Download Plot (.png)', data=buf, file_name="starting_curves.png")
-        
-    # Show plot
-    if st.session_state.calc_plot is not None:
-        st.pyplot(st.session_state.calc_plot)
-
-    # Create three columns
-    col3_1, col3_2= st.columns([1, 2])
-
-    # Print Calculations conducted
-    with col3_2:
-        # Show Calculations text
+            st.data_editor(st.session_state.result_values_rotor.copy(),
+                           column_config={
+                                   "Name": st.column_config.TextColumn('Variable (Result)', disabled=True),
+                                   "Value": st.column_config.TextColumn("", disabled=True)
+                               },
+                           hide_index=True,)
+
+# Downloads and plot of the starting curves (PNG rendered once by the calculation)
+@st.fragment
+def plot_fragment():
+    with time_rerun("Plot"):
+        # Save Buttons (no rerun on download)
+        if st.session_state.calc_print_save is not None and st.session_state.calc_print_save != '' and st.session_state.calc_plot is not None:
+            st.download_button('Download Calculation (.txt)', data=st.session_state.calc_print_save, file_name="calculations.txt", on_click="ignore")
+            st.download_button('Download Plot (.png)', data=st.session_state.calc_plot, file_name="starting_curves.png", on_click="ignore")
+
+        # Show plot
+        if st.session_state.calc_plot is not None:
+            st.image(st.session_state.calc_plot, use_container_width=True)
+
+# Print Calculations conducted
+@st.fragment
+def calculation_text_fragment():
+    with time_rerun("Calculation text"):
         if st.session_state.calc_print is not None and st.session_state.calc_print != '':
             st.subheader("Calculations")
             st.text(st.session_state.calc_print)
 
-    # Print Percentual Changes
-    with col3_1:
+# Print Percentual Changes
+@st.fragment
+def changes_fragment():
+    with time_rerun("Percentual changes"):
         if st.session_state.change_percent.iloc[0, 1] is not None:
             st.subheader("Percentual Changes")
-            edited_change = st.data_editor(
-                change_percent,
+            st.data_editor(
+                st.session_state.change_percent.copy(),
                 column_config={
                     "Variable": st.column_config.TextColumn('Parameter', disabled=True),
                     "Change": st.column_config.TextColumn("Change [%]", disabled=True)
@@ -365,3 +447,135 @@ with input_container:
                 key="change values"
             )
 
+# Operating sweep (the form reruns only this fragment)
+@st.fragment
+def sweep_fragment():
+    with time_rerun("Operating sweep"):
+        with st.form("sweep form"):
+            colsw_1, colsw_2, colsw_3 = st.columns(3)
+            with colsw_1:
+                sweep_Un = st.slider("Un [% of Operating]", min_value=50, max_value=150, value=(80, 120))
+                sweep_Freq = st.slider("Freq [% of Operating]", min_value=50, max_value=150, value=(80, 120))
+                sweep_Pn = st.slider("Pn [% of Operating]", min_value=10, max_value=200, value=(80, 120))
+            with colsw_2:
+                sweep_points = st.number_input("Points per Axis (Un, Freq)", min_value=10, max_value=1000, value=200, step=10)
+                sweep_panels = st.number_input("Number of Pn Values", min_value=1, max_value=5, value=3, step=1)
+            with colsw_3:
+                sweep_quantity = st.selectbox("Quantity", sweep_quantity_labels)
+                sweep_limit = st.number_input("Limit (Contour)", value=None, placeholder="Nameplate value")
+            run_sweep = st.form_submit_button("Run Sweep", use_container_width=True)
+        if run_sweep:
+            sweep_btm({"Un_op": sweep_Un, "Freq_op": sweep_Freq, "Pn_op": sweep_Pn}, sweep_points, sweep_panels, sweep_quantity, sweep_limit)
+        if st.session_state.sweep_error != "":
+            st.markdown(f":red[{st.session_state.sweep_error}]")
+        elif st.session_state.sweep_plot is not None:
+            st.image(st.session_state.sweep_plot, use_container_width=True)
+
+# What-if mode: Every slider reruns only this fragment. No trace, report, sympy or matplotlib: results and curves of evaluate_what_if(), chart rendered by the browser
+@st.fragment
+def what_if_fragment():
+    with time_rerun("What-if"):
+        motor_ini, operating, wrong_names = get_what_if_inputs()
+        if motor_ini is None:
+            st.markdown(":red[What-if needs valid inputs (" + ', '.join(wrong_names) + ")]")
+            return
+
+        # Sliders: Un, Freq, Pn in % of the operating values, ambient temperature and height as absolute values (sent on release)
+        colwi_1, colwi_2 = st.columns(2)
+        with colwi_1:
+            what_if_Un = st.slider("Un [% of Operating]", min_value=50, max_value=150, value=100)
+            what_if_Freq = st.slider("Freq [% of Operating]", min_value=50, max_value=150, value=100)
+            what_if_Pn = st.slider("Pn [% of Operating]", min_value=10, max_value=200, value=100)
+        with colwi_2:
+            what_if_temp = st.slider("Ambient Temp. [°C]", min_value=-20, max_value=60, value=int(min(max(operating["ambientTemp_op"], -20), 60)))
+            what_if_height = st.slider("Height (m.a.s.l.) [m]", min_value=0, max_value=4000, step=50, value=int(min(max(operating["ambientMeter_op"], 0), 4000)))
+        operating = dict(operating,
+            Un_op = operating["Un_op"] * what_if_Un / 100,
+            Freq_op = operating["Freq_op"] * what_if_Freq / 100,
+            Pn_op = operating["Pn_op"] * what_if_Pn / 100,
+            ambientTemp_op = what_if_temp,
+            ambientMeter_op = what_if_height,
+            rotorChangeConnection = st.session_state.change_connection_rotor,
+        )
+
+        start = time.perf_counter()
+        result, curves = evaluate_what_if(motor_ini, operating)
+        evaluation_ms = (time.perf_counter() - start) * 1000
+
+        colwi_3, colwi_4 = st.columns([1, 2])
+        with colwi_3:
+            result_df = pd.DataFrame({"Variable": list(result), "Value": [format_value(value, value_format) for value, value_format in zip(result.values(), values_format)]})
+            st.dataframe(result_df, hide_index=True, use_container_width=True, height=len(result_df) * row_height)
+        with colwi_4:
+            st.vega_lite_chart(curves, what_if_chart_spec, use_container_width=True)
+        st.caption(f"Evaluation: {evaluation_ms:.1f} ms")
+
+# Stage timing of the last calculation and rerun latency of the page sections
+@st.fragment
+def diagnostics_fragment():
+    st.checkbox("Capture cProfile on the next calculation", key="diagnostics_profile")
+    if len(st.session_state.diagnostics) > 0:
+        diagnostics_df = pd.DataFrame(st.session_state.diagnostics)
+        diagnostics_df["wall_s"] *= 1000
+        diagnostics_df["cpu_s"] *= 1000
+        diagnostics_df.columns = ["Stage", "Calls", "Wall [ms]", "CPU [ms]"]
+        st.dataframe(diagnostics_df, hide_index=True, use_container_width=True)
+        st.markdown(f"Total: {diagnostics_df['Wall [ms]'].sum():.1f} ms wall | {diagnostics_df['CPU [ms]'].sum():.1f} ms CPU")
+    if st.session_state.diagnostics_derived is not None:
+        derived = st.session_state.diagnostics_derived
+        st.markdown(f"Derived values (n_sync, branch values, curves): {derived['hits']} hits | {derived['misses']} misses | {derived['invalidations']} invalidations")
+    if st.session_state.diagnostics_profile_text is not None:
+        st.code(st.session_state.diagnostics_profile_text, language=None)
+
+    # An edit of a table reruns only its fragment ("Machine table", "Operating table"), before every edit reran the "Full app"
+    st.markdown("Rerun latency (server, last run of every section):")
+    latency_df = pd.DataFrame({"Section": list(st.session_state.rerun_latency), "Wall [ms]": list(st.session_state.rerun_latency.values())})
+    st.dataframe(latency_df, hide_index=True, use_container_width=True)
+    st.button("Refresh", key="diagnostics refresh")
+
+
+# ##########################################################################################################################
+# Build web site
+# ##########################################################################################################################
+
+st.markdown("<h1 style='text-align: center;'>Asynchronous Machine</h1>", unsafe_allow_html=True)
+
+# Create three columns
+col1, col2, col3 = st.columns(3)
+with col1:
+    machine_fragment()
+with col2:
+    operating_fragment()
+with col3:
+    result_fragment()
+
+# Slip Ring Expander
+with st.expander("Slip Ring Parameters", expanded=False):
+    slip_ring_fragment()
+
+# Button Calculate variations (reruns the full app)
+st.button("Calculate", on_click=calculate_btm, args=(values_format,), use_container_width=True, type='primary')
+
+# Downloads and plot
+plot_fragment()
+
+# Create two columns
+col3_1, col3_2 = st.columns([1, 2])
+with col3_2:
+    calculation_text_fragment()
+with col3_1:
+    changes_fragment()
+
+# Operating Sweep Expander
+with st.expander("Operating Sweep", expanded=False):
+    sweep_fragment()
+
+# What-if Expander
+with st.expander("What-if (live)", expanded=False):
+    what_if_fragment()
+
+# Diagnostics Expander
+with st.expander("Diagnostics", expanded=False):
+    diagnostics_fragment()
+
+st.session_state.rerun_latency["Full app"] = (time.perf_counter() - app_start) * 1000
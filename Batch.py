@@ -0,0 +1,294 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+from Core import part_load_points
+from Fleet import MotorFleet, calculate_fleet_operating_values
+from Parallel import ParallelExecutor
+from Diagnostics import StageTimer, time_stage
+from Validation import input_rules, extract_numeric_column, validate_columns, get_error_text
+
+#####################################################################
+# Define the column layout of the batch files
+#####################################################################
+
+# Machine columns (names of the streamlit "Machine" table): MotorFleet argument
+# If a column is missing, the "default" of Validation.input_rules is used (no default = required)
+machine_columns = {
+    "Pn [kW]": "Pn",
+    "Un [V]": "Un",
+    "Freq [Hz]": "Freq",
+    "Ambient Temp. [°C]": "ambientTemp",
+    "Height (m.a.s.l.) [m]": "ambientMeter",
+    "Connection Y/D": "connection",
+    "Parallel Branches (Stator)": "no_parallel",
+    "Ia/In [%]": "Ia",
+    "Ma/Mn [%]": "Ma",
+    "Mk/Mn [%]": "Mk",
+    "η [%]": "eta",
+    "cos(φ)": "cosphi",
+    "Nominal Speed [RPM]": "n",
+    "Temp. Rise [K]": "deltaT",
+}
+
+# Operating columns (names of the streamlit "Operating" table with prefix): calculate_fleet_operating_values argument
+# If a column is missing, the machine value is used (same as the button "Copy machine values")
+operating_prefix = "Operating "
+operating_columns = {
+    "Pn [kW]": "Pn_op",
+    "Un [V]": "Un_op",
+    "Freq [Hz]": "Freq_op",
+    "Ambient Temp. [°C]": "ambientTemp_op",
+    "Height (m.a.s.l.) [m]": "ambientMeter_op",
+    "Connection Y/D": "connection_op",
+    "Parallel Branches (Stator)": "no_parallel_op",
+}
+
+# Optional catalogue part-load columns: load point [% of Pn] --> (η column, cos(φ) column)
+# A row uses its load points with both values in MotorFleet.variate_power(), a row without such points keeps η and cos(φ) constant
+part_load_columns = {load: (f"η {load}% [%]", f"cos(φ) {load}%") for load in part_load_points}
+
+# Slip ring columns (names of the streamlit "Slip Ring Parameters" expander)
+rotor_voltage_column = "Un Rotor [V]"
+rotor_connection_column = "Change Rotor Connection Y/D"
+
+# Percentual changes: name in calculate_fleet_operating_values --> name of the output column
+change_columns = {
+    "Pn": "Change Pn [%]",
+    "B (~U/f)": "Change B (~U/f) [%]",
+    "Un (per branch)": "Change Un (per branch) [%]",
+    "In (per branch)": "Change In (per branch) [%]",
+    "Temp. Rise (~I^2)": "Change Temp. Rise (~I^2) [%]",
+    "Temp. Rise (~I)": "Change Temp. Rise (~I) [%]",
+}
+
+
+#####################################################################
+# Define the batch functions
+#####################################################################
+
+# Convert and validate the input columns of a chunk
+def format_chunk(chunk: pd.DataFrame) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray], np.ndarray, np.ndarray]:
+    '''
+    Validate a chunk of the batch file with the rules of the streamlit tables (Validation.input_rules)\n
+    Output:\n
+    - machine: MotorFleet arguments (with "part_load" if the chunk has part-load columns) | <dict[str, np.ndarray]>\n
+    - operating: calculate_fleet_operating_values arguments | <dict[str, np.ndarray]>\n
+    - valid: True for rows without wrong inputs | <np.ndarray>\n
+    - error_txt: Error text per row: "Wrong Machine Inputs: Pn [kW], η [%] | Wrong Operating Inputs: Un [V]" | <np.ndarray>
+    '''
+    machine_df = pd.DataFrame({name: chunk[name] if name in chunk else input_rules[name].get("default", "") for name in machine_columns}, index=chunk.index)
+    machine_values, machine_mask = validate_columns(machine_df)
+    machine = {arg: machine_values[name] for name, arg in machine_columns.items()}
+
+    # Missing operating columns: machine value (always valid for the operating table)
+    operating_df = pd.DataFrame({name: chunk[operating_prefix + name] for name in operating_columns if operating_prefix + name in chunk}, index=chunk.index)
+    operating_values, operating_mask = validate_columns(operating_df)
+    operating = {arg: operating_values[name] if name in operating_values else machine_values[name] for name, arg in operating_columns.items()}
+
+    # Catalogue part-load values (optional)
+    part_load_mask = pd.DataFrame(index=chunk.index)
+    if any(name in chunk for names in part_load_columns.values() for name in names):
+        machine["part_load"], part_load_mask = format_part_load(chunk, machine["Pn"], machine["eta"], machine["cosphi"])
+
+    error_txt = np.full(len(chunk), '', dtype=object)
+    for txt in [get_error_text(machine_mask, 'Machine'), get_error_text(operating_mask, 'Operating'), get_error_text(part_load_mask, 'Part-Load')]:
+        error_txt = np.where((error_txt != '') & (txt != ''), error_txt + ' | ' + txt, error_txt + txt)
+    valid = error_txt == ''
+    return machine, operating, valid, error_txt
+
+# Convert the part-load columns of a chunk
+def format_part_load(chunk: pd.DataFrame, Pn: np.ndarray, eta: np.ndarray, cosphi: np.ndarray) -> tuple[np.ndarray, pd.DataFrame]:
+    '''
+    Same rule as Core.get_part_load_table(): Every row uses the load points with both values, points with a missing value are skipped\n
+    Output:\n
+    - part_load: Part-load tables (rows, points, 3) for MotorFleet(part_load=...), padded with the last point of the row. Rows without points get the constant η and cos(φ) | <np.ndarray>\n
+    - error_mask: True for given values out of range (η 0..100 %, cos(φ) 0..1) | <pd.DataFrame>
+    '''
+    limits = {name: limit for names in part_load_columns.values() for name, limit in zip(names, [100, 1])}
+    values = {name: extract_numeric_column(chunk[name]).to_numpy() if name in chunk else np.full(len(chunk), np.nan) for name in limits}
+    error_mask = pd.DataFrame({name: ~np.isnan(values[name]) & ~((values[name] > 0) & (values[name] <= limit)) for name, limit in limits.items()}, index=chunk.index)
+
+    # Points with both values first (in the order of the load), then padded with the last of them
+    eta_points = np.column_stack([values[eta_column] for eta_column, _ in part_load_columns.values()])
+    cosphi_points = np.column_stack([values[cosphi_column] for _, cosphi_column in part_load_columns.values()])
+    present = ~np.isnan(eta_points) & ~np.isnan(cosphi_points)
+    count = present.sum(axis=1)
+    order = np.argsort(~present, axis=1, kind='stable')
+    order = np.take_along_axis(order, np.minimum(np.arange(len(part_load_columns)), np.maximum(count - 1, 0)[:, None]), axis=1)
+    load = np.array(list(part_load_columns)) / 100
+    tables = np.stack([Pn[:, None] * load[order], np.take_along_axis(eta_points, order, axis=1), np.take_along_axis(cosphi_points, order, axis=1)], axis=2)
+    constant = np.stack([Pn, eta, cosphi], axis=1)[:, None, :]
+    return np.where((count > 0)[:, None, None], tables, constant), error_mask
+
+# Calculate the operating values of a chunk
+def calculate_chunk(chunk: pd.DataFrame, row_offset: int, timer: StageTimer | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    '''
+    Validate and calculate a chunk of the batch file\n
+    timer: Optional StageTimer ("validation", "calculation", "DataFrame construction")\n
+    Output:\n
+    - result_df: One row per valid input row (df_result, rotor and percentual change fields) | <pd.DataFrame>\n
+    - error_df: One row per wrong input row ("Row", "Error") | <pd.DataFrame>
+    '''
+    rows = np.arange(row_offset, row_offset + len(chunk))
+    with time_stage(timer, "validation"):
+        machine, operating, valid, error_txt = format_chunk(chunk)
+
+        # Slip ring parameters
+        rotorVoltage = extract_numeric_column(chunk[rotor_voltage_column]).fillna(0).to_numpy() if rotor_voltage_column in chunk else np.zeros(len(chunk))
+        rotorChangeConnection = chunk[rotor_connection_column].astype(str).to_numpy() if rotor_connection_column in chunk else np.full(len(chunk), 'Do not change')
+
+    with time_stage(timer, "calculation"):
+        fleet_ini = MotorFleet(**{arg: values[valid] for arg, values in machine.items()}, rotorVoltage=rotorVoltage[valid])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            _, result = calculate_fleet_operating_values(
+                fleet_ini,
+                **{arg: values[valid] for arg, values in operating.items()},
+                rotorChangeConnection=rotorChangeConnection[valid]
+            )
+
+    with time_stage(timer, "DataFrame construction"):
+        result_df = pd.DataFrame({"Row": rows[valid]})
+        for name, values in result.items():
+            if name in change_columns:
+                result_df[change_columns[name]] = np.round(values, 1)
+            else:
+                result_df[name] = values
+
+        # Rows with non finite results can not be calculated (e.g. Pn = 0)
+        numeric_df = result_df.select_dtypes(include='number')
+        calculated = np.isfinite(numeric_df.to_numpy()).all(axis=1)
+        error_txt[np.flatnonzero(valid)[~calculated]] = 'Calculation not conducted'
+        result_df = result_df[calculated]
+
+        error_df = pd.DataFrame({"Row": rows, "Error": error_txt})
+        error_df = error_df[error_df["Error"] != '']
+    return result_df, error_df
+
+# Calculate a chunk and return the stage timings (the records are sent back from the worker processes)
+def calculate_chunk_timed(chunk: pd.DataFrame, row_offset: int) -> tuple[pd.DataFrame, pd.DataFrame, list]:
+    '''
+    Return [pd.DataFrame, pd.DataFrame, list]: result_df, error_df of calculate_chunk() and the StageRecord list of the chunk
+    '''
+    timer = StageTimer()
+    result_df, error_df = calculate_chunk(chunk, row_offset, timer)
+    return result_df, error_df, timer.records
+
+# Read the input file in chunks
+def read_chunks(input_path: str, chunk_size: int):
+    '''
+    Generator of <pd.DataFrame> chunks of a .csv or .parquet file
+    '''
+    if input_path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+# Write the output file chunk by chunk
+class ChunkWriter:
+    '''
+    Append <pd.DataFrame> chunks to a .csv or .parquet file. The header / schema is taken from the first chunk\n
+    Empty chunks are not written to a .parquet file. If all chunks are empty, close() writes an empty table with their columns (valid .parquet file)
+    '''
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.is_parquet = output_path.lower().endswith('.parquet')
+        self.parquet_writer = None
+        self.empty_df = None # Last empty chunk (schema of the empty .parquet file)
+        self.header_written = False # CSV header (written once, also if the first chunks are empty)
+        self.rows = 0
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.is_parquet:
+            if len(df) == 0:
+                self.empty_df = df
+                return
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self.parquet_writer.write_table(table.cast(self.parquet_writer.schema))
+        else:
+            df.to_csv(self.output_path, mode='a', header=not self.header_written, index=False)
+            self.header_written = True
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+        elif self.is_parquet and self.empty_df is not None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.Table.from_pandas(self.empty_df, preserve_index=False), self.output_path)
+
+# Read the input file in chunks, together with the row number of the first row of each chunk
+def read_chunks_with_offset(input_path: str, chunk_size: int):
+    '''
+    Generator of (<pd.DataFrame> chunk, <int> row offset)
+    '''
+    row_offset = 0
+    for chunk in read_chunks(input_path, chunk_size):
+        yield chunk, row_offset
+        row_offset += len(chunk)
+
+# Run the batch calculation
+def run_batch(input_path: str, output_path: str, error_path: str | None = None, chunk_size: int = 10000, workers: int = 1, timer: StageTimer | None = None) -> tuple[int, int]:
+    '''
+    Re-rate every row of the input file and stream the results to the output file\n
+    Inputs:\n
+    - input_path: .csv / .parquet file with the columns of machine_columns, operating_columns (with prefix "Operating ") and the slip ring columns\n
+    - output_path: .csv / .parquet file for the results\n
+    - error_path: .csv / .parquet file for the rows with errors ("Row", "Error"). Default: <output_path>_errors.<ext>\n
+    - chunk_size: Number of rows calculated at once\n
+    - workers: Number of worker processes calculating chunks (None = all CPU cores, <=1 = serial)\n
+    - timer: Optional StageTimer, collects the stages of all chunks (also from the worker processes) and "writing"\n
+    Output:\n
+    - Number of calculated rows, number of rows with errors
+    '''
+    if error_path is None:
+        root, ext = os.path.splitext(output_path)
+        error_path = root + '_errors' + ext
+
+    result_writer = ChunkWriter(output_path)
+    error_writer = ChunkWriter(error_path)
+    try:
+        with ParallelExecutor(workers=workers) as executor:
+            function = calculate_chunk if timer is None else calculate_chunk_timed
+            for output in executor.starmap(function, read_chunks_with_offset(input_path, chunk_size)):
+                result_df, error_df = output[:2]
+                if timer is not None:
+                    timer.records.extend(output[2])
+                with time_stage(timer, "writing"):
+                    result_writer.write(result_df)
+                    if len(error_df) > 0:
+                        error_writer.write(error_df)
+    finally:
+        result_writer.close()
+        error_writer.close()
+    return result_writer.rows, error_writer.rows
+
+# Command line entry point
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless batch re-rating of asynchronous machines (.csv / .parquet)")
+    parser.add_argument("input", help="Input file with machine and operating columns")
+    parser.add_argument("output", help="Output file for the results")
+    parser.add_argument("--errors", default=None, help="Output file for rows with wrong inputs (default: <output>_errors)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Number of rows calculated at once")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes (0 = all CPU cores, 1 = serial)")
+    parser.add_argument("--timings", action="store_true", help="Print the time of the stages (summed over all chunks)")
+    args = parser.parse_args(argv)
+
+    timer = StageTimer() if args.timings else None
+    rows, errors = run_batch(args.input, args.output, args.errors, args.chunk_size, args.workers or None, timer)
+    print(f"Calculated rows: {rows} | Rows with errors: {errors}")
+    if timer is not None:
+        print(timer.to_text())
+
+if __name__ == "__main__":
+    main()
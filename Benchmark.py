@@ -0,0 +1,586 @@
+import argparse
+import json
+import subprocess
+import sys
+import os
+
+#####################################################################
+# Import time
+#####################################################################
+
+# Cold import of a module in a fresh interpreter
+def measure_import_time(module: str, repeats: int = 5) -> float:
+    '''
+    Return [Float]: Fastest wall time [s] of "import <module>" in a new python process (the interpreter start is not included)
+    '''
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return min(times)
+
+# Check the cold import against a budget
+def check_import_budget(module: str = "Core", budget: float = 0.05, repeats: int = 5) -> bool:
+    '''
+    Return [Bool]: True if the cold import of the module is within the budget [s]
+    '''
+    import_time = measure_import_time(module, repeats)
+    within_budget = import_time <= budget
+    print(f"Import {module}: {import_time * 1000:.1f} ms | Budget: {budget * 1000:.1f} ms | {'OK' if within_budget else 'FAILED'}")
+    return within_budget
+
+
+#####################################################################
+# Memory soak of the streamlit app
+#####################################################################
+
+# Machine and operating values of the soak (Pn of the machine is variated per run, so that no cached result is reused)
+soak_initial_values = {"Pn [kW]": "100", "Un [V]": "400", "Freq [Hz]": "50", "Ambient Temp. [°C]": "40", "Height (m.a.s.l.) [m]": "1000", "Connection Y/D": "Y",
+                       "Parallel Branches (Stator)": "1", "Ia/In [%]": "600", "Ma/Mn [%]": "200", "Mk/Mn [%]": "250", "η [%]": "95", "cos(φ)": "0.85",
+                       "Nominal Speed [RPM]": "1480", "Temp. Rise [K]": "80"}
+soak_operating_values = {"Pn [kW]": "110", "Un [V]": "690", "Freq [Hz]": "60", "Ambient Temp. [°C]": "45", "Height (m.a.s.l.) [m]": "1500",
+                         "Connection Y/D": "D", "Parallel Branches (Stator)": "2"}
+
+# Resident memory of this process
+def get_rss_bytes() -> int:
+    '''
+    Return [Int]: Current resident set size [bytes] (Linux), peak resident set size on other platforms
+    '''
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+# Run many calculations in the streamlit app and check that the memory stays bounded
+def run_memory_soak(runs: int = 200, warmup: int = 20, max_growth_mb: float = 30) -> bool:
+    '''
+    Press "Calculate" runs times with different inputs in a headless session of the app (streamlit.testing AppTest)\n
+    The shared result cache of the app (st.cache_resource, bounded by its own size limit) is cleared after every run, so that only the memory kept by the session counts\n
+    Return [Bool]: True if no matplotlib figure stays open and the memory growth after the warmup is below max_growth_mb
+    '''
+    import gc
+    import pandas as pd
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ASM Calculator.py")
+    at = AppTest.from_file(app_path, default_timeout=60)
+    at.run()
+    rss_start = None
+    for run in range(warmup + runs):
+        if run == warmup:
+            gc.collect()
+            rss_start = get_rss_bytes()
+        initial_values = dict(soak_initial_values, **{"Pn [kW]": str(100 + run)})
+        at.session_state.initial_values = pd.DataFrame({"Name": list(initial_values), "Value": list(initial_values.values())})
+        at.session_state.operating_values = pd.DataFrame({"Name": list(soak_operating_values), "Value": list(soak_operating_values.values())})
+        at.run()
+        next(button for button in at.button if button.label == "Calculate").click().run()
+        if len(at.exception) > 0:
+            raise RuntimeError(f"Exception in the app: {at.exception[0].message}")
+        st.cache_resource.clear()
+    gc.collect()
+    growth_mb = (get_rss_bytes() - rss_start) / 1024**2
+    open_figures = len(plt.get_fignums())
+    passed = open_figures == 0 and growth_mb <= max_growth_mb
+    print(f"Soak: {runs} calculations | Memory growth: {growth_mb:.1f} MB (limit {max_growth_mb} MB) | Open figures: {open_figures} | {'OK' if passed else 'FAILED'}")
+    return passed
+
+
+#####################################################################
+# Benchmark suite of the hot paths
+#####################################################################
+
+# Machine of the benchmarks (MotorAsm / MotorFleet arguments) and operating values of the variate_* stages
+benchmark_motor = {"Pn": 100.0, "Un": 400.0, "Freq": 50.0, "n": 1480.0, "eta": 95.0, "cosphi": 0.85, "Ia": 600.0, "Ma": 200.0, "Mk": 250.0,
+                   "connection": "Y", "deltaT": 80.0, "ambientTemp": 40.0, "ambientMeter": 1000.0, "no_parallel": 1, "rotorVoltage": 0.0}
+benchmark_stages = {
+    "variate_connection": "D",
+    "variate_number_of_parallel_circuits": 2,
+    "variate_ambient_temp": 45.0,
+    "variate_freq_volt_konstMagnFlux": 60.0,
+    "variate_voltage": 440.0,
+    "variate_power": 110.0,
+    "variate_ambient_height": 1500.0,
+}
+benchmark_sizes = [1, 10, 100, 1000, 10000, 100000]
+
+# Keyword arguments of calculate_operating_values() for the end-to-end benchmarks
+def get_benchmark_kwargs() -> dict:
+    kwargs = {name: benchmark_motor[name] for name in ["Pn", "Un", "Freq", "ambientTemp", "ambientMeter", "connection", "no_parallel",
+                                                       "Ia", "Ma", "Mk", "eta", "cosphi", "n", "deltaT", "rotorVoltage"]}
+    kwargs.update(rotorChangeConnection="Do not change", motor_label_ini="Machine", motor_label_op="Operating",
+                  Pn_op=110.0, Un_op=440.0, Freq_op=60.0, ambientTemp_op=45.0, ambientMeter_op=1500.0, connection_op="D", no_parallel_op=2)
+    return kwargs
+
+# Build the benchmark cases
+def get_benchmark_cases() -> dict:
+    '''
+    Return [Dict]: name --> (make_case, max_size)\n
+    make_case(size) prepares the inputs of size items and returns the function to time (the preparation is not timed).
+    Cases with max_size=1 do not depend on a batch size
+    '''
+    import copy
+    import numpy as np
+    import pandas as pd
+    import matplotlib
+    matplotlib.use('Agg')
+    import Functions
+    from Core import MotorAsm
+    from Fleet import MotorFleet
+    from Batch import calculate_chunk
+    from Startup import simulate_start
+    from Circuit import estimate_equivalent_circuit, get_part_load_tables
+
+    def new_motor(**kwargs) -> MotorAsm:
+        return MotorAsm(**benchmark_motor, motor_label="Machine", **kwargs)
+
+    def new_fleet(size: int) -> MotorFleet:
+        return MotorFleet(**dict(benchmark_motor, Pn=np.full(size, benchmark_motor["Pn"])))
+
+    def make_motor_loop(size: int):
+        return lambda: [new_motor(trace=False) for _ in range(size)]
+
+    def make_stage(stage: str, value):
+        def make_case(size: int):
+            motors = [copy.copy(new_motor(trace=False)) for _ in range(size)]
+            return lambda: [getattr(motor, stage)(value) for motor in motors]
+        return make_case
+
+    def make_fleet_stage(stage: str, value):
+        def make_case(size: int):
+            fleet = new_fleet(size)
+            return lambda: getattr(fleet, stage)(value)
+        return make_case
+
+    def make_curve(method: str, curve_mode: str, **kwargs):
+        def make_case(size: int):
+            motor = new_motor()
+            x_vals = np.linspace(0.1, 1499, size)
+            return lambda: getattr(motor, method)(curve_mode=curve_mode, **kwargs)(x_vals)
+        return make_case
+
+    def make_plot(size: int):
+        motors = [new_motor(), new_motor()]
+        return lambda: Functions.plot_asm_start_curves(motors, plt_show=False)
+
+    def make_start_curves(tolerance: float | None):
+        def make_case(size: int):
+            motors = [new_motor(), new_motor()]
+            return lambda: Functions.get_start_curves(motors, tolerance=tolerance)
+        return make_case
+
+    def make_scenario_plot(size: int):
+        motors = [MotorAsm(**dict(benchmark_motor, Un=benchmark_motor["Un"] * (0.9 + 0.2 * i / size)), motor_label=f"Scenario {i}") for i in range(size)]
+        return lambda: Functions.fig_to_png(Functions.plot_asm_scenario_curves(motors, plt_show=False))
+
+    def make_png(size: int):
+        fig = Functions.plot_asm_start_curves([new_motor(), new_motor()], plt_show=False)
+        return lambda: Functions.fig_to_png(fig, close_fig=False)
+
+    def make_report(size: int):
+        motor = new_motor()
+        return lambda: motor.print_motor_values(show_print=False)
+
+    def make_end_to_end(make_plot: bool, trace: bool):
+        def make_case(size: int):
+            kwargs = get_benchmark_kwargs()
+            return lambda: [Functions.calculate_operating_values(**kwargs, make_plot=make_plot, trace=trace) for _ in range(size)]
+        return make_case
+
+    def make_batch(size: int):
+        kwargs = get_benchmark_kwargs()
+        row = {name: str(benchmark_motor[arg]) for name, arg in [("Pn [kW]", "Pn"), ("Un [V]", "Un"), ("Freq [Hz]", "Freq"), ("Ia/In [%]", "Ia"), ("Ma/Mn [%]", "Ma"),
+                                                                  ("Mk/Mn [%]", "Mk"), ("η [%]", "eta"), ("cos(φ)", "cosphi"), ("Nominal Speed [RPM]", "n")]}
+        row.update({"Operating Pn [kW]": str(kwargs["Pn_op"]), "Operating Un [V]": str(kwargs["Un_op"]), "Operating Freq [Hz]": str(kwargs["Freq_op"])})
+        chunk = pd.DataFrame({name: [value] * size for name, value in row.items()})
+        return lambda: calculate_chunk(chunk, 0)
+
+    def make_start(size: int):
+        fleet = new_fleet(size)
+        return lambda: simulate_start(fleet, J=5.0, M_load=fleet.Mn, load_type='quadratic')
+
+    def make_circuit(size: int):
+        fleet = new_fleet(size)
+        return lambda: estimate_equivalent_circuit(fleet)
+
+    def make_part_load_power(size: int):
+        fleet = new_fleet(size)
+        fleet.part_load = get_part_load_tables(fleet)
+        return lambda: fleet.copy().variate_power(0.6 * fleet.Pn)
+
+    def make_what_if(size: int):
+        motor_ini = new_motor()
+        operating = get_what_if_operating()
+        Functions.evaluate_what_if(motor_ini, operating)
+        return lambda: Functions.evaluate_what_if(motor_ini, operating)
+
+    def make_part_load_tables(size: int):
+        fleet = new_fleet(size)
+        circuit = estimate_equivalent_circuit(fleet)
+        return lambda: get_part_load_tables(fleet, circuit)
+
+    cases = {"MotorAsm.__init__": (make_motor_loop, 10000), "MotorFleet.__init__": (lambda size: lambda: new_fleet(size), None)}
+    for stage, value in benchmark_stages.items():
+        cases[f"MotorAsm.{stage}"] = (make_stage(stage, value), 10000)
+        cases[f"MotorFleet.{stage}"] = (make_fleet_stage(stage, value), None)
+    for curve_mode in ["numeric", "sympy", "circuit"]:
+        cases[f"get_M_n_curve[{curve_mode}]"] = (make_curve("get_M_n_curve", curve_mode), None)
+        cases[f"get_I_n_curve[{curve_mode}]"] = (make_curve("get_I_n_curve", curve_mode, Ia_type='branch'), None)
+    cases["get_start_curves[linspace]"] = (make_start_curves(None), 1)
+    cases["get_start_curves[adaptive]"] = (make_start_curves(0.002), 1)
+    cases["plot_asm_start_curves"] = (make_plot, 1)
+    cases["plot_asm_scenario_curves + fig_to_png"] = (make_scenario_plot, 100)
+    cases["fig_to_png"] = (make_png, 1)
+    cases["print_motor_values"] = (make_report, 1)
+    cases["calculate_operating_values"] = (make_end_to_end(True, True), 10)
+    cases["calculate_operating_values[no plot, no trace]"] = (make_end_to_end(False, False), 1000)
+    cases["Batch.calculate_chunk"] = (make_batch, None)
+    cases["Startup.simulate_start"] = (make_start, None)
+    cases["Circuit.estimate_equivalent_circuit"] = (make_circuit, None)
+    cases["Circuit.get_part_load_tables"] = (make_part_load_tables, None)
+    cases["MotorFleet.variate_power[part-load tables]"] = (make_part_load_power, None)
+    cases["Functions.evaluate_what_if"] = (make_what_if, 1)
+    return cases
+
+# Time all benchmark cases
+def run_benchmarks(sizes: list[int] = benchmark_sizes, repeats: int = 5, select: str | None = None) -> dict:
+    '''
+    Return [Dict]: {"meta": {...}, "results": {"<case>[n=<size>]": {"min_s", "median_s", "per_item_s"}}}\n
+    Every case is timed repeats times for each batch size up to its max_size (the fastest run is the reference of compare)
+    '''
+    import time
+    import platform
+    import statistics
+    import numpy as np
+
+    results = {}
+    for name, (make_case, max_size) in get_benchmark_cases().items():
+        if select is not None and select not in name:
+            continue
+        case_sizes = [1] if max_size == 1 else [size for size in sizes if max_size is None or size <= max_size]
+        for size in case_sizes:
+            times = []
+            for _ in range(repeats):
+                function = make_case(size)
+                start = time.perf_counter()
+                function()
+                times.append(time.perf_counter() - start)
+            key = name if max_size == 1 else f"{name}[n={size}]"
+            results[key] = {"min_s": min(times), "median_s": statistics.median(times), "per_item_s": min(times) / size}
+            print(f"{key:<60} {min(times) * 1000:>12.3f} ms")
+    meta = {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "repeats": repeats, "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return {"meta": meta, "results": results}
+
+# Compare two benchmark results
+def compare_benchmarks(baseline: dict, current: dict, tolerance: float = 0.25, min_time: float = 1e-4) -> bool:
+    '''
+    Return [Bool]: True if no case of both results got slower than (1 + tolerance) * baseline\n
+    Cases below min_time [s] in both results are reported, but not flagged (timer noise)
+    '''
+    passed = True
+    print(f"{'Case':<60} {'Baseline [ms]':>14} {'Current [ms]':>14} {'Ratio':>8}")
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        time_base, time_current = baseline["results"][key]["min_s"], result["min_s"]
+        ratio = time_current / time_base if time_base > 0 else float('inf')
+        regression = ratio > 1 + tolerance and max(time_base, time_current) >= min_time
+        passed &= not regression
+        print(f"{key:<60} {time_base * 1000:>14.3f} {time_current * 1000:>14.3f} {ratio:>8.2f}{'  REGRESSION' if regression else ''}")
+    print('OK' if passed else 'FAILED')
+    return passed
+
+
+#####################################################################
+# Memory footprint of the motor states
+#####################################################################
+
+# Retained memory of the objects created by a function
+def measure_retained_bytes(create, count: int) -> float:
+    '''
+    Return [Float]: Memory [bytes] per call of create(i), which is still allocated while the results are kept (tracemalloc)
+    '''
+    import gc
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    objects = [create(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+# Compare the memory of MotorAsm snapshots and MotorState chains
+def check_state_memory(count: int = 2000, max_ratio: float = 0.5) -> bool:
+    '''
+    Keep the full chain of intermediate states of calculate_operating_values() for count motors:\n
+    - MotorAsm: copy.deepcopy() after every stage (the motor is variated in place)\n
+    - MotorState: get_operating_states() (immutable tuples, unchanged values are shared between the states)\n
+    Return [Bool]: True if the state chain needs at most max_ratio of the memory of the MotorAsm snapshots
+    '''
+    import copy
+    from Core import MotorAsm, get_operating_states, run_operating_stages
+
+    kwargs = get_benchmark_kwargs()
+    operating = {name: kwargs[name] for name in ["Pn_op", "Un_op", "Freq_op", "ambientTemp_op", "ambientMeter_op", "connection_op", "no_parallel_op", "rotorChangeConnection"]}
+
+    def new_motor(i: int, trace: bool = False) -> MotorAsm:
+        return MotorAsm(**dict(benchmark_motor, Pn=benchmark_motor["Pn"] + i), motor_label="Machine", trace=trace)
+
+    def chain_motor(i: int) -> list:
+        motor = new_motor(i, trace=True)
+        snapshots = [copy.deepcopy(motor)]
+        for state in run_operating_stages(motor, **operating, Un_ini=motor.Un):
+            snapshots.append(copy.deepcopy(state.to_motor(trace=True)))
+        return snapshots
+
+    results = {
+        "MotorAsm": measure_retained_bytes(new_motor, count),
+        "MotorState": measure_retained_bytes(lambda i: new_motor(i).to_state(), count),
+        "MotorAsm chain (deepcopy per stage)": measure_retained_bytes(chain_motor, count),
+        "MotorState chain": measure_retained_bytes(lambda i: get_operating_states(new_motor(i).to_state(), **operating), count),
+    }
+    for name, size in results.items():
+        print(f"{name:<40} {size:>10.0f} bytes per motor")
+    ratio = results["MotorState chain"] / results["MotorAsm chain (deepcopy per stage)"]
+    passed = ratio <= max_ratio
+    print(f"Chain memory ratio: {ratio:.2f} (limit {max_ratio}) | {'OK' if passed else 'FAILED'}")
+    return passed
+
+
+#####################################################################
+# Parity of the scalar and the vectorized calculation
+#####################################################################
+
+# Random machines and operating values (calculate_operating_values() arguments)
+def get_random_calculation_kwargs(rng, count: int) -> list[dict]:
+    '''
+    Return [List]: count keyword argument sets of calculate_operating_values() with plausible random nameplates (seeded rng: numpy Generator)
+    '''
+    kwargs_list = []
+    for _ in range(count):
+        Pn = round(float(rng.uniform(1, 2000)), 1)
+        Freq = float(rng.choice([50.0, 60.0]))
+        Ma = float(rng.uniform(80, 300))
+        rotorVoltage = float(rng.choice([0.0, round(rng.uniform(100, 2000))]))
+        kwargs_list.append({
+            "Pn": Pn, "Un": float(rng.choice([230, 400, 690, 3300, 6000])), "Freq": Freq,
+            "ambientTemp": float(rng.integers(10, 60)), "ambientMeter": float(rng.integers(0, 40) * 100), "connection": str(rng.choice(["Y", "D"])),
+            "no_parallel": int(rng.integers(1, 5)), "Ia": round(float(rng.uniform(400, 900))), "Ma": round(Ma), "Mk": round(Ma + float(rng.uniform(20, 200))),
+            "eta": round(float(rng.uniform(80, 98)), 1), "cosphi": round(float(rng.uniform(0.7, 0.95)), 2),
+            "n": round(120 * Freq / int(rng.choice([2, 4, 6, 8])) * (1 - float(rng.uniform(0.005, 0.05)))), "deltaT": float(rng.integers(60, 110)),
+            "rotorVoltage": rotorVoltage, "rotorChangeConnection": str(rng.choice(["Do not change", "Y --> D", "D --> Y"])), "motor_label_ini": "Machine",
+            "Pn_op": round(Pn * float(rng.uniform(0.3, 1.5)), 1),
+            "Un_op": float(rng.choice([230, 400, 440, 690, 3300, 6000])), "Freq_op": float(rng.choice([25.0, 50.0, 60.0, 87.0])),
+            "ambientTemp_op": float(rng.integers(10, 60)), "ambientMeter_op": float(rng.integers(0, 40) * 100), "connection_op": str(rng.choice(["Y", "D"])),
+            "no_parallel_op": int(rng.integers(1, 5)), "motor_label_op": "Operating",
+        })
+    return kwargs_list
+
+# Compare calculate_operating_values() and calculate_fleet_operating_values()
+def check_fleet_parity(count: int = 200, seed: int = 0, rel_tol: float = 1e-9) -> bool:
+    '''
+    Calculate count seeded random machines with the scalar path (MotorAsm, one by one) and the vectorized path (MotorFleet, all at once)\n
+    Compared: every field of df_result, result_rotor_df and change_df (the fleet changes rounded like the scalar table)\n
+    Return [Bool]: True if all values are equal (numbers within rel_tol)
+    '''
+    import math
+    import numpy as np
+    import Functions
+    from Fleet import MotorFleet, calculate_fleet_operating_values
+
+    kwargs_list = get_random_calculation_kwargs(np.random.default_rng(seed), count)
+    machine_args = ["Pn", "Un", "Freq", "n", "eta", "cosphi", "Ia", "Ma", "Mk", "connection", "deltaT", "ambientTemp", "ambientMeter", "no_parallel", "rotorVoltage"]
+    operating_args = ["Pn_op", "Un_op", "Freq_op", "ambientTemp_op", "ambientMeter_op", "connection_op", "no_parallel_op", "rotorChangeConnection"]
+    fleet_ini = MotorFleet(**{arg: np.array([kwargs[arg] for kwargs in kwargs_list]) for arg in machine_args})
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _, result = calculate_fleet_operating_values(fleet_ini, **{arg: np.array([kwargs[arg] for kwargs in kwargs_list]) for arg in operating_args})
+
+    def is_equal(scalar, vectorized) -> bool:
+        try:
+            scalar, vectorized = float(scalar), float(vectorized)
+        except (TypeError, ValueError):
+            return str(scalar) == str(vectorized)
+        return math.isclose(scalar, vectorized, rel_tol=rel_tol, abs_tol=rel_tol) or (math.isnan(scalar) and math.isnan(vectorized))
+
+    mismatches = []
+    for i, kwargs in enumerate(kwargs_list):
+        df_result, result_rotor_df, _, _, _, change_df = Functions.calculate_operating_values(**kwargs, make_plot=False, trace=False)
+        fields = list(zip(df_result["Name"], df_result["Value"])) + list(zip(result_rotor_df["Name"], result_rotor_df["Value"]))
+        fields += [(name, change) for name, change in zip(change_df["Variable"], change_df["Change"])]
+        for name, value in fields:
+            vectorized = result[name][i].item()
+            if name in change_df["Variable"].values:
+                vectorized = round(float(vectorized), 1)
+            if not is_equal(value, vectorized):
+                mismatches.append((i, name, value, vectorized))
+    for i, name, value, vectorized in mismatches[:20]:
+        print(f"Motor {i}: {name}: scalar {value!r} | fleet {vectorized!r}")
+    print(f"Parity: {count} motors (seed {seed}) | {len(mismatches)} mismatches | {'OK' if len(mismatches) == 0 else 'FAILED'}")
+    return len(mismatches) == 0
+
+# Compare the closed form and the bisection of Rating.get_max_power()
+def check_rating_methods(count: int = 200, seed: int = 0, rel_tol: float = 1e-6) -> bool:
+    '''
+    Maximum power of count seeded random machines (every second one with a catalogue part-load table) at random temperature rise limits\n
+    Return [Bool]: True if method='closed' and method='bracket' agree within rel_tol for both temperature models (NaN on both sides counts as equal)
+    '''
+    import numpy as np
+    from Core import get_part_load_table
+    from Fleet import MotorFleet, stack_part_load_tables
+    from Rating import get_max_power
+
+    rng = np.random.default_rng(seed)
+    kwargs_list = get_random_calculation_kwargs(rng, count)
+    machine_args = ["Pn", "Un", "Freq", "n", "eta", "cosphi", "Ia", "Ma", "Mk", "connection", "deltaT", "ambientTemp", "ambientMeter", "no_parallel"]
+    operating_args = ["Un_op", "Freq_op", "ambientTemp_op", "ambientMeter_op", "connection_op", "no_parallel_op"]
+    machine = {arg: np.array([kwargs[arg] for kwargs in kwargs_list]) for arg in machine_args}
+
+    # Catalogue tables: η and cos(φ) fall towards low load (shape of a typical catalogue, scaled to the nameplate)
+    eta_shape, cosphi_shape = np.array([88, 92, 94, 95, 94.5]) / 95, np.array([0.60, 0.76, 0.83, 0.86, 0.87]) / 0.86
+    tables = [get_part_load_table(kwargs["Pn"], np.minimum(kwargs["eta"] * eta_shape, 99.9), np.minimum(kwargs["cosphi"] * cosphi_shape, 1.0)) if i % 2 == 0 else ()
+              for i, kwargs in enumerate(kwargs_list)]
+    fleet = MotorFleet(**machine, rotorVoltage=0, part_load=stack_part_load_tables(tables, machine["Pn"], machine["eta"], machine["cosphi"]))
+    operating = {arg: np.array([kwargs[arg] for kwargs in kwargs_list]) for arg in operating_args}
+    limit = rng.uniform(30, 130, count)
+
+    closed = get_max_power(fleet, **operating, deltaT_limit=limit, method='closed')
+    bracket = get_max_power(fleet, **operating, deltaT_limit=limit, method='bracket')
+    passed = True
+    for name in closed:
+        with np.errstate(invalid='ignore'):
+            equal = np.isclose(closed[name], bracket[name], rtol=rel_tol, atol=0) | (np.isnan(closed[name]) & np.isnan(bracket[name]))
+        for i in np.flatnonzero(~equal)[:10]:
+            print(f"Motor {i} ({'part-load table' if tables[i] else 'constant η, cos(φ)'}): {name}: closed {closed[name][i]:.6g} | bracket {bracket[name][i]:.6g}")
+        print(f"{name}: {count} motors (seed {seed}) | {np.count_nonzero(~equal)} mismatches | {'OK' if np.all(equal) else 'FAILED'}")
+        passed &= bool(np.all(equal))
+    return passed
+
+
+#####################################################################
+# Latency of the what-if mode (slider ticks)
+#####################################################################
+
+# Operating values of the what-if mode (run_operating_stages() arguments)
+def get_what_if_operating() -> dict:
+    kwargs = get_benchmark_kwargs()
+    return {name: kwargs[name] for name in ["Pn_op", "Un_op", "Freq_op", "ambientTemp_op", "ambientMeter_op", "connection_op", "no_parallel_op", "rotorChangeConnection"]}
+
+# Check the evaluation of the slider ticks against a budget
+def check_what_if_budget(budget: float = 0.05, repeats: int = 50) -> bool:
+    '''
+    Every tick moves one slider (voltage, frequency, power, ambient temperature, altitude) of the same machine and evaluates Functions.evaluate_what_if()\n
+    Return [Bool]: True if the 95th percentile of the ticks is within the budget [s] and no tick imports sympy, tabulate or matplotlib
+    '''
+    import statistics
+    import time
+    import Functions
+    from Core import MotorAsm
+
+    motor_ini = MotorAsm(**benchmark_motor, motor_label="Machine", trace=False)
+    operating = get_what_if_operating()
+    Functions.evaluate_what_if(motor_ini, operating)
+    slider_steps = {"Un_op": 2.0, "Freq_op": 0.5, "Pn_op": 1.0, "ambientTemp_op": 1.0, "ambientMeter_op": 50.0}
+    modules_before = set(sys.modules)
+    times = []
+    for i in range(repeats):
+        name, step = list(slider_steps.items())[i % len(slider_steps)]
+        operating[name] += step
+        start = time.perf_counter()
+        Functions.evaluate_what_if(motor_ini, operating)
+        times.append(time.perf_counter() - start)
+    heavy_modules = sorted({name.split(".")[0] for name in set(sys.modules) - modules_before} & {"sympy", "tabulate", "matplotlib"})
+    p95 = sorted(times)[min(len(times) - 1, int(0.95 * len(times)))]
+    within_budget = p95 <= budget and not heavy_modules
+    print(f"What-if tick: median {statistics.median(times) * 1000:.1f} ms | p95 {p95 * 1000:.1f} ms | Budget: {budget * 1000:.1f} ms"
+          f"{' | Imported: ' + ', '.join(heavy_modules) if heavy_modules else ''} | {'OK' if within_budget else 'FAILED'}")
+    return within_budget
+
+
+#####################################################################
+# Command line entry point
+#####################################################################
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the ASM calculator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_import = subparsers.add_parser("import", help="Fail if the cold import of a module exceeds the budget")
+    parser_import.add_argument("--module", default="Core", help="Module to import (default: Core)")
+    parser_import.add_argument("--budget", type=float, default=0.05, help="Budget of the import time [s]")
+    parser_import.add_argument("--repeats", type=int, default=5, help="Number of fresh interpreters (the fastest run counts)")
+
+    parser_soak = subparsers.add_parser("soak", help="Fail if the memory of the app grows over many calculations")
+    parser_soak.add_argument("--runs", type=int, default=200, help="Number of calculations after the warmup")
+    parser_soak.add_argument("--warmup", type=int, default=20, help="Number of calculations before the memory is measured")
+    parser_soak.add_argument("--max-growth-mb", type=float, default=30, help="Allowed memory growth after the warmup [MB]")
+
+    parser_run = subparsers.add_parser("run", help="Time the hot paths and store the results as JSON")
+    parser_run.add_argument("--output", default=None, help="JSON file for the results")
+    parser_run.add_argument("--sizes", default=",".join(str(size) for size in benchmark_sizes), help="Comma separated batch sizes")
+    parser_run.add_argument("--repeats", type=int, default=5, help="Number of timed runs per case (the fastest run counts)")
+    parser_run.add_argument("--select", default=None, help="Only run cases containing this text")
+    parser_run.add_argument("--baseline", default=None, help="JSON file of an earlier run: fail on regressions")
+    parser_run.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline (0.25 = 25 %%)")
+
+    parser_compare = subparsers.add_parser("compare", help="Fail if a case of the current results is slower than the baseline")
+    parser_compare.add_argument("baseline", help="JSON file of the baseline run")
+    parser_compare.add_argument("current", help="JSON file of the current run")
+    parser_compare.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline (0.25 = 25 %%)")
+
+    parser_memory = subparsers.add_parser("memory", help="Fail if a chain of MotorState needs more than max-ratio of the memory of MotorAsm snapshots")
+    parser_memory.add_argument("--count", type=int, default=2000, help="Number of motors")
+    parser_memory.add_argument("--max-ratio", type=float, default=0.5, help="Allowed memory ratio MotorState chain / MotorAsm chain")
+
+    parser_parity = subparsers.add_parser("parity", help="Fail if calculate_fleet_operating_values() differs from calculate_operating_values() on random machines")
+    parser_parity.add_argument("--count", type=int, default=200, help="Number of random machines")
+    parser_parity.add_argument("--seed", type=int, default=0, help="Seed of the random machines")
+
+    parser_rating = subparsers.add_parser("rating", help="Fail if the closed form and the bisection of Rating.get_max_power() differ (also with part-load tables)")
+    parser_rating.add_argument("--count", type=int, default=200, help="Number of random machines")
+    parser_rating.add_argument("--seed", type=int, default=0, help="Seed of the random machines")
+
+    parser_what_if = subparsers.add_parser("whatif", help="Fail if a slider tick of the what-if mode exceeds the budget")
+    parser_what_if.add_argument("--budget", type=float, default=0.05, help="Budget of the 95th percentile of the ticks [s]")
+    parser_what_if.add_argument("--repeats", type=int, default=50, help="Number of slider ticks")
+
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        return 0 if check_import_budget(args.module, args.budget, args.repeats) else 1
+    elif args.command == "soak":
+        return 0 if run_memory_soak(args.runs, args.warmup, args.max_growth_mb) else 1
+    elif args.command == "parity":
+        return 0 if check_fleet_parity(args.count, args.seed) else 1
+    elif args.command == "rating":
+        return 0 if check_rating_methods(args.count, args.seed) else 1
+    elif args.command == "whatif":
+        return 0 if check_what_if_budget(args.budget, args.repeats) else 1
+    elif args.command == "memory":
+        return 0 if check_state_memory(args.count, args.max_ratio) else 1
+    elif args.command == "run":
+        current = run_benchmarks([int(size) for size in args.sizes.split(",")], args.repeats, args.select)
+        if args.output is not None:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+        if args.baseline is not None:
+            with open(args.baseline) as f:
+                return 0 if compare_benchmarks(json.load(f), current, args.tolerance) else 1
+    elif args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return 0 if compare_benchmarks(baseline, current, args.tolerance) else 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import os
+import copy
+import json
+import math
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+from Parallel import calculate_operating_values_task
+from Diagnostics import StageTimer, time_stage
+
+# Input arguments of calculate_operating_values(), which define the result (all 25)
+calculation_arguments = [
+    "Pn", "Un", "Freq", "ambientTemp", "ambientMeter", "connection", "no_parallel", "Ia", "Ma", "Mk", "eta", "cosphi", "n", "deltaT",
+    "rotorVoltage", "rotorChangeConnection", "motor_label_ini",
+    "Pn_op", "Un_op", "Freq_op", "ambientTemp_op", "ambientMeter_op", "connection_op", "no_parallel_op", "motor_label_op",
+]
+
+# Optional input arguments: name --> default. They enter the key only if they differ from the default (same keys as before they existed)
+optional_calculation_arguments = {"part_load": ()}
+
+#####################################################################
+# Define the result cache
+#####################################################################
+
+class ResultCache:
+    '''
+    Content addressed cache of calculate_operating_values() results (result DataFrames, calculation strings, change table, PNG bytes)\n
+    - max_bytes: Size limit of the memory tier. The least recently used results are evicted first\n
+    - disk_dir: Optional directory of the disk tier. Results evicted from memory stay available there\n
+    Thread safe, so that one cache can be shared by all streamlit sessions
+    '''
+    def __init__(self, max_bytes: int = 64 * 1024**2, disk_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+        self.entries = OrderedDict() # key --> (result, size in bytes)
+        self.size_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    # Get the cached result or calculate it
+    def calculate_operating_values(self, timer: StageTimer | None = None, **kwargs) -> tuple:
+        '''
+        Same inputs as calculate_operating_values()\n
+        timer: Optional StageTimer ("cache lookup", the stages of the calculation on a miss, "cache store")\n
+        Output: df_result, result_rotor_df, calc_str, calc_str_print, png_bytes, change_df (independent copies)
+        '''
+        with time_stage(timer, "cache lookup"):
+            key = get_cache_key(kwargs)
+            result = self.get(key)
+        if result is None:
+            result = calculate_operating_values_task(kwargs, timer=timer)
+            with time_stage(timer, "cache store"):
+                self.put(key, result)
+        with time_stage(timer, "cache copy"):
+            return copy.deepcopy(result)
+
+    def get(self, key: str) -> tuple | None:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+        result = self.read_disk(key)
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self.put(key, result, write_disk=False)
+        return result
+
+    def put(self, key: str, result: tuple, write_disk: bool = True) -> None:
+        size = get_result_size(result)
+        with self.lock:
+            if key in self.entries:
+                self.size_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, size_evicted) = self.entries.popitem(last=False)
+                self.size_bytes -= size_evicted
+                self.evictions += 1
+        if write_disk:
+            self.write_disk(key, result)
+
+    def read_disk(self, key: str) -> tuple | None:
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(os.path.join(self.disk_dir, key + '.pkl'), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def write_disk(self, key: str, result: tuple) -> None:
+        if self.disk_dir is None:
+            return
+        # Write to a temporary file first, so that other processes never read a partial file
+        path = os.path.join(self.disk_dir, key + '.pkl')
+        path_tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(path_tmp, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path_tmp, path)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        '''
+        Return [Dict]: Hit/miss statistics and size of the memory tier
+        '''
+        with self.lock:
+            requests = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / requests if requests > 0 else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "size_bytes": self.size_bytes,
+            }
+
+
+#####################################################################
+# Define the functions that are not part of the cache class
+#####################################################################
+
+# Normalize a single input value
+def normalize_value(value) -> str | float | None:
+    '''
+    Numeric values (int, float, numpy, numeric str) are converted to float, so that e.g. 100, 100.0 and "100" give the same key.
+    Strings are stripped
+    '''
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    value = float(value)
+    if math.isnan(value):
+        return None
+    return value + 0.0 # -0.0 --> 0.0
+
+# Input arguments of calculate_operating_values() from a request
+def get_calculation_kwargs(request: dict) -> dict:
+    '''
+    Return [Dict]: The 25 calculation_arguments and the optional arguments, which are given in the request
+    '''
+    kwargs = {name: request[name] for name in calculation_arguments}
+    kwargs.update({name: request[name] for name in optional_calculation_arguments if name in request})
+    return kwargs
+
+# Hash all 25 input arguments (and the optional arguments, which differ from their default)
+def get_cache_key(kwargs: dict) -> str:
+    '''
+    Return [Str]: sha256 of the normalized input arguments of calculate_operating_values()
+    '''
+    normalized = {name: normalize_value(kwargs[name]) for name in calculation_arguments}
+    for name, default in optional_calculation_arguments.items():
+        if len(kwargs.get(name, default)) > 0:
+            normalized[name] = [[normalize_value(value) for value in point] for point in kwargs[name]]
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+
+# Approximate size of a cached result
+def get_result_size(result: tuple) -> int:
+    '''
+    Return [Int]: Bytes of the DataFrames, strings and PNG of a result
+    '''
+    size = 0
+    for item in result:
+        if item is None:
+            continue
+        elif isinstance(item, (bytes, str)):
+            size += len(item)
+        elif hasattr(item, 'memory_usage'):
+            size += int(item.memory_usage(deep=True).sum())
+    return size
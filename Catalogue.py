@@ -0,0 +1,242 @@
+import argparse
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+
+from Fleet import MotorFleet, calculate_fleet_operating_values, resolve_synchrone_speed
+from Validation import input_rules, validate_columns
+from Batch import machine_columns, change_columns, read_chunks
+
+#####################################################################
+# Define the layout of the catalogue store
+#####################################################################
+
+# Optional column with the designation of the machines (e.g. type key of the manufacturer)
+catalogue_label_column = "Name"
+
+# Columns of the store (one .npy file per column): machine_columns arguments and the index columns
+# - poles: Pole number of the nominal speed (resolve_synchrone_speed())
+# - power_key: Pn / Freq [kW/Hz]. The rows of every pole group are sorted by it
+# - voltage_key: Voltage per branch / Freq [V/Hz] (~ magnetic flux)
+# - voltage_order / voltage_sorted: Rows of every pole group sorted by voltage_key and the sorted keys
+catalogue_file = "catalogue.json"
+float_columns = ["Pn", "Un", "Freq", "n", "eta", "cosphi", "Ia", "Ma", "Mk", "deltaT", "ambientTemp", "ambientMeter", "no_parallel"]
+
+# Widening of the index windows: the stages are skipped for rounded equal values, the exact limits are checked on the survivors
+index_margin = 0.01
+
+
+#####################################################################
+# Define the catalogue class
+#####################################################################
+
+class MotorCatalogue:
+    '''
+    Columnar store of a motor catalogue (directory with one .npy file per column, opened memory mapped)\n
+    The rows are grouped by pole number and sorted by power per Hz, a second permutation sorts them by voltage per Hz.
+    find_candidates() prunes with both indexes and runs the re-rating (MotorFleet) on the remaining rows only
+    '''
+    def __init__(self, catalogue_dir: str, mmap: bool = True):
+        self.catalogue_dir = catalogue_dir
+        with open(os.path.join(catalogue_dir, catalogue_file), encoding='utf-8') as file:
+            meta = json.load(file)
+        self.size = meta["size"]
+        self.groups = {int(poles): tuple(bounds) for poles, bounds in meta["groups"].items()} # poles --> (start, stop)
+        self.columns = {name: np.load(os.path.join(catalogue_dir, name + '.npy'), mmap_mode='r' if mmap else None) for name in meta["columns"]}
+
+    def __len__(self) -> int:
+        return self.size
+
+    # Window of a pole group in a sorted key column
+    def get_window(self, sorted_key: np.ndarray, start: int, stop: int, low: float, high: float) -> tuple[int, int]:
+        '''
+        Return [Int, Int]: First and last+1 position of the keys within [low, high]
+        '''
+        group = sorted_key[start:stop]
+        return start + int(np.searchsorted(group, low, side='left')), start + int(np.searchsorted(group, high, side='right'))
+
+    # Rows, which pass the power and voltage index
+    def get_index_rows(self, poles: list[int], power_window: tuple[float, float], voltage_windows: dict[str, tuple[float, float]]) -> np.ndarray:
+        '''
+        Return [np.ndarray]: Sorted catalogue rows of the given pole groups within the power window and the voltage window of their connection\n
+        - voltage_windows: Connection ('Y', 'D') --> window of voltage_key
+        '''
+        rows = []
+        for pole in poles:
+            if pole not in self.groups:
+                continue
+            start, stop = self.groups[pole]
+            power_start, power_stop = self.get_window(self.columns["power_key"], start, stop, *power_window)
+            for connection, voltage_window in voltage_windows.items():
+                voltage_start, voltage_stop = self.get_window(self.columns["voltage_sorted"], start, stop, *voltage_window)
+                # Enumerate the smaller window and check the other index
+                if power_stop - power_start <= voltage_stop - voltage_start:
+                    group_rows = np.arange(power_start, power_stop)
+                    key = self.columns["voltage_key"][group_rows]
+                    group_rows = group_rows[(key >= voltage_window[0]) & (key <= voltage_window[1])]
+                else:
+                    group_rows = np.asarray(self.columns["voltage_order"][voltage_start:voltage_stop])
+                    group_rows = group_rows[(group_rows >= power_start) & (group_rows < power_stop)]
+                rows.append(group_rows[self.columns["connection"][group_rows] == connection])
+        return np.sort(np.concatenate(rows)) if rows else np.array([], dtype=np.int64)
+
+    # Find the machines, which can be re-rated to an operating point
+    def find_candidates(
+            self,
+            Pn_op: float,
+            Un_op: float,
+            Freq_op: float,
+            ambientTemp_op: float,
+            ambientMeter_op: float,
+            connection_op: str | None = None,
+            no_parallel_op: float | None = None,
+            poles: int | list[int] | None = None,
+            deltaT_limit: float | None = None,
+            temperature_model: str = 'quadratic',
+            flux_tolerance: float = 0.1,
+            power_ratio: tuple[float, float] = (0.5, 1.5)
+        ) -> pd.DataFrame:
+        '''
+        Catalogue machines, which can be operated at the operating point (same physics as calculate_operating_values())\n
+        Inputs:\n
+        - Pn_op, Un_op, Freq_op, ambientTemp_op, ambientMeter_op: Operating point\n
+        - connection_op, no_parallel_op: Operating connection / parallel branches (None: connection of each machine)\n
+        - poles: Required pole number(s) (None: all)\n
+        - deltaT_limit: Allowed temperature rise [K] (e.g. Rating.insulation_class_limits["F"]). None: temperature rise of each machine\n
+        - temperature_model: 'quadratic' (~I^2) or 'linear' (~I)\n
+        - flux_tolerance: Allowed change of the magnetic flux B (~U/f) per branch (0.1 = ±10 %)\n
+        - power_ratio: Allowed range of Pn_op / (Pn * Freq_op / Freq), i.e. of the load of the machine at the operating frequency\n
+        Output: One row per candidate, sorted by Pn: catalogue row, name, machine columns, poles and operating results | <pd.DataFrame>
+        '''
+        if temperature_model not in ['quadratic', 'linear']:
+            raise ValueError(f"ERROR: Function: find_candidates() --> Wrong temperature_model: {temperature_model}. Expected: 'quadratic', 'linear'")
+        poles = sorted(self.groups) if poles is None else list(np.atleast_1d(poles).astype(int))
+
+        # Index windows (widened by index_margin)
+        power_window = (Pn_op / (Freq_op * power_ratio[1]) * (1 - index_margin), Pn_op / (Freq_op * power_ratio[0]) * (1 + index_margin))
+        voltage_windows = {}
+        for connection in ['Y', 'D']:
+            branch_connection = connection if connection_op is None else connection_op.upper()
+            U_branch_op = Un_op / math.sqrt(3) if branch_connection == 'Y' else Un_op
+            voltage_windows[connection] = (U_branch_op / Freq_op / (1 + flux_tolerance) * (1 - index_margin), U_branch_op / Freq_op / (1 - flux_tolerance) * (1 + index_margin))
+        rows = self.get_index_rows(poles, power_window, voltage_windows)
+
+        # Re-rating of the remaining rows
+        machine = {name: np.asarray(self.columns[name][rows]) for name in float_columns + ["connection"]}
+        fleet_ini = MotorFleet(**machine, rotorVoltage=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            _, result = calculate_fleet_operating_values(
+                fleet_ini,
+                Pn_op=Pn_op, Un_op=Un_op, Freq_op=Freq_op, ambientTemp_op=ambientTemp_op, ambientMeter_op=ambientMeter_op,
+                connection_op=fleet_ini.connection if connection_op is None else connection_op,
+                no_parallel_op=fleet_ini.no_parallel if no_parallel_op is None else no_parallel_op,
+                rotorChangeConnection='Do not change'
+            )
+
+        # Exact limits
+        deltaT = result["Temp. Rise (~I^2) [K]"] if temperature_model == 'quadratic' else result["Temp. Rise (~I) [K]"]
+        limit = machine["deltaT"] if deltaT_limit is None else deltaT_limit
+        load = Pn_op / (machine["Pn"] * Freq_op / machine["Freq"])
+        valid = (deltaT <= limit) & (np.abs(result["B (~U/f)"]) <= flux_tolerance * 100) & (load >= power_ratio[0]) & (load <= power_ratio[1])
+
+        candidates = pd.DataFrame({"Row": self.columns["source_row"][rows][valid], catalogue_label_column: self.columns["label"][rows][valid]})
+        for name, arg in machine_columns.items():
+            candidates[name] = machine[arg][valid]
+        candidates["Poles"] = self.columns["poles"][rows][valid]
+        for name in ["Ia/In [%]", "Ma/Mn [%]", "Mk/Mn [%]", "Temp. Rise (~I^2) [K]", "Temp. Rise (~I) [K]"]:
+            candidates["Operating " + name] = result[name][valid]
+        for name, column in change_columns.items():
+            candidates[column] = np.round(result[name][valid], 1)
+        return candidates.sort_values("Pn [kW]", kind='stable').reset_index(drop=True)
+
+
+#####################################################################
+# Define the functions that are not part of the catalogue class
+#####################################################################
+
+# Convert a catalogue file into the columnar store
+def build_catalogue(input_path: str, catalogue_dir: str, chunk_size: int = 100000) -> tuple[int, int]:
+    '''
+    Validate the machine columns of a .csv / .parquet file (same columns as the batch files) and write the store\n
+    Rows with wrong inputs are not added to the catalogue\n
+    Output: Number of stored rows, number of wrong rows
+    '''
+    parts = []
+    wrong = 0
+    row_offset = 0
+    for chunk in read_chunks(input_path, chunk_size):
+        machine_df = pd.DataFrame({name: chunk[name] if name in chunk else input_rules[name].get("default", "") for name in machine_columns}, index=chunk.index)
+        values, error_mask = validate_columns(machine_df)
+        valid = ~error_mask.any(axis=1).to_numpy()
+        part = {arg: values[name][valid] for name, arg in machine_columns.items()}
+        part["label"] = chunk[catalogue_label_column].astype(str).to_numpy()[valid] if catalogue_label_column in chunk else np.full(valid.sum(), '')
+        part["source_row"] = np.arange(row_offset, row_offset + len(chunk))[valid]
+        parts.append(part)
+        wrong += int((~valid).sum())
+        row_offset += len(chunk)
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    columns["label"] = columns["label"].astype(str)
+    columns["connection"] = columns["connection"].astype('<U1')
+
+    # Index columns
+    columns["poles"] = resolve_synchrone_speed(columns["n"], columns["Freq"])["poles"].astype(np.int16)
+    columns["power_key"] = columns["Pn"] / columns["Freq"]
+    columns["voltage_key"] = np.where(columns["connection"] == 'Y', columns["Un"] / math.sqrt(3), columns["Un"]) / columns["Freq"]
+
+    order = np.lexsort((columns["power_key"], columns["poles"]))
+    columns = {name: values[order] for name, values in columns.items()}
+    voltage_order = np.lexsort((columns["voltage_key"], columns["poles"]))
+    columns["voltage_order"] = voltage_order
+    columns["voltage_sorted"] = columns["voltage_key"][voltage_order]
+
+    pole_values, starts = np.unique(columns["poles"], return_index=True)
+    stops = np.append(starts[1:], len(columns["poles"]))
+    groups = {str(poles): [int(start), int(stop)] for poles, start, stop in zip(pole_values.tolist(), starts, stops)}
+
+    os.makedirs(catalogue_dir, exist_ok=True)
+    for name, values in columns.items():
+        np.save(os.path.join(catalogue_dir, name + '.npy'), values)
+    with open(os.path.join(catalogue_dir, catalogue_file), 'w', encoding='utf-8') as file:
+        json.dump({"size": len(columns["poles"]), "columns": list(columns), "groups": groups, "source": os.path.basename(input_path)}, file, indent=1)
+    return len(columns["poles"]), wrong
+
+# Command line entry point
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Indexed motor catalogue: build the store and search machines for an operating point")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_build = subparsers.add_parser("build", help="Convert a .csv / .parquet catalogue into the columnar store")
+    parser_build.add_argument("input", help="Catalogue file with the machine columns of the batch files (and optionally \"Name\")")
+    parser_build.add_argument("catalogue", help="Directory of the store")
+
+    parser_query = subparsers.add_parser("query", help="Find the machines, which can be re-rated to an operating point")
+    parser_query.add_argument("catalogue", help="Directory of the store")
+    parser_query.add_argument("--pn", type=float, required=True, help="Operating power [kW]")
+    parser_query.add_argument("--un", type=float, required=True, help="Operating voltage [V]")
+    parser_query.add_argument("--freq", type=float, default=50, help="Operating frequency [Hz]")
+    parser_query.add_argument("--ambient-temp", type=float, default=40, help="Ambient temperature [°C]")
+    parser_query.add_argument("--height", type=float, default=1000, help="Height above sea level [m]")
+    parser_query.add_argument("--connection", default=None, help="Operating connection Y/D (default: connection of each machine)")
+    parser_query.add_argument("--poles", type=int, nargs='+', default=None, help="Required pole number(s)")
+    parser_query.add_argument("--deltaT-limit", type=float, default=None, help="Allowed temperature rise [K] (default: temperature rise of each machine)")
+    parser_query.add_argument("--flux-tolerance", type=float, default=0.1, help="Allowed change of B (~U/f)")
+    parser_query.add_argument("--output", default=None, help="Write the candidates to a .csv file")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        rows, wrong = build_catalogue(args.input, args.catalogue)
+        print(f"Stored rows: {rows} | Rows with wrong inputs: {wrong}")
+    else:
+        candidates = MotorCatalogue(args.catalogue).find_candidates(
+            args.pn, args.un, args.freq, args.ambient_temp, args.height, args.connection,
+            poles=args.poles, deltaT_limit=args.deltaT_limit, flux_tolerance=args.flux_tolerance
+        )
+        if args.output is not None:
+            candidates.to_csv(args.output, index=False)
+        print(f"Candidates: {len(candidates)}")
+        print(candidates.head(20).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import math
+from typing import Any
+import numpy as np
+
+from Core import part_load_points
+from Fleet import MotorFleet, as_rows, resolve_synchrone_speed
+
+# Parameters of the per-phase equivalent circuit (star equivalent, line currents): result name of estimate_equivalent_circuit()
+circuit_parameters = {
+    "R1": "R1 [Ω]",     # Stator resistance
+    "R2": "R2 [Ω]",     # Rotor resistance (referred to the stator)
+    "X1": "Xσ1 [Ω]",    # Stator leakage reactance
+    "X2": "Xσ2 [Ω]",    # Rotor leakage reactance (referred to the stator)
+    "Xh": "Xh [Ω]",     # Magnetizing reactance
+    "kr": "kr [-]",     # Current displacement in the rotor bars: R2(s) = R2 * (1 + kr * s)
+}
+
+#####################################################################
+# Define the equivalent circuit functions
+#####################################################################
+
+# Torque, current and power factor of the equivalent circuit
+def get_circuit_values(R1: np.ndarray, R2: np.ndarray, X1: np.ndarray, X2: np.ndarray, Xh: np.ndarray, kr: np.ndarray, U_phase: np.ndarray, n_sync: np.ndarray, slip: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    *** Return [np.ndarray, np.ndarray, np.ndarray, np.ndarray]: M [Nm], I [A] (line current), cos(φ), P_in [W] *** \n
+    T-equivalent circuit: Z = R1 + jXσ1 + jXh || (R2(s)/s + jXσ2), M = 3 * |I2|² * R2(s)/s / ω_sync (iron and friction losses are neglected) \n
+    The rotor resistance rises with the slip (current displacement): R2(s) = R2 * (1 + kr * s). All inputs broadcast against each other
+    """
+    R2 = R2 * (1 + kr * slip)
+    Z_rotor = R2 / slip + 1j * X2
+    Z_parallel = 1j * Xh * Z_rotor / (1j * Xh + Z_rotor)
+    Z = R1 + 1j * X1 + Z_parallel
+    I1 = U_phase / Z
+    I2 = I1 * 1j * Xh / (1j * Xh + Z_rotor)
+    omega_sync = 2 * math.pi * n_sync / 60
+    M = 3 * np.abs(I2)**2 * R2 / slip / omega_sync
+    return M, np.abs(I1), Z.real / np.abs(Z), 3 * U_phase * I1.real
+
+# Maximum torque of the equivalent circuit
+def get_circuit_max_torque(R1: np.ndarray, R2: np.ndarray, X1: np.ndarray, X2: np.ndarray, Xh: np.ndarray, U_phase: np.ndarray, n_sync: np.ndarray) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Maximum torque [Nm] *** \n
+    Thevenin equivalent of the stator side: Mk = 3 * U_th² / (2 * ω_sync * (R_th + sqrt(R_th² + (X_th + Xσ2)²))) \n
+    The maximum torque does not depend on the rotor resistance (the slip at Mk does), so the current displacement does not enter
+    """
+    Z_stator = R1 + 1j * (X1 + Xh)
+    U_th = np.abs(U_phase * 1j * Xh / Z_stator)
+    Z_th = 1j * Xh * (R1 + 1j * X1) / Z_stator
+    omega_sync = 2 * math.pi * n_sync / 60
+    return 3 * U_th**2 / (2 * omega_sync * (Z_th.real + np.sqrt(Z_th.real**2 + (Z_th.imag + X2)**2)))
+
+# Fit the equivalent circuit of every motor of a fleet to its nameplate data
+def estimate_equivalent_circuit(fleet: MotorFleet, eta_weight: float = 0.5, leakage_weight: float = 0.1, max_iter: int = 100, tol: float = 1e-10) -> dict[str, np.ndarray]:
+    """
+    Least squares fit of R1, R2, Xσ1, Xσ2, Xh and the current displacement kr of all motors at once (Levenberg-Marquardt, each motor with its own damping). \n
+    Relative residuals at the nominal slip: In, cos(φ), Mn, η (weighted by eta_weight, the circuit has no iron and friction losses),
+    at standstill: Ia, Ma and the maximum torque Mk. A weak prior (leakage_weight) keeps Xσ1 ≈ Xσ2, which the nameplate can not separate. \n
+    The parameters are fitted as logarithms, so they stay positive. \n
+
+    Output: <dict[str, np.ndarray]> \n
+    ---> Values of circuit_parameters (NaN for motors without a pole number), "Fit Error [%]" (RMS of the relative residuals),
+         "U phase [V]" and "n_sync [RPM]" (operating point of the circuit)
+    """
+    U_phase = fleet.Un / math.sqrt(3)
+    n_sync = resolve_synchrone_speed(fleet.n, fleet.Freq)["n_sync"]
+    slip_n = (n_sync - fleet.n) / n_sync
+    slip_start = (n_sync - 0.1) / n_sync # Same speed as the starting torque of get_M_n_curve()
+
+    def get_residuals(p: np.ndarray) -> np.ndarray:
+        R1, R2, X1, X2, Xh, kr = np.exp(p).T
+        M_n, I_n, cosphi_n, P_in = get_circuit_values(R1, R2, X1, X2, Xh, kr, U_phase, n_sync, slip_n)
+        M_a, I_a, _, _ = get_circuit_values(R1, R2, X1, X2, Xh, kr, U_phase, n_sync, slip_start)
+        M_k = get_circuit_max_torque(R1, R2, X1, X2, Xh, U_phase, n_sync)
+        eta = M_n * 2 * math.pi * fleet.n / 60 / P_in * 100
+        return np.stack([
+            I_n / fleet.In - 1,
+            cosphi_n / fleet.cosphi - 1,
+            M_n / fleet.Mn - 1,
+            eta_weight * (eta / fleet.eta - 1),
+            I_a / fleet.Ia_abs - 1,
+            M_a / fleet.Ma_abs - 1,
+            M_k / fleet.Mk_abs - 1,
+            leakage_weight * (p[:, 2] - p[:, 3]),
+        ], axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        p = np.log(get_initial_circuit(fleet, U_phase, slip_n))
+        r = get_residuals(p)
+        cost = np.sum(r**2, axis=1)
+        damping = np.full(len(fleet), 1e-3)
+        active = np.isfinite(cost)
+        step = 1e-7
+        for _ in range(max_iter):
+            if not np.any(active):
+                break
+            idx = np.flatnonzero(active)
+            p_a, r_a = p[idx], r[idx]
+
+            # Jacobian by forward differences (one residual evaluation per parameter for all active motors)
+            J = np.empty(r_a.shape + (6,))
+            for k in range(6):
+                p_k = p_a.copy()
+                p_k[:, k] += step
+                J[:, :, k] = (residuals_subset(get_residuals, p, idx, p_k) - r_a) / step
+
+            # Damped Gauss-Newton step
+            A = np.einsum('nmi,nmj->nij', J, J)
+            g = np.einsum('nmi,nm->ni', J, r_a)
+            A_damped = A + damping[idx, None, None] * (A * np.eye(6) + 1e-12 * np.eye(6))
+            delta = np.clip(np.linalg.solve(A_damped, -g[:, :, None])[:, :, 0], -2, 2)
+            p_new = p_a + delta
+            r_new = residuals_subset(get_residuals, p, idx, p_new)
+            cost_new = np.sum(r_new**2, axis=1)
+
+            better = cost_new < cost[idx]
+            p[idx[better]] = p_new[better]
+            r[idx[better]] = r_new[better]
+            converged = better & (cost[idx] - cost_new <= tol * np.maximum(cost[idx], 1e-30))
+            cost[idx[better]] = cost_new[better]
+            damping[idx] = np.where(better, damping[idx] / 3, damping[idx] * 4)
+            active[idx] = ~converged & (damping[idx] < 1e12)
+
+    values = np.exp(p)
+    result = {name: np.where(np.isfinite(n_sync), values[:, k], np.nan) for k, name in enumerate(circuit_parameters.values())}
+    result["Fit Error [%]"] = np.sqrt(np.mean(r[:, :7]**2, axis=1)) * 100
+    result["U phase [V]"] = U_phase
+    result["n_sync [RPM]"] = n_sync
+    return result
+
+# Evaluate the residuals for a subset of the motors
+def residuals_subset(get_residuals, p: np.ndarray, idx: np.ndarray, p_subset: np.ndarray) -> np.ndarray:
+    '''
+    Return [np.ndarray]: Residuals of the motors idx with the parameters p_subset (the residual function works on the whole fleet)
+    '''
+    p_full = p.copy()
+    p_full[idx] = p_subset
+    return get_residuals(p_full)[idx]
+
+# Start values of the fit
+def get_initial_circuit(fleet: MotorFleet, U_phase: np.ndarray, slip_n: np.ndarray) -> np.ndarray:
+    '''
+    Return [np.ndarray]: R1, R2, Xσ1, Xσ2, Xh, kr (one row per motor) from the classical approximations:\n
+    - Xh from the reactive nominal current, Xσ1 = Xσ2 from the starting current (locked rotor impedance)\n
+    - R2 from the nominal slip (R2/s ≈ U / I_active), R1 = R2, kr = 1
+    '''
+    sinphi = np.sqrt(np.clip(1 - fleet.cosphi**2, 0.01, None))
+    Xh = U_phase / (fleet.In * sinphi)
+    X_leakage = 0.45 * U_phase / fleet.Ia_abs
+    R2 = np.clip(slip_n, 1e-3, None) * U_phase / (fleet.In * fleet.cosphi)
+    kr = np.ones(len(fleet))
+    return np.stack([R2, R2, X_leakage, X_leakage, Xh, kr], axis=1)
+
+# Circuit curves of a fleet
+def get_circuit_curves(circuit: dict[str, np.ndarray], current_factor: np.ndarray | float = 1.0) -> tuple:
+    '''
+    Return [Lambda function, Lambda function]: M(n) [Nm], I(n) [A] of estimate_equivalent_circuit() results\n
+    The speed x has the shape (len(fleet),) or (len(fleet), points). current_factor scales the line current (e.g. to a single branch)
+    '''
+    def evaluate(x: np.ndarray) -> tuple:
+        x = np.asarray(x, dtype=float)
+        R1, R2, X1, X2, Xh, kr, U_phase, n_sync = (as_rows(circuit[name], x.ndim) for name in list(circuit_parameters.values()) + ["U phase [V]", "n_sync [RPM]"])
+        return get_circuit_values(R1, R2, X1, X2, Xh, kr, U_phase, n_sync, (n_sync - x) / n_sync)
+
+    factor = np.asarray(current_factor, dtype=float)
+    return lambda x: evaluate(x)[0], lambda x: evaluate(x)[1] * as_rows(factor, np.ndim(x))
+
+# Circuit curves of a single motor
+def get_motor_circuit_curves(motor, Ia_type: str = 'total') -> tuple:
+    '''
+    Return [Lambda function, Lambda function]: M(n) [Nm], I(n) [A] of the equivalent circuit of a MotorAsm (scalar or array speeds)\n
+    The circuit is fitted once per motor state (MotorAsm.get_derived()). Ia_type 'branch' scales the current to a single stator branch
+    '''
+    circuit = motor.get_derived('circuit', lambda: estimate_equivalent_circuit(MotorFleet.from_motors([motor])))
+    I_scale = motor.get_branch_voltage_current()[0] / motor.In if Ia_type == 'branch' else 1.0
+    M_func, I_func = get_circuit_curves(circuit, I_scale)
+    return lambda x: M_func(np.ravel(x)).reshape(np.shape(x)), lambda x: I_func(np.ravel(x)).reshape(np.shape(x))
+
+# Part-load tables of the equivalent circuit
+def get_part_load_tables(fleet: MotorFleet, circuit: dict[str, np.ndarray] | None = None, load_points: Any = part_load_points, max_iter: int = 60) -> np.ndarray:
+    '''
+    Return [np.ndarray]: Part-load tables (motors, points, 3) with the columns P [kW], η [%], cos(φ) (see MotorFleet.variate_power())\n
+    The slip of every load point is bisected on the mechanical power of the fitted circuit (circuit: result of estimate_equivalent_circuit(), fitted if None).
+    The circuit gives the shape of the curves, the nameplate values stay exact at 100 %:\n
+    - cos(φ)(P) = cos(φ)n * cos(φ)_circuit(P) / cos(φ)_circuit(Pn)\n
+    - Losses(P) = Losses_n * Losses_circuit(P) / Losses_circuit(Pn), η(P) = P / (P + Losses(P))
+    '''
+    if circuit is None:
+        circuit = estimate_equivalent_circuit(fleet)
+    R1, R2, X1, X2, Xh, kr, U_phase, n_sync = (as_rows(circuit[name], 2) for name in list(circuit_parameters.values()) + ["U phase [V]", "n_sync [RPM]"])
+    omega_sync = 2 * math.pi * n_sync / 60
+    load = np.asarray(load_points, dtype=float) / 100
+    slip_n = (n_sync - as_rows(fleet.n, 2)) / n_sync
+
+    def get_values(slip: np.ndarray) -> tuple:
+        M, _, cosphi, P_in = get_circuit_values(R1, R2, X1, X2, Xh, kr, U_phase, n_sync, slip)
+        P_out = M * omega_sync * (1 - slip)
+        return P_out, cosphi, P_in - P_out
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Bisection between no-load and the slip of the maximum power (the power increases monotonically in between)
+        P_out_n, cosphi_c_n, losses_c_n = get_values(slip_n)
+        slip_grid = np.linspace(0, 0.5, 129)[1:]
+        low = np.zeros((len(fleet), len(load)))
+        high = np.broadcast_to(slip_grid[np.argmax(np.nan_to_num(get_values(slip_grid)[0], nan=-np.inf), axis=1)][:, None], low.shape).copy()
+        target = P_out_n * load
+        for _ in range(max_iter):
+            middle = (low + high) / 2
+            above = get_values(middle)[0] > target
+            low = np.where(above, low, middle)
+            high = np.where(above, middle, high)
+        _, cosphi_c, losses_c = get_values((low + high) / 2)
+
+        cosphi = np.clip(as_rows(fleet.cosphi, 2) * cosphi_c / cosphi_c_n, 0, 1)
+        losses = (100 / as_rows(fleet.eta, 2) - 1) * losses_c / losses_c_n # Relative to Pn
+        eta = load / (load + losses) * 100
+    return np.stack([as_rows(fleet.Pn, 2) * load, eta, cosphi], axis=2)
+
+# Part-load table of a single motor
+def get_motor_part_load_table(motor, load_points: Any = part_load_points) -> tuple:
+    '''
+    Return [Tuple]: Part-load table ((P [kW], η [%], cos(φ)), ...) of the equivalent circuit of a MotorAsm (for MotorAsm(part_load=...))
+    '''
+    circuit = motor.get_derived('circuit', lambda: estimate_equivalent_circuit(MotorFleet.from_motors([motor])))
+    return tuple(tuple(float(value) for value in point) for point in get_part_load_tables(MotorFleet.from_motors([motor]), circuit, load_points)[0])
@@ -0,0 +1,1037 @@
+import sys 
+import math 
+import re
+import bisect
+import threading
+from typing import Any, NamedTuple
+
+from Diagnostics import time_stage
+
+# Core physics of the asynchronous machine: only the standard library (and the stdlib based Diagnostics) is imported here.
+# sympy (reference curve mode) and tabulate (motor table) are imported on first use.
+
+#####################################################################
+# Define the motor class
+#####################################################################
+
+class MotorAsm:
+    def __init__(self, 
+                 Pn: float,             # Nominal Power [kW]
+                 Un: int,               # Nominal Voltage [V]
+                 Freq: int,             # Nominal Frequency [Hz]
+                 n: int,                # Rotational speed [RPM]
+                 eta: float,            # Efficiency [%]
+                 cosphi: float,         # Cosinus Phi
+                 Ia: float,             # Starting Current [%]
+                 Ma: float,             # Starting Torque [%]
+                 Mk: float,             # Maximum Torque [%]
+                 connection: str,       # Connection (Y, D)
+                 deltaT: float,         # Temperature Rise [K]
+                 ambientTemp: int,      # Ambient Temperature [°C]
+                 ambientMeter: int,     # Operation Height Above Sea Level [m]
+                 no_parallel: int,      # Number of Parallel Circuits on the Stator
+                 rotorVoltage: float,   # Rotor Voltage [V]
+                 motor_label: str,      # Label of the motor for plots
+                 trace: bool = True,    # Record the calculation steps in self.trace (False: no records, for throughput runs)
+                 part_load: tuple = ()  # Part-load table ((P [kW], η [%], cos(φ)), ...), see get_part_load_table(). Empty: η and cos(φ) do not depend on the power
+                 ):
+        self.trace          = None
+        self.derived        = {}  # Derived values (n_sync, branch values, curve coefficients, sampled curves), see get_derived()
+        self.Pn             = Pn                
+        self.Un             = Un                
+        self.Freq           = Freq              
+        self.n              = n                 
+        self.eta            = eta               
+        self.cosphi         = cosphi            
+        self.Ia             = Ia                
+        self.Ma             = Ma                
+        self.Mk             = Mk                
+        self.connection     = connection        
+        self.deltaT_l       = deltaT  # Temperature Rise [K], assumed to increase lineary with the current in the coils
+        self.deltaT_q       = deltaT  # Temperature Rise [K], assumed to increase quadratic with the current in the coils
+        self.ambientTemp    = ambientTemp       
+        self.ambientMeter   = ambientMeter      
+        self.no_parallel    = no_parallel       
+        self.rotorVoltage   = rotorVoltage  
+        if rotorVoltage > 0:
+            self.update_rotor_current()
+        else:
+            self.rotorCurrent = 0
+        self.rotorConnection = ''
+        self.part_load      = tuple(tuple(point) for point in part_load)
+        self.motor_label    = motor_label 
+        self.trace          = CalcTrace() if trace else None
+
+        self.In = self.get_In(self.Pn, self.cosphi, self.eta, self.Un)
+        self.Mn = self.get_Mn(self.Pn, self.n)
+        self.Ia_abs = self.Ia / 100 * self.In
+        self.Ma_abs = self.Ma / 100 * self.Mn
+        self.Mk_abs = self.Mk / 100 * self.Mn
+    
+    # Nennleistung verändern (umstempeln) ohne andere Parameter zu verändern
+    def variate_power(self, Pn_new: float) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Operate the motor with a different power.\n
+        Frequency=Const., Voltage=Const. \n
+        η and cos(φ) follow the part-load table (self.part_load), without table they stay unchanged
+        """
+        # Cache old values
+        Pn_old = self.Pn
+        In_old = self.In
+        Ia_old = self.Ia
+        Ma_old = self.Ma
+        Mk_old = self.Mk
+
+        if round(Pn_new) == round(self.Pn):
+            return
+        self.invalidate_derived()
+
+        # Efficiency and power factor at the new power (unchanged without part-load table)
+        if self.part_load:
+            eta_old = self.eta
+            cosphi_old = self.cosphi
+            self.eta, self.cosphi = interpolate_part_load(self.part_load, Pn_new)
+            if self.trace is not None:
+                self.trace.add('power', 'part_load',
+                               {'eta_old': eta_old, 'cosphi_old': cosphi_old, 'P_min': self.part_load[0][0], 'P_max': self.part_load[-1][0]},
+                               {'Pn': Pn_new, 'eta': self.eta, 'cosphi': self.cosphi})
+        
+        # Calculate the new nominal torque and current from the new Power
+        self.Mn = self.get_Mn(Pn_new, self.n)
+        self.In = self.get_In(Pn_new, self.cosphi, self.eta, self.Un)
+
+        # Update the %-values of Ia, Ma, Mn
+        self.Ia = self.Ia_abs / self.In * 100
+        self.Ma = self.Ma_abs / self.Mn * 100
+        self.Mk = self.Mk_abs / self.Mn * 100
+
+        # Update the Power value
+        self.Pn = Pn_new
+
+        # Record the conducted calculation
+        if self.trace is not None:
+            self.trace.add('power', 'power',
+                           {'Pn_old': Pn_old, 'In_old': In_old, 'cosphi': self.cosphi, 'eta': self.eta, 'Un': self.Un, 'n': self.n, 'Ia_old': Ia_old, 'Ma_old': Ma_old, 'Mk_old': Mk_old},
+                           {'Pn': self.Pn, 'In': self.In, 'Mn': self.Mn, 'Ia': self.Ia, 'Ma': self.Ma, 'Mk': self.Mk})
+
+        # Update the temperature Rise
+        self.update_deltaT(In_old, self.In)
+        
+    # Frequenz und Spannung im gleichen Maße erhöhen/veringern. Magnetischer Fluss bleibt konstant
+    def variate_freq_volt_konstMagnFlux(self, Freq_new: int) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Increase/decrease frequency and voltage by the same factor. \n
+        Magnetic_Flux = Const., U/Freq=Const. \n
+        Nominal power and RPM increase by the factor Freq_new/Freq_old \n
+        Nominal, max. and starting torque stay unchanged \n
+        Nominal and starting current stay unchanged
+        """
+        # Cache old values
+        Freq_old = self.Freq
+        Pn_old = self.Pn
+        Un_old = self.Un
+        n_old = self.n
+
+        if round(Freq_new) == round(self.Freq):
+            return
+        self.invalidate_derived()
+        
+        # Update the values of Pn, Un, n, Freq
+        factor = Freq_new / self.Freq
+        self.Pn = factor * self.Pn
+        self.n = factor * self.n
+        self.Un = factor * self.Un
+        self.Freq = Freq_new
+        self.part_load = tuple((factor * P, eta, cosphi) for P, eta, cosphi in self.part_load) # Same load ratio, same η and cos(φ)
+
+        # Record the conducted calculation
+        if self.trace is not None:
+            self.trace.add('freq_volt', 'freq_volt_konst_flux',
+                           {'Freq_old': Freq_old, 'Un_old': Un_old, 'Pn_old': Pn_old, 'n_old': n_old},
+                           {'factor': factor, 'Freq': self.Freq, 'Un': self.Un, 'Pn': self.Pn, 'n': self.n})
+
+    # Spannung erhöhen / Veringern
+    def variate_voltage(self, Un_new: int) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Increase/decrease voltage \n
+        Nominal power and frequency stay unchanged \n
+        Starting values (torque, current), max. torque and nominal current are afected \n
+        Temperature Rise is afected
+        """
+        # Cache old values
+        Un_old = self.Un
+        In_old = self.In
+        Ma_old = self.Ma
+        Mk_old = self.Mk
+        Ia_abs_old = self.Ia_abs
+
+        if round(Un_new) == round(self.Un):
+            return
+        self.invalidate_derived()
+        
+        # Calculate new Ia, Ma, Mk
+        factor = Un_new / Un_old
+        self.Un = Un_new
+        self.Ma = factor**2 * Ma_old # Starting torque [%] proportional to U^2
+        self.Mk = factor**2 * Mk_old # Maximum Torque [%] proportional to U^2
+        self.In = self.get_In(self.Pn, self.cosphi, self.eta, self.Un) # Update the value of In
+        self.Ia_abs = factor * Ia_abs_old # Starting current [A] proportional to U
+        self.Ia = self.Ia_abs / self.In * 100
+        self.refresh_abs_Ia_Ma_Mn() # Ubdate the absolute values of Ia_abs, Ma_abs, Mn_abs
+
+        # Record the conducted calculation
+        if self.trace is not None:
+            self.trace.add('voltage', 'voltage',
+                           {'Un_old': Un_old, 'Pn': self.Pn, 'cosphi': self.cosphi, 'eta': self.eta, 'Ia_abs_old': Ia_abs_old, 'Ma_old': Ma_old, 'Mk_old': Mk_old},
+                           {'Un': self.Un, 'In': self.In, 'Ia_abs': self.Ia_abs, 'Ia': self.Ia, 'Ma': self.Ma, 'Mk': self.Mk})
+
+        # Calculate new deltaT
+        self.update_deltaT(In_old, self.In)
+
+    # Motor in D / Y umschalten
+    def variate_connection(self, connection_new: str) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Connect stator as Y or D \n
+        Nominal power, frequency, starting %-values and max. torque stay unchanged \n
+        Nominal current and voltage are afected
+        """
+        In_old = self.In
+        Un_old = self.Un
+        if connection_new != self.connection:
+            self.invalidate_derived()
+        try:
+            if connection_new == self.connection:
+                return
+            elif connection_new == "Y":
+                self.In = self.In / math.sqrt(3) # Current increases by sqrt(3) from D to Y
+                self.Un = self.Un * math.sqrt(3) # Voltage decreases by sqrt(3) from D to Y
+                self.refresh_abs_Ia_Ma_Mn() # Refresh absolute starting current, since the nominal current changed
+                self.connection = connection_new # Update connection string value
+                formula = 'connection_D_Y'
+            elif connection_new == "D":
+                self.In = self.In * math.sqrt(3) # Current decreases by sqrt(3) from Y to D
+                self.Un = self.Un / math.sqrt(3) # Voltage increases by sqrt(3) from Y to D
+                self.refresh_abs_Ia_Ma_Mn() # Refresh absolute starting current, since the nominal current changed
+                self.connection = connection_new # Update connection string value
+                formula = 'connection_Y_D'
+            else:
+                raise # Raise Exception
+        except Exception as e:
+            print("\nERROR: Class: MotorAsm; Function: variate_connection() --> Wrong Input:", connection_new)
+            sys.exit(1)
+
+        # Record the conducted calculation
+        if self.trace is not None:
+            self.trace.add('connection', formula, {'In_old': In_old, 'Un_old': Un_old}, {'In': self.In, 'Un': self.Un})
+
+    # Motor in Parallel schalten oder andere Kombination wählen
+    def variate_number_of_parallel_circuits(self, no_parallel_new: int) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Change the connection of the branches of the stator. E.g. two branches in parallel \n
+        Nominal power, frequency, starting %-values and max. torque stay unchanged \n
+        Nominal current and voltage are afected
+        """
+        # Define old values
+        Un_old = self.Un 
+        In_old = self.In
+        no_parallel_old = self.no_parallel
+
+        if no_parallel_new == self.no_parallel:
+            return
+        self.invalidate_derived()
+        
+        # Calculate new voltage and current
+        self.no_parallel = no_parallel_new
+        self.Un = Un_old * (no_parallel_old / no_parallel_new)
+        self.In = In_old * (no_parallel_new / no_parallel_old)
+        self.refresh_abs_Ia_Ma_Mn()
+        
+        # Record the conducted calculation
+        if self.trace is not None:
+            self.trace.add('parallel_circuits', 'parallel_circuits',
+                           {'no_parallel_old': no_parallel_old, 'Un_old': Un_old, 'In_old': In_old},
+                           {'no_parallel': no_parallel_new, 'Un': self.Un, 'In': self.In})
+    
+    # Aufstellhöhe variieren
+    def variate_ambient_height(self, ambient_height_new) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Change the operating height above sea level. Correct DeltaT accordingly \n
+        According to IEC60034-1:\n
+        - If Machine tested at <=1000m and operation >1000m ==> dT_test = dT_operation * (1 - [H - 1000m] / 10000m)\n
+        - If Machine tested at >1000m and operation <=1000m ==> dT_test = dT_operation * (1 + (H_Test - 1000m)/10000m)\n
+        - If Machine tested at >1000m and operation >1000m ==> dT_test = dT_operation * (1 + (H_Test - H)/10000m)\n
+        - If Machine tested at >4000m or operation >4000m ==> To be agreed. No reference from IEC60034-1
+        """
+        self.invalidate_derived()
+        dT_lin_old = self.deltaT_l
+        dT_quad_old = self.deltaT_q
+        ambient_height_old = self.ambientMeter
+        self.ambientMeter = ambient_height_new
+        if ambient_height_old <= 1000:
+            if ambient_height_new > 1000:
+                divisor = 1 - (ambient_height_new - 1000)/10000
+                formula = 'height_test_below_1000'
+            else:
+                return # If Operation at <1000m and Testing at <1000m, no correction needed
+        elif ambient_height_old > 1000:
+            if ambient_height_new < 1000:
+                divisor = 1 + (ambient_height_old - 1000)/10000
+                formula = 'height_operation_below_1000'
+            else:
+                divisor = 1 + (ambient_height_old - ambient_height_new)/10000
+                formula = 'height_both_above_1000'
+        else:
+            raise ValueError(f'Error: function variate_ambient_height() --> Wrong value {ambient_height_old=}')
+        self.deltaT_l = self.deltaT_l / divisor
+        self.deltaT_q = self.deltaT_q / divisor
+
+        # Record the conducted calculation
+        if self.trace is not None:
+            self.trace.add('ambient_height', formula,
+                           {'height_old': ambient_height_old, 'height_new': ambient_height_new, 'dT_l_old': dT_lin_old, 'dT_q_old': dT_quad_old},
+                           {'dT_l': self.deltaT_l, 'dT_q': self.deltaT_q})
+    
+    # Umgebungstemperatur variieren
+    def variate_ambient_temp(self, ambient_temp_new) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Change the operating temperature. Correct DeltaT accordingly \n
+        According to IEC60034-1 Tab. 9, 1a and 1c: \n
+        - deltaT_limit = deltaT_limit_old - (T_ambient_new - T_ambient_old) \n
+        - Exception: For 0<= Temp_ambient <= 40 and height <1000m: If Temp. Class - (Limit Temp. Rise + 40°C) > 5K, Correction factor is needed\n
+                --> I ignored this exception \n
+                --> Correction Factor: (1 - (thermal class - (40°C + limit temp. Rise)) / 80K) \n
+        Alternative Method in catalogue: Multiply by factor (5% per 5°C). This gives similar results, for deltaT<100K a bit lower correction.\n
+        I choosed the option between both, that gives the higher deltaT, since this is a more conservative value.
+        """
+        self.invalidate_derived()
+        dT_lin_old = self.deltaT_l
+        dT_quad_old = self.deltaT_q
+        ambient_temp_old = self.ambientTemp
+        self.ambientTemp = ambient_temp_new
+        
+        # Correction by substraction of temp. from deltaT
+        add_deltaT_l = self.deltaT_l + (ambient_temp_new - ambient_temp_old)
+        add_deltaT_q = self.deltaT_q + (ambient_temp_new - ambient_temp_old)
+
+        # Correction by factor
+        factor = 1 + (ambient_temp_new - ambient_temp_old)/100
+        fac_deltaT_l = factor * self.deltaT_l
+        fac_deltaT_q = factor * self.deltaT_q
+
+        # Result
+        self.deltaT_l = max([add_deltaT_l, fac_deltaT_l])
+        self.deltaT_q = max([add_deltaT_q, fac_deltaT_q])
+
+        # Record the conducted calculation
+        if self.trace is not None and round(ambient_temp_new) != round(ambient_temp_old):
+            self.trace.add('ambient_temp', 'ambient_temp',
+                           {'temp_old': ambient_temp_old, 'temp_new': ambient_temp_new, 'factor': factor, 'dT_l_old': dT_lin_old, 'dT_q_old': dT_quad_old},
+                           {'dT_l': self.deltaT_l, 'dT_q': self.deltaT_q,
+                            'method_l': 'add' if add_deltaT_l > fac_deltaT_l else 'factor',
+                            'method_q': 'add' if add_deltaT_q > fac_deltaT_q else 'factor'})
+
+    # Rotor in D/Y umschalten
+    def variate_connection_rotor(self, rotorChangeConnection: str) -> None:
+        '''Variate the connection of the rotor \n
+        - Input: rotorChangeConnection <Str> - Expected: "Do not change", "Y --> D", "D --> Y"
+        - Calculation steps are recorded in self.trace
+        '''
+        self.invalidate_derived()
+        rotorVoltage_old = self.rotorVoltage
+        # Change: Y --> D
+        if rotorChangeConnection == 'Y --> D':
+            self.rotorVoltage = round(self.rotorVoltage / math.sqrt(3))
+            self.rotorConnection = 'D'
+            formula = 'rotor_connection_Y_D'
+
+        # Change: D --> Y
+        elif rotorChangeConnection == 'D --> Y':
+            self.rotorVoltage = round(self.rotorVoltage * math.sqrt(3))
+            self.rotorConnection = 'Y'
+            formula = 'rotor_connection_D_Y'
+        
+        # If any other input, do not variate connection
+        else:
+            self.rotorConnection = ''
+            return
+
+        # Record the conducted calculation
+        if self.trace is not None:
+            self.trace.add('rotor_connection', formula, {'rotorVoltage_old': rotorVoltage_old}, {'rotorVoltage': self.rotorVoltage})
+
+    # Variate the rotor Voltage
+    def variate_voltage_rotor(self, statorVoltage_ini: float, statorVoltage_res: float) -> None:
+        '''
+        Variate rotor voltage from a change in stator voltage (Un_Rotor ~ Un_Stator)\n
+        Update self.rotorVoltage accordingly\n
+        Calculation steps are recorded in self.trace
+        '''
+        self.invalidate_derived()
+        rotorVoltage_old = self.rotorVoltage
+        if round(statorVoltage_ini) != round(statorVoltage_res):
+            self.rotorVoltage = round(rotorVoltage_old * statorVoltage_res / statorVoltage_ini)
+            if self.trace is not None:
+                self.trace.add('rotor_voltage', 'rotor_voltage',
+                               {'rotorVoltage_old': rotorVoltage_old, 'statorVoltage_ini': statorVoltage_ini, 'statorVoltage_res': statorVoltage_res},
+                               {'rotorVoltage': self.rotorVoltage})
+
+    # Update the rotor current
+    def update_rotor_current(self) -> None:
+        '''
+        Update the self.rotorCurrent from self.Pn, self.rotorVoltage\n
+        Calculation steps are recorded in self.trace
+        '''
+        self.rotorCurrent = round(self.Pn * 1000 * 1.1 / (self.rotorVoltage * math.sqrt(3)), 1)
+        if self.trace is not None:
+            self.trace.add('rotor_current', 'rotor_current', {'Pn': self.Pn, 'rotorVoltage': self.rotorVoltage}, {'rotorCurrent': self.rotorCurrent})
+
+    # In berechnen
+    def get_In(self, Pn: float, cosphi: float, eta: float, Un: int) -> float:
+        """
+        *** Return [Float]: Calculated nominal current *** \n
+        Calculate the nominal current of the motor from the input parameters (nominal power, cos_phi, efficiency, nominal voltage)
+        """
+        In = Pn * 1000 / ( math.sqrt(3) * cosphi * eta / 100 * Un )
+        return In
+
+    # Mn berechnen
+    def get_Mn(self, Pn: float, n: int) -> float:
+        """
+        *** Return [Float]: Calculated nominal torque *** \n
+        Calculate the nominal torque of the motor from the input parameters (nominal power, nominal speed)
+        """
+        Mn = Pn * 1000 / ( 2*3.1415926536*n/60 ) 
+        return Mn
+
+    # Aktualisiere die Absolutwerte anhand der Prozentangaben von Ia, Ma, Mk
+    def refresh_abs_Ia_Ma_Mn(self) -> None:
+        """
+        *** Return [None]: None *** \n
+        Update the absolute starting current, starting torque and max. torque from the percentual values and nominal values
+        """
+        self.invalidate_derived()
+        self.Ia_abs = self.Ia / 100 * self.In
+        self.Ma_abs = self.Ma / 100 * self.Mn
+        self.Mk_abs = self.Mk / 100 * self.Mn
+
+    # Aktualisiert die Werte von deltaT in Abhängigkeit von einer Stromänderung
+    def update_deltaT(self, In_old: float, In_new: float) -> None:
+        """
+        *** Return [None]: None (calculation steps are recorded in self.trace) *** \n
+        Update the value of temperature rise by an increase/decrease in current \n
+        Assumed relations: dT prop. I, dT prop. I^2
+        """
+        deltaT_l_old = self.deltaT_l
+        deltaT_q_old = self.deltaT_q
+
+        self.deltaT_l = In_new / In_old * self.deltaT_l # Assumption: deltaT ~ I 
+        self.deltaT_q = (In_new / In_old)**2 * self.deltaT_q # Assumption: deltaT ~ I^2
+        
+        if self.trace is not None:
+            self.trace.add('deltaT', 'deltaT_current',
+                           {'In_old': In_old, 'In_new': In_new, 'dT_l_old': deltaT_l_old, 'dT_q_old': deltaT_q_old},
+                           {'dT_l': self.deltaT_l, 'dT_q': self.deltaT_q})
+    
+    # Strom in einem Strang des Stators berechnen
+    def get_branch_voltage_current(self) -> float | int:
+        """
+        *** Return [Float, Int]: I_branch, U_branch *** \n
+        Current and voltage in a single branch of the stator (cached, see calculate_branch_voltage_current())
+        """
+        return self.get_derived('branch', self.calculate_branch_voltage_current)
+
+    def calculate_branch_voltage_current(self) -> float | int:
+        """
+        *** Return [Float, Int]: I_branch, U_branch *** \n
+        Calculate the current and voltage in a single branch of the stator
+        """
+        # Calculate the voltage and current in a single phase
+        if self.connection == "Y":
+            U_branch = self.Un / math.sqrt(3)
+            I_phase = self.In
+        elif self.connection == "D":
+            U_branch = self.Un
+            I_phase = self.In / math.sqrt(3)
+        else:
+            raise ValueError("ERROR: Function: get_branch_voltage_current() --> Connection must be 'Y' or 'D'")
+
+        # Calculate the current and voltage in a single branch of a single phase
+        I_branch = I_phase / self.no_parallel
+        return I_branch, U_branch
+    
+    # Print Values of the motor in a table
+    def print_motor_values(self, show_print: bool=True) -> str:
+        """
+        *** Return [Str]: Table String *** \n
+        Print the motor parameters in a table
+        """
+        from tabulate import tabulate
+
+        print_text = tabulate(
+                [
+                    ["Nominal Power [kW]", round(self.Pn)],
+                    ["Nominal Voltage [V]", round(self.Un)],
+                    ["Nominal Frequency [Hz]", round(self.Freq)],
+                    ["Nominal Speed [min-1]", round(self.n)],
+                    ["Efficiency [%]", round(self.eta, 2)],
+                    ["Cosinus Phi", round(self.cosphi, 2)],
+                    ["Temperature Rise (dT~I) [K]", round(self.deltaT_l)],
+                    ["Temperature Rise (dT~I^2) [K]", round(self.deltaT_q)],
+                    ["", ""],
+                    ["Connection (Y, D)", self.connection],
+                    ["Number of Parallel Circuits (Stator)", self.no_parallel],
+                    ["", ""],
+                    ["Nominal Current [A]", round(self.In, 1)],
+                    ["Starting Current [%]", round(self.Ia)],
+                    ["Starting Current [A]", round(self.Ia_abs)],
+                    ["", ""],
+                    ["Nominal Torque [Nm]", round(self.Mn)],
+                    ["Starting Torque [%]", round(self.Ma)],
+                    ["Starting Torque [Nm]", round(self.Ma_abs)],
+                    ["Maximum Torque [%]", round(self.Mk)],
+                    ["Maximum Torque [Nm]", round(self.Mk_abs)],
+                    ["", ""],
+                    ["Current in a Single Stator Branch [A]", round(self.get_branch_voltage_current()[0], 1)],
+                    ["Voltage in a Single Stator Branch [V]", round(self.get_branch_voltage_current()[1])],
+                    ["", ""],
+                    ["Ambient Temperature [°C]", self.ambientTemp],
+                    ["Operation Height [m]", self.ambientMeter],
+                    ["", ""],
+                    ["Rotor Voltage [V]", round(self.rotorVoltage)],
+                ],
+                headers=['Variable', 'Value'], 
+                tablefmt='outline'
+            )
+        
+        if show_print:
+            print(print_text)
+
+        return print_text
+    
+    # Get M_n curve of the motor
+    def get_M_n_curve(self, curve_mode: str = 'numeric') -> Any:
+        """
+        *** Return [Lambda function]: M(n) curve *** \n
+        *** Input [str]: 'numeric' / 'sympy' / 'circuit' *** \n
+            --> Solve slip_at_Mk in closed form ('numeric') or symbolically as reference ('sympy'),
+                or evaluate the equivalent circuit fitted to the nameplate ('circuit', see Circuit.estimate_equivalent_circuit())
+        Calculate an approximated M-n-curve of the motor
+        """
+        # Get synchrone speed
+        n_sync = self.get_n_sync()
+
+        if curve_mode == 'circuit':
+            from Circuit import get_motor_circuit_curves
+            return get_motor_circuit_curves(self)[0]
+        elif curve_mode == 'numeric':
+            slip_at_Mk = self.get_derived('slip_at_Mk', lambda: get_slip_at_Mk(self.Ma_abs, self.Mk_abs, n_sync))
+            Mk_abs = self.Mk_abs
+
+            # Kloss-like equation in terms of speed as plain numpy function
+            return lambda x: 2 * Mk_abs / ( (n_sync * slip_at_Mk) / (n_sync - x) + (n_sync - x) / (n_sync * slip_at_Mk) )
+        elif curve_mode != 'sympy':
+            raise ValueError("ERROR: Function: get_M_n_curve() --> Curve mode must be 'numeric', 'sympy' or 'circuit'")
+
+        def fit_sympy() -> Any:
+            from sympy import symbols, Eq, solve, lambdify
+
+            x = symbols('x')
+            slip_at_Mk = symbols('slip_at_Mk')
+
+            # Define function | Kloss-like equation in terms of speed
+            M = 2 * self.Mk_abs / ( (n_sync * slip_at_Mk) / (n_sync - x) + (n_sync - x) / (n_sync * slip_at_Mk) )
+
+            # Equation to solve
+            eq1 = Eq(M.subs(x, 0.1), self.Ma_abs)
+
+            # Solve equation
+            solution = solve([eq1], (slip_at_Mk))
+            slip_at_Mk_solution = min(solution)[0] # Choose the lower value of slip_at_Mk. The equation gets two results, one of them >1. A slip >1 does not make sense foran application as motor.
+
+            # Lambdify the symbolic expression for fast numeric evaluation
+            return lambdify(x, M.subs(slip_at_Mk, slip_at_Mk_solution), modules='numpy')
+        return self.get_derived(('M_n_curve', 'sympy'), fit_sympy)
+    
+    # Get I_n curve of the motor
+    def get_I_n_curve(self, Ia_type: str = 'total', curve_mode: str = 'numeric') -> Any:
+        """
+        *** Return [Lambda function]: I(n) curve *** \n
+        *** Input [str]: 'total' / 'branch' *** \n
+            --> Consider the total current of the motor ('total') or the one in a single branch ('branch')
+        *** Input [str]: 'numeric' / 'sympy' / 'circuit' *** \n
+            --> Solve the exponent k in closed form ('numeric') or symbolically as reference ('sympy'), or evaluate the fitted equivalent circuit ('circuit')
+        Calculate an approximated I-n-curve of the motor 
+        """
+        # Get synchrone speed
+        n_sync = self.get_n_sync()
+
+        if Ia_type == 'total':
+            Ia_abs = self.Ia_abs
+        elif Ia_type == 'branch':
+            Ia_abs = self.get_branch_voltage_current()[0] * self.Ia / 100
+        else:
+            raise ValueError("ERROR: Function: get_I_n_curve() --> Current Type must be 'total' or 'branch'")
+
+        if curve_mode == 'circuit':
+            from Circuit import get_motor_circuit_curves
+            return get_motor_circuit_curves(self, Ia_type)[1]
+        elif curve_mode == 'numeric':
+            k = self.get_derived(('current_exponent', Ia_type), lambda: get_current_exponent(Ia_abs, self.In, self.n, n_sync))
+
+            # Current curve as plain numpy function
+            return lambda x: Ia_abs * ( n_sync / (n_sync - x) )**k
+        elif curve_mode != 'sympy':
+            raise ValueError("ERROR: Function: get_I_n_curve() --> Curve mode must be 'numeric', 'sympy' or 'circuit'")
+
+        def fit_sympy() -> Any:
+            from sympy import symbols, Eq, solve, lambdify
+
+            x = symbols('x')
+            k = symbols('k')
+
+            # Define function and its derivates
+            I = Ia_abs * ( n_sync / (n_sync - x) )**k
+
+            # Equation to solve
+            eq1 = Eq(I.subs(x, self.n), self.In)
+
+            # Solve equation
+            k_solution = solve([eq1], k)[0][0]
+
+            # Lambdify the symbolic expression for fast numeric evaluation
+            return lambdify(x, I.subs(k, k_solution), modules='numpy')
+        return self.get_derived(('I_n_curve', Ia_type, 'sympy'), fit_sympy)
+
+    # Synchrone speed of the motor
+    def get_n_sync(self) -> float:
+        """
+        *** Return [Float]: Synchrone Speed [RPM] (cached get_n_synchrone()) *** \n
+        """
+        return self.get_derived('n_sync', lambda: get_n_synchrone(self.n, self.Freq))
+
+    # Derived value from the cache of the motor
+    def get_derived(self, key: Any, compute: Any) -> Any:
+        """
+        *** Return [Any]: Cached value of key, compute() on the first call *** \n
+        The cache is cleared by every variate_* method and refresh_abs_Ia_Ma_Mn(). Direct writes to the motor values must call invalidate_derived()
+        """
+        counters = get_derived_cache_counters()
+        if key in self.derived:
+            counters["hits"] += 1
+            return self.derived[key]
+        counters["misses"] += 1
+        value = self.derived[key] = compute()
+        return value
+
+    # Clear the cache of derived values
+    def invalidate_derived(self) -> None:
+        self.derived = {} # New dict instead of clear(): a shallow copy of the motor keeps its own cache
+        get_derived_cache_counters()["invalidations"] += 1
+
+    # Snapshot of the motor as immutable state
+    def to_state(self, stage: str = 'nameplate') -> 'MotorState':
+        """
+        *** Return [MotorState]: Immutable copy of the motor values (the trace is not part of the state) *** \n
+        """
+        return MotorState(*[getattr(self, name) for name in motor_state_fields], stage)
+
+
+#####################################################################
+# Define the functions that are not part of the motor class
+#####################################################################
+
+# Counters of the derived-value cache (MotorAsm.get_derived()), one set per thread:
+# a streamlit session runs its calculation in its own thread, so other sessions neither change its counts nor race on them
+derived_cache_local = threading.local()
+
+# Counters of the derived-value cache of the calling thread
+def get_derived_cache_counters() -> dict:
+    """
+    *** Return [Dict]: hits, misses, invalidations of the calling thread (the dict is updated in place) *** \n
+    """
+    try:
+        return derived_cache_local.counters
+    except AttributeError:
+        derived_cache_local.counters = {"hits": 0, "misses": 0, "invalidations": 0}
+        return derived_cache_local.counters
+
+# Statistics of the derived-value cache
+def get_derived_cache_stats() -> dict:
+    """
+    *** Return [Dict]: hits, misses, invalidations, hit_rate of MotorAsm.get_derived() in the calling thread since the last reset *** \n
+    """
+    counters = get_derived_cache_counters()
+    lookups = counters["hits"] + counters["misses"]
+    return dict(counters, hit_rate=counters["hits"] / lookups if lookups else 0.0)
+
+def reset_derived_cache_stats() -> None:
+    counters = get_derived_cache_counters()
+    for key in counters:
+        counters[key] = 0
+
+# Exctract the numerical part of a string. Return <None> if no numerical data was extracted 
+def extract_numeric(value: str) -> float:
+    """Convert String value to numeric float\n
+    Return: \n
+    - Float if convesion possible\n
+    - None if conversion not possible"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    # Replace commas with dots
+    value = str(value).replace(',', '.')
+    # Extract the first number-like pattern (int or float)
+    match = re.search(r"[-+]?\d*\.?\d+", value)
+    return float(match.group()) if match else None
+
+# Get synchronus speed from nominal speed
+def get_n_synchrone(n: int, freq: int, slip_range: tuple[float, float] = (0, 0.1), pole_range: Any = range(2, 16, 2)) -> int:
+    """
+    *** Return [Int]: Synchrone Speed [RPM] *** \n
+    Calculate the synchrone speed for a given nominal speed (typical slip range, possible pole numbers) \n
+    For arrays of speeds without exceptions see Fleet.resolve_synchrone_speed()
+    """
+    for poles in pole_range:  # iterate over the possible poles
+        n_sync = 120 * freq / poles # Calculate the synchronus speed for that pole number
+        n_min = n_sync * (1 - slip_range[1])
+        n_max = n_sync * (1 - slip_range[0])
+        if n_min <= n <= n_max:
+            return n_sync
+    raise ValueError("ERROR: Function: get_n_synchron() --> no pole number was detected. n_nominal={}".format(n))
+
+# Slip at maximum torque of the Kloss-like M(n) curve
+def get_slip_at_Mk(Ma_abs: float, Mk_abs: float, n_sync: float, n_start: float = 0.1) -> float:
+    """
+    *** Return [Float]: Slip at the maximum torque [-] *** \n
+    Solve the Kloss-like equation M(n_start) = Ma in closed form: \n
+    - u = n_sync * s / (n_sync - n_start) --> u + 1/u = 2 * Mk / Ma --> u^2 - r*u + 1 = 0 \n
+    - The lower root is chosen, since the other one gives a slip >1
+    """
+    r = 2 * Mk_abs / Ma_abs
+    if r < 2:
+        raise ValueError(f"ERROR: Function: get_slip_at_Mk() --> Starting torque must not exceed the maximum torque. {Ma_abs=}, {Mk_abs=}")
+    u = (r - math.sqrt(r**2 - 4)) / 2
+    return u * (n_sync - n_start) / n_sync
+
+# Exponent of the current curve I(n) = Ia * (n_sync / (n_sync - n))^k
+def get_current_exponent(Ia_abs: float, In: float, n: float, n_sync: float) -> float:
+    """
+    *** Return [Float]: Exponent k of the I(n) curve *** \n
+    Solve I(n) = In in closed form: k = ln(In / Ia) / ln(n_sync / (n_sync - n))
+    """
+    if not 0 < n < n_sync:
+        raise ValueError(f"ERROR: Function: get_current_exponent() --> Speed must be between 0 and the synchrone speed. {n=}, {n_sync=}")
+    return math.log(In / Ia_abs) / math.log(n_sync / (n_sync - n))
+
+
+# Load points of catalogue part-load data [% of Pn]
+part_load_points = (25, 50, 75, 100, 125)
+
+# Build a part-load table from catalogue values
+def get_part_load_table(Pn: float, eta_points: Any, cosphi_points: Any, load_points: Any = part_load_points) -> tuple:
+    """
+    *** Return [Tuple]: ((P [kW], η [%], cos(φ)), ...) sorted by the power *** \n
+    eta_points and cosphi_points are the catalogue values at the load points [% of Pn]. Points with a missing value (None, NaN) are skipped
+    """
+    table = []
+    for load, eta, cosphi in zip(load_points, eta_points, cosphi_points):
+        if eta is None or cosphi is None or math.isnan(eta) or math.isnan(cosphi):
+            continue
+        if not (0 < eta <= 100 and 0 < cosphi <= 1):
+            raise ValueError(f"ERROR: Function: get_part_load_table() --> Wrong values at {load} %: η = {eta} % (0..100), cos(φ) = {cosphi} (0..1)")
+        table.append((Pn * load / 100, float(eta), float(cosphi)))
+    return tuple(sorted(table))
+
+# Efficiency and power factor at a power
+def interpolate_part_load(table: tuple, Pn: float) -> tuple[float, float]:
+    """
+    *** Return [Float, Float]: η [%], cos(φ) at the power Pn [kW] *** \n
+    Linear interpolation between the points of the part-load table. Outside of the table the values of the first/last point are kept
+    """
+    P_vals = [point[0] for point in table]
+    idx = min(max(bisect.bisect_right(P_vals, Pn) - 1, 0), max(len(table) - 2, 0))
+    P_0, eta_0, cosphi_0 = table[idx]
+    P_1, eta_1, cosphi_1 = table[min(idx + 1, len(table) - 1)]
+    weight = min(max((Pn - P_0) / (P_1 - P_0), 0), 1) if P_1 > P_0 else 0
+    return eta_0 + weight * (eta_1 - eta_0), cosphi_0 + weight * (cosphi_1 - cosphi_0)
+
+
+#####################################################################
+# Define the immutable motor state
+#####################################################################
+
+class MotorState(NamedTuple):
+    '''
+    Immutable, compact state of a motor (a tuple instead of an object with a __dict__)\n
+    The with_* transitions return a new state and leave this one unchanged, so that every intermediate state of a calculation can be kept.
+    The relations are the ones of the MotorAsm.variate_* methods (applied to a temporary MotorAsm without trace)
+    '''
+    Pn: float               # Nominal Power [kW]
+    Un: float               # Nominal Voltage [V]
+    Freq: float             # Nominal Frequency [Hz]
+    n: float                # Rotational speed [RPM]
+    eta: float              # Efficiency [%]
+    cosphi: float           # Cosinus Phi
+    Ia: float               # Starting Current [%]
+    Ma: float               # Starting Torque [%]
+    Mk: float               # Maximum Torque [%]
+    connection: str         # Connection (Y, D)
+    deltaT_l: float         # Temperature Rise [K] ~ I
+    deltaT_q: float         # Temperature Rise [K] ~ I^2
+    ambientTemp: float      # Ambient Temperature [°C]
+    ambientMeter: float     # Operation Height Above Sea Level [m]
+    no_parallel: int        # Number of Parallel Circuits on the Stator
+    rotorVoltage: float     # Rotor Voltage [V]
+    rotorCurrent: float     # Rotor Current [A]
+    rotorConnection: str    # Rotor Connection after a change ('', 'Y', 'D')
+    part_load: tuple        # Part-load table ((P [kW], η [%], cos(φ)), ...)
+    In: float               # Nominal Current [A]
+    Mn: float               # Nominal Torque [Nm]
+    Ia_abs: float           # Starting Current [A]
+    Ma_abs: float           # Starting Torque [Nm]
+    Mk_abs: float           # Maximum Torque [Nm]
+    motor_label: str        # Label of the motor for plots
+    stage: str = 'nameplate' # Stage, which lead to this state
+
+    # Rebuild a motor from the state (In, Mn, ... are taken over, not recalculated)
+    def to_motor(self, motor_label: str | None = None, trace: bool = False) -> MotorAsm:
+        """
+        *** Return [MotorAsm]: Motor with the values of the state *** \n
+        """
+        motor = MotorAsm.__new__(MotorAsm)
+        motor.derived = {}
+        for name, value in zip(motor_state_fields, self):
+            setattr(motor, name, value)
+        if motor_label is not None:
+            motor.motor_label = motor_label
+        motor.trace = CalcTrace() if trace else None
+        return motor
+
+    # Apply a variate_* method and return the new state
+    def transition(self, method: str, *args: Any) -> 'MotorState':
+        """
+        *** Return [MotorState]: State after MotorAsm.<method>(*args) *** \n
+        """
+        motor = self.to_motor()
+        getattr(motor, method)(*args)
+        return motor.to_state(stage=method)
+
+    def with_connection(self, connection_new: str) -> 'MotorState':
+        return self.transition('variate_connection', connection_new)
+
+    def with_parallel_circuits(self, no_parallel_new: int) -> 'MotorState':
+        return self.transition('variate_number_of_parallel_circuits', no_parallel_new)
+
+    def with_ambient_temp(self, ambient_temp_new: float) -> 'MotorState':
+        return self.transition('variate_ambient_temp', ambient_temp_new)
+
+    def with_freq_volt_konst_flux(self, Freq_new: float) -> 'MotorState':
+        return self.transition('variate_freq_volt_konstMagnFlux', Freq_new)
+
+    def with_voltage(self, Un_new: float) -> 'MotorState':
+        return self.transition('variate_voltage', Un_new)
+
+    def with_power(self, Pn_new: float) -> 'MotorState':
+        return self.transition('variate_power', Pn_new)
+
+    def with_ambient_height(self, ambient_height_new: float) -> 'MotorState':
+        return self.transition('variate_ambient_height', ambient_height_new)
+
+# Attributes of MotorAsm, which are stored in a MotorState
+motor_state_fields = MotorState._fields[:-1]
+
+# Stage sequence of calculate_operating_values()
+def run_operating_stages(
+        motor: MotorAsm,
+        Pn_op: float,
+        Un_op: float,
+        Freq_op: float,
+        ambientTemp_op: float,
+        ambientMeter_op: float,
+        connection_op: str,
+        no_parallel_op: int,
+        rotorChangeConnection: str, # "Do not change", "Y --> D", "D --> Y"
+        Un_ini: float,              # Stator voltage of the initial machine (rotor voltage ~ stator voltage)
+        timer: Any = None           # Optional Diagnostics.StageTimer
+    ) -> list[MotorState]:
+    """
+    *** Return [list[MotorState]]: State after every stage *** \n
+    Variate the motor in place to the operating conditions (calculation steps are recorded in motor.trace). \n
+    The snapshot after each stage costs one tuple, so the whole chain can be kept for inspection and plotting
+    """
+    states = []
+    stages = [
+        ('variate_connection', connection_op),
+        ('variate_number_of_parallel_circuits', no_parallel_op),
+        ('variate_ambient_temp', ambientTemp_op),
+        ('variate_freq_volt_konstMagnFlux', Freq_op),
+        ('variate_voltage', Un_op),
+        ('variate_power', Pn_op),
+        ('variate_ambient_height', ambientMeter_op),
+    ]
+    for method, value in stages:
+        with time_stage(timer, method):
+            getattr(motor, method)(value)
+        states.append(motor.to_state(stage=method))
+
+    with time_stage(timer, 'refresh'):
+        # Recalculate In, Ma, Mk, Ia
+        motor.In = motor.get_In(motor.Pn, motor.cosphi, motor.eta, motor.Un)
+        motor.refresh_abs_Ia_Ma_Mn()
+    states.append(motor.to_state(stage='refresh'))
+
+    # Calculate rotor parameters
+    with time_stage(timer, 'rotor'):
+        if motor.rotorVoltage > 0:
+            # Variate the rotor connection (Y/D)
+            motor.variate_connection_rotor(rotorChangeConnection)
+
+            # Calculate new rotor voltage
+            motor.variate_voltage_rotor(Un_ini, motor.Un)
+
+            # Calculate rotor current
+            motor.update_rotor_current()
+        else:
+            motor.rotorVoltage = 0
+            motor.rotorCurrent = 0
+            motor.rotorConnection = ''
+    states.append(motor.to_state(stage='rotor'))
+    return states
+
+# Chain of all states from the nameplate to the operating point
+def get_operating_states(state_ini: MotorState, **operating: Any) -> list[MotorState]:
+    """
+    *** Return [list[MotorState]]: Nameplate state followed by the state after every stage of run_operating_stages() *** \n
+    operating: Pn_op, Un_op, Freq_op, ambientTemp_op, ambientMeter_op, connection_op, no_parallel_op, rotorChangeConnection
+    """
+    return [state_ini] + run_operating_stages(state_ini.to_motor(), **operating, Un_ini=state_ini.Un)
+
+
+#####################################################################
+# Define the calculation trace
+#####################################################################
+
+# Explenation texts of the recorded formulas: formula id --> function(inputs, outputs) returning the text
+trace_texts = {
+    'power': lambda i, o:
+        f"\n\nDifferent Power {round(i['Pn_old'])}: kW --> {round(o['Pn'])} kW \n"
+        f"   In_new = {round(o['Pn'])} kW * 1000 / ( sqrt{{3}} * {round(i['cosphi'], 2)} * {round(i['eta'] / 100, 4)} * {round(i['Un'])} V ) = {round(o['In'], 1)} A \n"
+        f"   Mn_new = {round(o['Pn'])} kW * 1000 / ( 2 * pi * {round(i['n'])} RPM / 60 ) = {round(o['Mn'])} Nm \n"
+        f"   Ia_new = {round(i['In_old'], 1)} A / {round(o['In'], 1)} A * {round(i['Ia_old'])} % = {round(o['Ia'])} % \n"
+        f"   Ma_new = {round(i['Pn_old'])} kW / {round(o['Pn'])} kW * {round(i['Ma_old'])} % = {round(o['Ma'])} % \n"
+        f"   Mk_new = {round(i['Pn_old'])} kW / {round(o['Pn'])} kW * {round(i['Mk_old'])} % = {round(o['Mk'])} % \n",
+    'part_load': lambda i, o:
+        f"\n\nPart-load values at {round(o['Pn'])} kW (part-load table {round(i['P_min'])} kW ... {round(i['P_max'])} kW): \n"
+        f"   η_new = {round(i['eta_old'], 2)} % --> {round(o['eta'], 2)} % \n"
+        f"   cos(φ)_new = {round(i['cosphi_old'], 3)} --> {round(o['cosphi'], 3)} \n",
+    'freq_volt_konst_flux': lambda i, o:
+        f"\n\nDifferent Frequency & Voltage with const. U/f: \n{round(i['Freq_old'])} Hz, {round(i['Un_old'])} V --> {round(o['Freq'])} Hz, {round(o['Un'])} V: \n"
+        f"   factor = {round(o['Freq'])} Hz / {round(i['Freq_old'])} Hz = {round(o['factor'], 2)} \n"
+        f"   Pn_new = {round(o['factor'], 2)} * {round(i['Pn_old'])} kW = {round(o['Pn'])} kW\n"
+        f"   n_new = {round(o['factor'], 2)} * {round(i['n_old'])} RPM = {round(o['n'])} RPM",
+    'voltage': lambda i, o:
+        f"\n\nDifferent Voltage: {round(i['Un_old'])} V --> {round(o['Un'])} V \n"
+        f"   In_new = {round(i['Pn'])} kW * 1000 / ( sqrt{{3}} * {round(i['cosphi'], 2)} * {round(i['eta'] / 100, 4)} * {round(o['Un'])} V ) = {round(o['In'], 1)} A \n"
+        f"   Ia_abs_new = {round(o['Un'])} V / {round(i['Un_old'])} V * {round(i['Ia_abs_old'])} A = {round(o['Ia_abs'])} A \n"
+        f"   Ia_new = {round(o['Ia_abs'])} A / {round(o['In'], 2)} A = {round(o['Ia'])} % \n"
+        f"   Ma_new = ( {round(o['Un'])} V / {round(i['Un_old'])} V )^2 * {round(i['Ma_old'])} % = {round(o['Ma'])} % \n"
+        f"   Mk_new = ( {round(o['Un'])} V / {round(i['Un_old'])} V )^2 * {round(i['Mk_old'])} % = {round(o['Mk'])} % \n",
+    'deltaT_current': lambda i, o:
+        f"   dT_linear = {round(i['In_new'], 1)} A / {round(i['In_old'], 1)} A * {round(i['dT_l_old'])} K = {round(o['dT_l'])} K \n"
+        f"   dT_quadratic = ( {round(i['In_new'], 1)} A / {round(i['In_old'], 1)} A )^2 * {round(i['dT_q_old'])} K = {round(o['dT_q'])} K",
+    'connection_D_Y': lambda i, o:
+        f"\n\nConnection D --> Y:\n   In_new = {round(i['In_old'], 1)} A / sqrt{{3}} = {round(o['In'], 1)} A\n   Un_new = {round(i['Un_old'])} V * sqrt{{3}} = {round(o['Un'])} V",
+    'connection_Y_D': lambda i, o:
+        f"\n\nConnection Y --> D:\n   In_new = {round(i['In_old'], 1)} A * sqrt{{3}}  = {round(o['In'], 1)} A\n   Un_new = {round(i['Un_old'])} V / sqrt{{3}} = {round(o['Un'])} V",
+    'parallel_circuits': lambda i, o:
+        f"\n\nChange Number of Parallel Branches on the Stator: {round(i['no_parallel_old'])} --> {round(o['no_parallel'])} : \n"
+        f"   Un = {round(i['Un_old'])} V * ( {round(i['no_parallel_old'])} / {round(o['no_parallel'])} ) = {round(o['Un'])} V \n"
+        f"   In = {round(i['In_old'], 1)} A * ( {round(o['no_parallel'])} / {round(i['no_parallel_old'])} ) = {round(o['In'], 1)} A",
+    'height_test_below_1000': lambda i, o:
+        f"\n\nDifferent heigt above sea level: {round(i['height_old'])} m --> {round(i['height_new'])} m\n"
+        f"   dT_linear = {round(i['dT_l_old'])} K / ( 1 - ( {i['height_new']} m - 1000 m ) / 10000 m ) = {round(o['dT_l'], 1)} K\n"
+        f"   dT_quadratic = {round(i['dT_q_old'])} K / ( 1 - ( {i['height_new']} m - 1000 m ) / 10000 m ) = {round(o['dT_q'], 1)} K\n",
+    'height_operation_below_1000': lambda i, o:
+        f"\n\nDifferent heigt above sea level: {round(i['height_old'])} m --> {round(i['height_new'])} m\n"
+        f"   dT_linear = {round(i['dT_l_old'])} K / ( 1 + ( {i['height_old']} m - 1000 m ) / 10000 m ) = {round(o['dT_l'], 1)} K \n"
+        f"   dT_quadratic = {round(i['dT_q_old'])} K / ( 1 + ( {i['height_old']} m - 1000 m ) / 10000 m ) = {round(o['dT_q'], 1)} K \n",
+    'height_both_above_1000': lambda i, o:
+        f"\n\nDifferent heigt above sea level: {round(i['height_old'])} m --> {round(i['height_new'])} m\n"
+        f"   dT_linear = {round(i['dT_l_old'])} / ( 1 + ( {i['height_old']} m - {i['height_new']} m ) / 10000 m ) = {round(o['dT_l'], 1)} K\n"
+        f"   dT_quadratic = {round(i['dT_q_old'])} / ( 1 + ( {i['height_old']} m - {i['height_new']} m ) / 10000 m ) = {round(o['dT_q'], 1)} K\n",
+    'ambient_temp': lambda i, o:
+        f"\n\nDifferent ambient temperature: {round(i['temp_old'])} °C --> {round(i['temp_new'])} °C\n"
+        + (f"   dT_linear = {round(i['dT_l_old'], 1)} K + ( {i['temp_new']} °C - {i['temp_old']} ) = {round(o['dT_l'], 1)} K\n" if o['method_l'] == 'add' else
+           f"   dT_linear = {round(i['dT_l_old'], 1)} K * {i['factor']} = {round(o['dT_l'], 1)} K\n")
+        + (f"   dT_quadratic = {round(i['dT_q_old'], 1)} K + ( {i['temp_new']} °C - {i['temp_old']} ) = {round(o['dT_q'], 1)} K" if o['method_q'] == 'add' else
+           f"   dT_quadratic = {round(i['dT_q_old'], 1)} K * {i['factor']} = {round(o['dT_q'], 1)} K"),
+    'rotor_connection_Y_D': lambda i, o:
+        f"\n\nChange Rotor Connection: Y --> D\n"
+        f"   Un Rotor = {round(i['rotorVoltage_old'])} V / sqrt{{3}}  = {o['rotorVoltage']} V",
+    'rotor_connection_D_Y': lambda i, o:
+        f"\n\nChange Rotor Connection: D --> Y\n"
+        f"   Un Rotor = {round(i['rotorVoltage_old'])} V * sqrt{{3}} = {o['rotorVoltage']} V",
+    'rotor_voltage': lambda i, o:
+        f"\n\nUpdate Rotor Voltage: U_Rotor ~ U_Stator\n"
+        f"   Un Rotor = {round(i['rotorVoltage_old'])} V * {round(i['statorVoltage_res'])} V / {round(i['statorVoltage_ini'])} V = {o['rotorVoltage']} V",
+    'rotor_current': lambda i, o:
+        f"\n\nCalculate Rotor Current:\n"
+        f"   In Rotor = ( {round(i['Pn'], 1)} kW * 1000 * 1.1 ) / ( {round(i['rotorVoltage'])} V * sqrt{{3}} ) = {o['rotorCurrent']} A",
+}
+
+# Single step of the calculation
+class TraceRecord(NamedTuple):
+    stage: str      # Calculation stage (e.g. 'voltage', 'deltaT')
+    formula: str    # Formula id, key of trace_texts
+    inputs: dict    # Values before the step
+    outputs: dict   # Values after the step
+
+class CalcTrace:
+    '''
+    Structured record of the conducted calculations (stage, formula id, inputs, outputs)\n
+    The explenation is rendered only on request: to_text(), to_markdown(), to_json()
+    '''
+    def __init__(self):
+        self.records = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, stage: str, formula: str, inputs: dict, outputs: dict) -> None:
+        self.records.append(TraceRecord(stage, formula, inputs, outputs))
+
+    def to_text(self, start: int = 0) -> str:
+        '''
+        Return [Str]: Explenation of the conducted calculations (records from index start on)
+        '''
+        return ''.join(trace_texts[record.formula](record.inputs, record.outputs) for record in self.records[start:])
+
+    def to_markdown(self, start: int = 0) -> str:
+        '''
+        Return [Str]: Markdown table per calculation step (records from index start on)
+        '''
+        md = ''
+        for record in self.records[start:]:
+            md += f"\n**{record.stage}** (`{record.formula}`)\n\n| Variable | Value |\n|---|---|\n"
+            md += ''.join(f"| {name} | {format_trace_value(value)} |\n" for name, value in record.inputs.items())
+            md += ''.join(f"| **{name}** | **{format_trace_value(value)}** |\n" for name, value in record.outputs.items())
+        return md
+
+    def to_json(self, start: int = 0) -> str:
+        '''
+        Return [Str]: JSON list of the records (records from index start on)
+        '''
+        import json
+        return json.dumps([record._asdict() for record in self.records[start:]], ensure_ascii=False, default=float)
+
+# Format a value of the trace for markdown
+def format_trace_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
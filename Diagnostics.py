@@ -0,0 +1,88 @@
+import io
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, NamedTuple
+
+#####################################################################
+# Define the stage timer
+#####################################################################
+
+# Timing of one stage
+class StageRecord(NamedTuple):
+    stage: str      # Name of the stage (e.g. "variate_voltage", "plotting")
+    wall_s: float   # Wall time [s]
+    cpu_s: float    # CPU time of the process [s]
+
+class StageTimer:
+    '''
+    Record the wall and CPU time of the stages of a calculation (with timer.stage("name"): ...)\n
+    - profile: Additionally capture all timed stages with cProfile (get_profile_text())\n
+    Without a timer the calculations use time_stage(None, ...), which costs a null context only
+    '''
+    def __init__(self, profile: bool = False):
+        self.records = []
+        self.profiler = None
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.profiler is not None:
+            self.profiler.enable()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.records.append(StageRecord(name, time.perf_counter() - wall_start, time.process_time() - cpu_start))
+            if self.profiler is not None:
+                self.profiler.disable()
+
+    def summary(self) -> list[dict]:
+        '''
+        Return [List]: One dict per stage name in order of the first call: stage, calls, wall_s, cpu_s (summed)
+        '''
+        summary = {}
+        for record in self.records:
+            entry = summary.setdefault(record.stage, {"stage": record.stage, "calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            entry["calls"] += 1
+            entry["wall_s"] += record.wall_s
+            entry["cpu_s"] += record.cpu_s
+        return list(summary.values())
+
+    def total(self) -> tuple[float, float]:
+        '''
+        Return [Float, Float]: Summed wall time, summed CPU time [s] of all stages
+        '''
+        return sum(record.wall_s for record in self.records), sum(record.cpu_s for record in self.records)
+
+    def to_text(self) -> str:
+        lines = [f"{'Stage':<28} {'Calls':>6} {'Wall [ms]':>11} {'CPU [ms]':>11}"]
+        for entry in self.summary():
+            lines.append(f"{entry['stage']:<28} {entry['calls']:>6} {entry['wall_s'] * 1000:>11.2f} {entry['cpu_s'] * 1000:>11.2f}")
+        wall_s, cpu_s = self.total()
+        lines.append(f"{'Total':<28} {len(self.records):>6} {wall_s * 1000:>11.2f} {cpu_s * 1000:>11.2f}")
+        return '\n'.join(lines)
+
+    def get_profile_text(self, limit: int = 30, sort: str = 'cumulative') -> str | None:
+        '''
+        Return [Str]: pstats table of the captured stages (None if the timer was created with profile=False)
+        '''
+        if self.profiler is None:
+            return None
+        import pstats
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+#####################################################################
+# Define the functions that are not part of the timer class
+#####################################################################
+
+# Time a stage, if a timer is given
+def time_stage(timer: StageTimer | None, name: str) -> Any:
+    '''
+    Return [Context manager]: timer.stage(name), or a null context if timer is None
+    '''
+    return nullcontext() if timer is None else timer.stage(name)
@@ -0,0 +1,560 @@
+from typing import Any
+import math
+import numpy as np
+
+#####################################################################
+# Define the motor fleet class (struct of arrays)
+#####################################################################
+
+class MotorFleet:
+    '''
+    Vectorized version of MotorAsm: every nameplate field is stored as a numpy column (one element per motor)\n
+    The variate_* methods apply the same relations as MotorAsm to all motors at once.
+    Motors, for which a stage does not apply (e.g. same frequency), are left unchanged by a mask.
+    '''
+    def __init__(self,
+                 Pn: np.ndarray,             # Nominal Power [kW]
+                 Un: np.ndarray,             # Nominal Voltage [V]
+                 Freq: np.ndarray,           # Nominal Frequency [Hz]
+                 n: np.ndarray,              # Rotational speed [RPM]
+                 eta: np.ndarray,            # Efficiency [%]
+                 cosphi: np.ndarray,         # Cosinus Phi
+                 Ia: np.ndarray,             # Starting Current [%]
+                 Ma: np.ndarray,             # Starting Torque [%]
+                 Mk: np.ndarray,             # Maximum Torque [%]
+                 connection: np.ndarray,     # Connection (Y, D)
+                 deltaT: np.ndarray,         # Temperature Rise [K]
+                 ambientTemp: np.ndarray,    # Ambient Temperature [°C]
+                 ambientMeter: np.ndarray,   # Operation Height Above Sea Level [m]
+                 no_parallel: np.ndarray,    # Number of Parallel Circuits on the Stator
+                 rotorVoltage: np.ndarray,   # Rotor Voltage [V]
+                 part_load: Any = None       # Part-load tables: (points, 3) for all motors or (motors, points, 3), columns P [kW], η [%], cos(φ). None: η and cos(φ) do not depend on the power
+                 ):
+        self.Pn             = as_column(Pn)
+        size = len(self.Pn)
+        self.Un             = as_column(Un, size)
+        self.Freq           = as_column(Freq, size)
+        self.n              = as_column(n, size)
+        self.eta            = as_column(eta, size)
+        self.cosphi         = as_column(cosphi, size)
+        self.Ia             = as_column(Ia, size)
+        self.Ma             = as_column(Ma, size)
+        self.Mk             = as_column(Mk, size)
+        self.connection     = as_connection_column(connection, size)
+        self.deltaT_l       = as_column(deltaT, size)  # Temperature Rise [K], assumed to increase lineary with the current in the coils
+        self.deltaT_q       = as_column(deltaT, size)  # Temperature Rise [K], assumed to increase quadratic with the current in the coils
+        self.ambientTemp    = as_column(ambientTemp, size)
+        self.ambientMeter   = as_column(ambientMeter, size)
+        self.no_parallel    = as_column(no_parallel, size)
+        self.rotorVoltage   = as_column(rotorVoltage, size)
+        self.rotorCurrent   = np.zeros(size)
+        self.update_rotor_current(self.rotorVoltage > 0)
+        self.rotorConnection = np.full(size, '', dtype='<U1')
+        self.part_load      = as_part_load_tables(part_load, size)
+
+        self.In = self.get_In(self.Pn, self.cosphi, self.eta, self.Un)
+        self.Mn = self.get_Mn(self.Pn, self.n)
+        self.Ia_abs = self.Ia / 100 * self.In
+        self.Ma_abs = self.Ma / 100 * self.Mn
+        self.Mk_abs = self.Mk / 100 * self.Mn
+
+    def __len__(self) -> int:
+        return len(self.Pn)
+
+    # Copy all columns of the fleet
+    def copy(self) -> 'MotorFleet':
+        """
+        *** Return [MotorFleet]: Independent copy of the fleet *** \n
+        Copy every column, so that the variate_* methods of the copy do not afect the original
+        """
+        fleet = MotorFleet.__new__(MotorFleet)
+        for key, value in self.__dict__.items():
+            fleet.__dict__[key] = value.copy()
+        return fleet
+
+    # Collect single motors into a fleet
+    @classmethod
+    def from_motors(cls, motors: list) -> 'MotorFleet':
+        """
+        *** Return [MotorFleet]: Fleet with the current values of the motors (MotorAsm), In, Mn, ... are taken over, not recalculated *** \n
+        """
+        fleet = cls.__new__(cls)
+        for name in fleet_fields:
+            fleet.__dict__[name] = np.array([getattr(motor, name) for motor in motors], dtype='<U1' if name in ['connection', 'rotorConnection'] else float)
+        fleet.part_load = stack_part_load_tables([motor.part_load for motor in motors], fleet.Pn, fleet.eta, fleet.cosphi)
+        return fleet
+
+    # Nennleistung verändern (umstempeln) ohne andere Parameter zu verändern
+    def variate_power(self, Pn_new: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Vectorized MotorAsm.variate_power(): Operate the motors with a different power.\n
+        Frequency=Const., Voltage=Const. η and cos(φ) follow the part-load tables (if given)
+        """
+        Pn_new = as_column(Pn_new, len(self))
+        mask = np.round(Pn_new) != np.round(self.Pn)
+        In_old = self.In.copy()
+
+        if self.part_load.shape[1] > 0:
+            eta, cosphi = interpolate_part_load_tables(self.part_load, Pn_new)
+            self.eta = np.where(mask, eta, self.eta)
+            self.cosphi = np.where(mask, cosphi, self.cosphi)
+        Mn = self.get_Mn(Pn_new, self.n)
+        In = self.get_In(Pn_new, self.cosphi, self.eta, self.Un)
+        self.Mn = np.where(mask, Mn, self.Mn)
+        self.In = np.where(mask, In, self.In)
+        self.Ia = np.where(mask, self.Ia_abs / self.In * 100, self.Ia)
+        self.Ma = np.where(mask, self.Ma_abs / self.Mn * 100, self.Ma)
+        self.Mk = np.where(mask, self.Mk_abs / self.Mn * 100, self.Mk)
+        self.update_deltaT(In_old, self.In, mask)
+        self.Pn = np.where(mask, Pn_new, self.Pn)
+
+    # Frequenz und Spannung im gleichen Maße erhöhen/veringern. Magnetischer Fluss bleibt konstant
+    def variate_freq_volt_konstMagnFlux(self, Freq_new: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Vectorized MotorAsm.variate_freq_volt_konstMagnFlux(): Increase/decrease frequency and voltage by the same factor. \n
+        Magnetic_Flux = Const., U/Freq=Const.
+        """
+        Freq_new = as_column(Freq_new, len(self))
+        mask = np.round(Freq_new) != np.round(self.Freq)
+
+        factor = Freq_new / self.Freq
+        self.Pn = np.where(mask, factor * self.Pn, self.Pn)
+        self.n = np.where(mask, factor * self.n, self.n)
+        self.Un = np.where(mask, factor * self.Un, self.Un)
+        self.Freq = np.where(mask, Freq_new, self.Freq)
+        self.part_load = self.part_load.copy()
+        self.part_load[:, :, 0] *= np.where(mask, factor, 1)[:, None] # Same load ratio, same η and cos(φ)
+
+    # Spannung erhöhen / Veringern
+    def variate_voltage(self, Un_new: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Vectorized MotorAsm.variate_voltage(): Increase/decrease voltage \n
+        Nominal power and frequency stay unchanged
+        """
+        Un_new = as_column(Un_new, len(self))
+        mask = np.round(Un_new) != np.round(self.Un)
+        In_old = self.In.copy()
+
+        factor = Un_new / self.Un
+        self.Un = np.where(mask, Un_new, self.Un)
+        self.Ma = np.where(mask, factor**2 * self.Ma, self.Ma) # Starting torque [%] proportional to U^2
+        self.Mk = np.where(mask, factor**2 * self.Mk, self.Mk) # Maximum Torque [%] proportional to U^2
+        self.In = np.where(mask, self.get_In(self.Pn, self.cosphi, self.eta, self.Un), self.In)
+        Ia_abs = factor * self.Ia_abs # Starting current [A] proportional to U
+        self.Ia = np.where(mask, Ia_abs / self.In * 100, self.Ia)
+        self.refresh_abs_Ia_Ma_Mn(mask)
+        self.update_deltaT(In_old, self.In, mask)
+
+    # Motor in D / Y umschalten
+    def variate_connection(self, connection_new: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Vectorized MotorAsm.variate_connection(): Connect stator as Y or D \n
+        Nominal current and voltage are afected
+        """
+        connection_new = as_connection_column(connection_new, len(self))
+        to_Y = (connection_new == 'Y') & (self.connection != 'Y')
+        to_D = (connection_new == 'D') & (self.connection != 'D')
+
+        self.In = np.where(to_Y, self.In / math.sqrt(3), np.where(to_D, self.In * math.sqrt(3), self.In))
+        self.Un = np.where(to_Y, self.Un * math.sqrt(3), np.where(to_D, self.Un / math.sqrt(3), self.Un))
+        self.refresh_abs_Ia_Ma_Mn(to_Y | to_D)
+        self.connection = connection_new
+
+    # Motor in Parallel schalten oder andere Kombination wählen
+    def variate_number_of_parallel_circuits(self, no_parallel_new: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Vectorized MotorAsm.variate_number_of_parallel_circuits(): Change the connection of the branches of the stator \n
+        Nominal current and voltage are afected
+        """
+        no_parallel_new = as_column(no_parallel_new, len(self))
+        mask = no_parallel_new != self.no_parallel
+
+        self.Un = np.where(mask, self.Un * (self.no_parallel / no_parallel_new), self.Un)
+        self.In = np.where(mask, self.In * (no_parallel_new / self.no_parallel), self.In)
+        self.no_parallel = no_parallel_new
+        self.refresh_abs_Ia_Ma_Mn(mask)
+
+    # Aufstellhöhe variieren
+    def variate_ambient_height(self, ambient_height_new: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Vectorized MotorAsm.variate_ambient_height(): Change the operating height above sea level. Correct DeltaT accordingly (IEC60034-1)
+        """
+        ambient_height_new = as_column(ambient_height_new, len(self))
+        ambient_height_old = self.ambientMeter
+        if np.any(np.isnan(ambient_height_old)):
+            raise ValueError(f'Error: function variate_ambient_height() --> Wrong value {ambient_height_old=}')
+
+        divisor = np.ones(len(self))
+        test_low = ambient_height_old <= 1000
+        divisor = np.where(test_low & (ambient_height_new > 1000), 1 - (ambient_height_new - 1000)/10000, divisor)
+        divisor = np.where(~test_low & (ambient_height_new < 1000), 1 + (ambient_height_old - 1000)/10000, divisor)
+        divisor = np.where(~test_low & (ambient_height_new >= 1000), 1 + (ambient_height_old - ambient_height_new)/10000, divisor)
+        mask = divisor != 1
+
+        self.deltaT_l = np.where(mask, self.deltaT_l / divisor, self.deltaT_l)
+        self.deltaT_q = np.where(mask, self.deltaT_q / divisor, self.deltaT_q)
+        self.ambientMeter = ambient_height_new
+
+    # Umgebungstemperatur variieren
+    def variate_ambient_temp(self, ambient_temp_new: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Vectorized MotorAsm.variate_ambient_temp(): Change the operating temperature. Correct DeltaT accordingly (IEC60034-1) \n
+        The higher deltaT of both corrections (substraction of temp., factor 5% per 5°C) is choosen
+        """
+        ambient_temp_new = as_column(ambient_temp_new, len(self))
+        ambient_temp_old = self.ambientTemp
+        factor = 1 + (ambient_temp_new - ambient_temp_old)/100
+        self.deltaT_l = np.maximum(self.deltaT_l + (ambient_temp_new - ambient_temp_old), factor * self.deltaT_l)
+        self.deltaT_q = np.maximum(self.deltaT_q + (ambient_temp_new - ambient_temp_old), factor * self.deltaT_q)
+        self.ambientTemp = ambient_temp_new
+
+    # Rotor in D/Y umschalten
+    def variate_connection_rotor(self, rotorChangeConnection: np.ndarray) -> None:
+        '''Vectorized MotorAsm.variate_connection_rotor(): Variate the connection of the rotor \n
+        - Input: rotorChangeConnection - Expected: "Do not change", "Y --> D", "D --> Y"
+        '''
+        rotorChangeConnection = np.broadcast_to(np.asarray(rotorChangeConnection, dtype=str), (len(self),))
+        to_D = rotorChangeConnection == 'Y --> D'
+        to_Y = rotorChangeConnection == 'D --> Y'
+        self.rotorVoltage = np.where(to_D, np.round(self.rotorVoltage / math.sqrt(3)), np.where(to_Y, np.round(self.rotorVoltage * math.sqrt(3)), self.rotorVoltage))
+        self.rotorConnection = np.where(to_D, 'D', np.where(to_Y, 'Y', ''))
+
+    # Variate the rotor Voltage
+    def variate_voltage_rotor(self, statorVoltage_ini: np.ndarray, statorVoltage_res: np.ndarray) -> None:
+        '''
+        Vectorized MotorAsm.variate_voltage_rotor(): Variate rotor voltage from a change in stator voltage (Un_Rotor ~ Un_Stator)
+        '''
+        mask = np.round(statorVoltage_ini) != np.round(statorVoltage_res)
+        self.rotorVoltage = np.where(mask, np.round(self.rotorVoltage * statorVoltage_res / statorVoltage_ini), self.rotorVoltage)
+
+    # Update the rotor current
+    def update_rotor_current(self, mask: np.ndarray) -> None:
+        '''
+        Vectorized MotorAsm.update_rotor_current(): Update self.rotorCurrent from self.Pn, self.rotorVoltage (only where mask is True)
+        '''
+        rotorCurrent = self.Pn[mask] * 1000 * 1.1 / (self.rotorVoltage[mask] * math.sqrt(3))
+        self.rotorCurrent[mask] = round_exact(rotorCurrent, 1)
+
+    # In berechnen
+    @staticmethod
+    def get_In(Pn: np.ndarray, cosphi: np.ndarray, eta: np.ndarray, Un: np.ndarray) -> np.ndarray:
+        """
+        *** Return [np.ndarray]: Calculated nominal current *** \n
+        Same relation as MotorAsm.get_In()
+        """
+        return Pn * 1000 / ( math.sqrt(3) * cosphi * eta / 100 * Un )
+
+    # Mn berechnen
+    @staticmethod
+    def get_Mn(Pn: np.ndarray, n: np.ndarray) -> np.ndarray:
+        """
+        *** Return [np.ndarray]: Calculated nominal torque *** \n
+        Same relation as MotorAsm.get_Mn()
+        """
+        return Pn * 1000 / ( 2*3.1415926536*n/60 )
+
+    # Aktualisiere die Absolutwerte anhand der Prozentangaben von Ia, Ma, Mk
+    def refresh_abs_Ia_Ma_Mn(self, mask: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Update the absolute starting current, starting torque and max. torque of the masked motors
+        """
+        self.Ia_abs = np.where(mask, self.Ia / 100 * self.In, self.Ia_abs)
+        self.Ma_abs = np.where(mask, self.Ma / 100 * self.Mn, self.Ma_abs)
+        self.Mk_abs = np.where(mask, self.Mk / 100 * self.Mn, self.Mk_abs)
+
+    # Aktualisiert die Werte von deltaT in Abhängigkeit von einer Stromänderung
+    def update_deltaT(self, In_old: np.ndarray, In_new: np.ndarray, mask: np.ndarray) -> None:
+        """
+        *** Return [None]: None *** \n
+        Update the temperature rise of the masked motors. Assumed relations: dT prop. I, dT prop. I^2
+        """
+        self.deltaT_l = np.where(mask, In_new / In_old * self.deltaT_l, self.deltaT_l)
+        self.deltaT_q = np.where(mask, (In_new / In_old)**2 * self.deltaT_q, self.deltaT_q)
+
+    # Strom in einem Strang des Stators berechnen
+    def get_branch_voltage_current(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        *** Return [np.ndarray, np.ndarray]: I_branch, U_branch *** \n
+        Calculate the current and voltage in a single branch of the stator
+        """
+        is_Y = self.connection == 'Y'
+        U_branch = np.where(is_Y, self.Un / math.sqrt(3), self.Un)
+        I_phase = np.where(is_Y, self.In, self.In / math.sqrt(3))
+        I_branch = I_phase / self.no_parallel
+        return I_branch, U_branch
+
+    # Get M_n curve of every motor
+    def get_M_n_curve(self, curve_mode: str = 'numeric', circuit: dict | None = None) -> Any:
+        """
+        *** Return [Lambda function]: M(n) curves *** \n
+        *** Input [str]: 'numeric' / 'circuit' *** \n
+            --> Kloss-like curve in closed form ('numeric') or fitted equivalent circuit ('circuit', see Circuit.estimate_equivalent_circuit())
+        Vectorized MotorAsm.get_M_n_curve(). The speed x has the shape (len(fleet),) or (len(fleet), points) \n
+        circuit: Result of estimate_equivalent_circuit() for this fleet (fitted on the call if not given) \n
+        Motors without a valid curve (no pole number detected, Ma > Mk) give NaN
+        """
+        if curve_mode == 'circuit':
+            from Circuit import estimate_equivalent_circuit, get_circuit_curves
+            return get_circuit_curves(estimate_equivalent_circuit(self) if circuit is None else circuit)[0]
+        elif curve_mode != 'numeric':
+            raise ValueError("ERROR: Function: get_M_n_curve() --> Curve mode must be 'numeric' or 'circuit'")
+        n_sync = get_fleet_n_synchrone(self.n, self.Freq)
+        with np.errstate(invalid='ignore'):
+            slip_at_Mk = get_fleet_slip_at_Mk(self.Ma_abs, self.Mk_abs, n_sync)
+        Mk_abs = self.Mk_abs
+
+        def M_func(x: np.ndarray) -> np.ndarray:
+            x = np.asarray(x, dtype=float)
+            n_s, s_k, M_k = (as_rows(values, x.ndim) for values in (n_sync, slip_at_Mk, Mk_abs))
+            return 2 * M_k / ( (n_s * s_k) / (n_s - x) + (n_s - x) / (n_s * s_k) )
+        return M_func
+
+    # Get I_n curve of every motor
+    def get_I_n_curve(self, Ia_type: str = 'total', curve_mode: str = 'numeric', circuit: dict | None = None) -> Any:
+        """
+        *** Return [Lambda function]: I(n) curves *** \n
+        *** Input [str]: 'total' / 'branch' *** \n
+        *** Input [str]: 'numeric' / 'circuit' (see get_M_n_curve()) *** \n
+        Vectorized MotorAsm.get_I_n_curve(). The speed x has the shape (len(fleet),) or (len(fleet), points)
+        """
+        n_sync = get_fleet_n_synchrone(self.n, self.Freq)
+        if Ia_type == 'total':
+            Ia_abs = self.Ia_abs
+        elif Ia_type == 'branch':
+            Ia_abs = self.get_branch_voltage_current()[0] * self.Ia / 100
+        else:
+            raise ValueError("ERROR: Function: get_I_n_curve() --> Current Type must be 'total' or 'branch'")
+
+        if curve_mode == 'circuit':
+            from Circuit import estimate_equivalent_circuit, get_circuit_curves
+            return get_circuit_curves(estimate_equivalent_circuit(self) if circuit is None else circuit, Ia_abs / self.Ia_abs)[1]
+        elif curve_mode != 'numeric':
+            raise ValueError("ERROR: Function: get_I_n_curve() --> Curve mode must be 'numeric' or 'circuit'")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = np.log(self.In / Ia_abs) / np.log(n_sync / (n_sync - self.n))
+
+        def I_func(x: np.ndarray) -> np.ndarray:
+            x = np.asarray(x, dtype=float)
+            n_s, I_a, k_ = (as_rows(values, x.ndim) for values in (n_sync, Ia_abs, k))
+            return I_a * ( n_s / (n_s - x) )**k_
+        return I_func
+
+
+# Columns of a fleet (same attribute names as MotorAsm)
+fleet_fields = [
+    "Pn", "Un", "Freq", "n", "eta", "cosphi", "Ia", "Ma", "Mk", "connection", "deltaT_l", "deltaT_q", "ambientTemp", "ambientMeter",
+    "no_parallel", "rotorVoltage", "rotorCurrent", "rotorConnection", "In", "Mn", "Ia_abs", "Ma_abs", "Mk_abs",
+]
+
+
+#####################################################################
+# Define the functions that are not part of the fleet class
+#####################################################################
+
+# Convert part-load tables to an array of all motors
+def as_part_load_tables(part_load: Any, size: int) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Part-load tables with the shape (size, points, 3) (copy) *** \n
+    A single table (points, 3) is used for every motor. None or an empty table give the shape (size, 0, 3)
+    """
+    if part_load is None or len(part_load) == 0:
+        return np.zeros((size, 0, 3))
+    tables = np.asarray(part_load, dtype=float)
+    if tables.ndim == 2:
+        tables = np.broadcast_to(tables, (size,) + tables.shape)
+    if tables.shape[0] != size or tables.shape[2] != 3:
+        raise ValueError(f"ERROR: Function: as_part_load_tables() --> Wrong shape {tables.shape}. Expected: (points, 3) or ({size}, points, 3)")
+    return tables[np.arange(size)[:, None], np.argsort(tables[:, :, 0], axis=1)]
+
+# Stack the part-load tables of single motors
+def stack_part_load_tables(tables: list[tuple], Pn: np.ndarray, eta: np.ndarray, cosphi: np.ndarray) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Part-load tables with the shape (motors, points, 3) of MotorAsm.part_load tables *** \n
+    Shorter tables are padded with their last point, motors without table get their constant values (Pn, η, cos(φ))
+    """
+    points = max((len(table) for table in tables), default=0)
+    if points == 0:
+        return np.zeros((len(tables), 0, 3))
+    padded = [list(table) + [table[-1]] * (points - len(table)) if table else [(P, e, c)] * points for table, P, e, c in zip(tables, Pn, eta, cosphi)]
+    return np.array(padded, dtype=float)
+
+# Efficiency and power factor of all motors at a power
+def interpolate_part_load_tables(tables: np.ndarray, Pn: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    *** Return [np.ndarray, np.ndarray]: η [%], cos(φ) *** \n
+    Vectorized Core.interpolate_part_load(): every motor is looked up in its own table (tables sorted by the power, shape (motors, points, 3))
+    """
+    rows = np.arange(len(tables))
+    last = tables.shape[1] - 1
+    idx = np.clip(np.sum(tables[:, :, 0] <= Pn[:, None], axis=1) - 1, 0, max(last - 1, 0))
+    point_0, point_1 = tables[rows, idx], tables[rows, np.minimum(idx + 1, last)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(point_1[:, 0] > point_0[:, 0], np.clip((Pn - point_0[:, 0]) / (point_1[:, 0] - point_0[:, 0]), 0, 1), 0)
+    values = point_0[:, 1:] + weight[:, None] * (point_1[:, 1:] - point_0[:, 1:])
+    return values[:, 0], values[:, 1]
+
+# Convert an input to a float column
+def as_column(values: Any, size: int | None = None) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Float column (copy) *** \n
+    Scalars are broadcasted to the given size
+    """
+    values = np.asarray(values, dtype=float)
+    if size is not None:
+        values = np.broadcast_to(values, (size,))
+    return values.astype(float, copy=True).reshape(-1)
+
+# Convert an input to a connection column ('Y' / 'D')
+def as_connection_column(values: Any, size: int) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Column of 'Y' / 'D' *** \n
+    Scalars are broadcasted to the given size. Raise ValueError for any other value
+    """
+    values = np.char.upper(np.broadcast_to(np.asarray(values, dtype=str), (size,)))
+    if not np.all((values == 'Y') | (values == 'D')):
+        raise ValueError(f"ERROR: Function: as_connection_column() --> Connection must be 'Y' or 'D'. Values: {np.unique(values)}")
+    return values.astype('<U1')
+
+# Reshape a column, so that it broadcasts against an array of the given dimension (one row per motor)
+def as_rows(values: np.ndarray, ndim: int) -> np.ndarray:
+    return values.reshape((-1,) + (1,) * (ndim - 1)) if ndim > 1 else values
+
+# Pole number, synchronous speed and slip of every motor
+def resolve_synchrone_speed(n: np.ndarray, freq: np.ndarray, slip_range: tuple[float, float] = (0, 0.1), poles: Any = range(2, 16, 2)) -> dict[str, np.ndarray]:
+    """
+    *** Return [dict[str, np.ndarray]]: "poles" (int, 0 if invalid), "n_sync" [RPM], "slip" [-] (NaN if invalid), "valid" (bool) *** \n
+    Array version of get_n_synchrone(): the lowest pole number, for which the slip of the speed n lies in slip_range, is taken. \n
+    Speeds without such a pole number are marked in "valid" instead of raising an exception. n and freq are broadcast against each other
+    """
+    n, freq = np.broadcast_arrays(np.asarray(n, dtype=float), np.asarray(freq, dtype=float))
+    pole_number = np.zeros(n.shape, dtype=int)
+    n_sync = np.full(n.shape, np.nan)
+    valid = np.zeros(n.shape, dtype=bool)
+    for pole in poles:
+        n_sync_pole = 120 * freq / pole # Synchronus speed for that pole number
+        match = ~valid & (n_sync_pole * (1 - slip_range[1]) <= n) & (n <= n_sync_pole * (1 - slip_range[0]))
+        pole_number[match] = pole
+        n_sync[match] = n_sync_pole[match]
+        valid |= match
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slip = (n_sync - n) / n_sync
+    return {"poles": pole_number, "n_sync": n_sync, "slip": slip, "valid": valid}
+
+# Synchronous speed of every motor
+def get_fleet_n_synchrone(n: np.ndarray, freq: np.ndarray) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Synchrone Speed [RPM] *** \n
+    Vectorized get_n_synchrone() (resolve_synchrone_speed() with the default slip range). NaN if no pole number was detected
+    """
+    return resolve_synchrone_speed(n, freq)["n_sync"]
+
+# Slip at maximum torque of the Kloss-like M(n) curve of every motor
+def get_fleet_slip_at_Mk(Ma_abs: np.ndarray, Mk_abs: np.ndarray, n_sync: np.ndarray, n_start: float = 0.1) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Slip at the maximum torque [-] *** \n
+    Vectorized get_slip_at_Mk(). NaN where the starting torque exceeds the maximum torque
+    """
+    r = 2 * Mk_abs / Ma_abs
+    u = (r - np.sqrt(np.where(r >= 2, r**2 - 4, np.nan))) / 2
+    return u * (n_sync - n_start) / n_sync
+
+# Round each element exactly as the built-in round() does
+def round_exact(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Rounded values *** \n
+    np.round() scales by 10^ndigits before rounding, which differs from round() for some decimals (e.g. 0.15)
+    """
+    return np.array([round(value, ndigits) for value in values.tolist()], dtype=float)
+
+# Calculate percentual changes between initial fleet and result fleet
+def calculate_fleet_percentual_changes(fleet_ini: MotorFleet, fleet_res: MotorFleet) -> dict[str, np.ndarray]:
+    '''
+    Vectorized calculate_percentual_changes() (values are not rounded)\n
+    Output: Percentual Changes of: P, B~U/f, Un_branch, In_branch, deltaT_quad, deltaT_lin | <dict[str, np.ndarray]>
+    '''
+    In_ini_branch, Un_ini_branch = fleet_ini.get_branch_voltage_current()
+    In_res_branch, Un_res_branch = fleet_res.get_branch_voltage_current()
+    return {
+        "Pn": ( fleet_res.Pn / fleet_ini.Pn - 1 )*100,
+        "B (~U/f)": ( (Un_res_branch / fleet_res.Freq) / (Un_ini_branch / fleet_ini.Freq) - 1 )*100,
+        "Un (per branch)": ( Un_res_branch / Un_ini_branch - 1 )*100,
+        "In (per branch)": ( In_res_branch / In_ini_branch - 1 )*100,
+        "Temp. Rise (~I^2)": ( fleet_res.deltaT_q / fleet_ini.deltaT_q  - 1 )*100,
+        "Temp. Rise (~I)": ( fleet_res.deltaT_l / fleet_ini.deltaT_l - 1 )*100,
+    }
+
+# Make calculation of operating (result) values for a whole fleet
+def calculate_fleet_operating_values(
+        fleet_ini: MotorFleet,
+        Pn_op: np.ndarray,
+        Un_op: np.ndarray,
+        Freq_op: np.ndarray,
+        ambientTemp_op: np.ndarray,
+        ambientMeter_op: np.ndarray,
+        connection_op: np.ndarray,
+        no_parallel_op: np.ndarray,
+        rotorChangeConnection: np.ndarray # "Do not change", "Y --> D", "D --> Y"
+    ) -> tuple[MotorFleet, dict[str, np.ndarray]]:
+    """
+    Vectorized calculate_operating_values(): Same stage sequence, applied as array operations. \n
+    Operating values may be scalars (same for every motor) or arrays (one value per motor) \n
+
+    Output: fleet: <MotorFleet> \n
+    ---> Fleet in the operating state \n
+
+    Output: result: <dict[str, np.ndarray]> \n
+    ---> Columns with the names of df_result ("Pn [kW]", ...), result_rotor_df ("Un Rotor [V]", ...) and change_df ("Pn", "B (~U/f)", ...)
+    """
+    fleet = fleet_ini.copy()
+
+    # Stage sequence of calculate_operating_values()
+    fleet.variate_connection(connection_op)
+    fleet.variate_number_of_parallel_circuits(no_parallel_op)
+    fleet.variate_ambient_temp(ambientTemp_op)
+    fleet.variate_freq_volt_konstMagnFlux(Freq_op)
+    fleet.variate_voltage(Un_op)
+    fleet.variate_power(Pn_op)
+    fleet.variate_ambient_height(ambientMeter_op)
+
+    # Recalculate In, Ma, Mk, Ia
+    fleet.In = fleet.get_In(fleet.Pn, fleet.cosphi, fleet.eta, fleet.Un)
+    fleet.refresh_abs_Ia_Ma_Mn(np.ones(len(fleet), dtype=bool))
+
+    # Calculate rotor parameters
+    has_rotor = fleet.rotorVoltage > 0
+    fleet.variate_connection_rotor(np.where(has_rotor, rotorChangeConnection, 'Do not change'))
+    fleet.variate_voltage_rotor(np.where(has_rotor, fleet_ini.Un, fleet.Un), fleet.Un)
+    fleet.rotorVoltage = np.where(has_rotor, fleet.rotorVoltage, 0)
+    fleet.rotorCurrent = np.zeros(len(fleet))
+    fleet.update_rotor_current(has_rotor)
+
+    result = {
+        "Pn [kW]": fleet.Pn,
+        "Un [V]": fleet.Un,
+        "Freq [Hz]": fleet.Freq,
+        "Ambient Temp. [°C]": fleet.ambientTemp,
+        "Height (m.a.s.l.) [m]": fleet.ambientMeter,
+        "Connection Y/D": fleet.connection,
+        "Parallel Branches (Stator)": fleet.no_parallel,
+        "Ia/In [%]": fleet.Ia,
+        "Ma/Mn [%]": fleet.Ma,
+        "Mk/Mn [%]": fleet.Mk,
+        "η [%]": fleet.eta,
+        "cos(φ)": fleet.cosphi,
+        "Nominal Speed [RPM]": fleet.n,
+        "Temp. Rise (~I^2) [K]": fleet.deltaT_q,
+        "Temp. Rise (~I) [K]": fleet.deltaT_l,
+        "Un Rotor [V]": fleet.rotorVoltage,
+        "In Rotor [A]": fleet.rotorCurrent,
+        "Rotor Connection": fleet.rotorConnection,
+    }
+    result.update(calculate_fleet_percentual_changes(fleet_ini, fleet))
+    return fleet, result
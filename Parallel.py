@@ -0,0 +1,148 @@
+import os
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Callable, Iterable, Iterator
+
+#####################################################################
+# Define the worker functions (must be importable by the worker processes)
+#####################################################################
+
+# Import the heavy libraries once per worker process
+def init_worker() -> None:
+    '''
+    Initializer of the worker processes: Import matplotlib (non interactive backend), pandas and the calculation modules once,
+    so that the tasks do not pay the import time
+    '''
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot
+    import pandas
+    import Functions
+    import Fleet
+
+# Apply a function to a list of items (one task of the pool)
+def run_items(function: Callable, items: list[tuple]) -> list:
+    '''
+    Return [List]: function(*item) for every item of the list
+    '''
+    return [function(*item) for item in items]
+
+# Calculate the operating values of one machine in a worker
+def calculate_operating_values_task(kwargs: dict, with_plot: bool = True, with_trace: bool = True, timer=None) -> tuple:
+    '''
+    Run calculate_operating_values(**kwargs) and return the figure as PNG bytes (the figure is closed)\n
+    timer: Optional Diagnostics.StageTimer, records the stages of the calculation and "PNG encoding"\n
+    Output: df_result, result_rotor_df, calc_str, calc_str_print (None if with_trace=False), png_bytes (None if with_plot=False), change_df
+    '''
+    import Functions
+    df_result, result_rotor_df, calc_str, calc_str_print, fig, change_df = Functions.calculate_operating_values(**kwargs, make_plot=with_plot, trace=with_trace, timer=timer)
+    with Functions.time_stage(timer, "PNG encoding"):
+        png_bytes = Functions.fig_to_png(fig) if fig is not None else None
+    return df_result, result_rotor_df, calc_str, calc_str_print, png_bytes, change_df
+
+# Sample the starting curves of the initial and the operating machine in a worker
+def sample_curves_task(kwargs: dict, curve_mode: str = 'numeric', no_points: int = 100, tolerance: float | None = None) -> dict:
+    '''
+    Same inputs as calculate_operating_values() (kwargs), without plotting and calculation text\n
+    tolerance: None = no_points evenly spaced speeds, else adaptive sampling with at most no_points speeds (get_start_curves())\n
+    Output: "initial" / "operating" --> {"label", "n [RPM]", "M [%]", "I [%]", "I branch [%]"} (lists, in % of the initial machine) | <dict>
+    '''
+    import Functions
+    machine = {name: kwargs[name] for name in ["Pn", "Un", "Freq", "n", "eta", "cosphi", "Ia", "Ma", "Mk", "connection", "deltaT", "ambientTemp", "ambientMeter", "no_parallel", "rotorVoltage"]}
+    operating = {name: kwargs[name] for name in ["Pn_op", "Un_op", "Freq_op", "ambientTemp_op", "ambientMeter_op", "connection_op", "no_parallel_op", "rotorChangeConnection"]}
+    motor_ini = Functions.MotorAsm(**machine, motor_label=kwargs["motor_label_ini"], trace=False, part_load=kwargs.get("part_load", ()))
+    state_op = Functions.get_operating_states(motor_ini.to_state(), **operating)[-1]
+    motors = [motor_ini, state_op.to_motor(motor_label=kwargs["motor_label_op"])]
+    curves = Functions.get_start_curves(motors, curve_mode=curve_mode, no_points=no_points, tolerance=tolerance)
+    return dict(zip(["initial", "operating"], Functions.start_curves_to_dict(motors, curves)))
+
+#####################################################################
+# Define the executor
+#####################################################################
+
+class ParallelExecutor:
+    '''
+    Distribute tasks across worker processes. Results are returned in input order.\n
+    - workers: Number of worker processes. None = all CPU cores, <=1 = deterministic serial execution in this process\n
+    - chunk_size: Number of items sent to a worker at once (reduces the inter process overhead for small tasks)\n
+    - max_pending: Number of chunks in flight per worker (bounds the memory of map())\n
+    - mp_context: Start method of the processes ('fork', 'spawn', 'forkserver'). None = platform default
+    '''
+    def __init__(self, workers: int | None = None, chunk_size: int = 1, max_pending: int = 2, mp_context: str | None = None):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.mp_context = mp_context
+        self.pool = None
+
+    def __enter__(self) -> 'ParallelExecutor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def is_serial(self) -> bool:
+        return self.workers <= 1
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        # Start the workers on first use, they are reused by later calls of map()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                mp_context=multiprocessing.get_context(self.mp_context),
+            )
+        return self.pool
+
+    def map(self, function: Callable, *iterables: Iterable) -> Iterator:
+        '''
+        Same as the built-in map(function, *iterables), executed by the worker processes\n
+        function must be a module level function (picklable). Results are yielded in input order
+        '''
+        return self.starmap(function, zip(*iterables))
+
+    def starmap(self, function: Callable, items: Iterable[tuple]) -> Iterator:
+        '''
+        Same as itertools.starmap(function, items), executed by the worker processes\n
+        items are consumed lazily: at most workers * max_pending chunks are in flight
+        '''
+        items = iter(items)
+        if self.is_serial():
+            for item in items:
+                yield function(*item)
+            return
+
+        pool = self.get_pool()
+        pending = deque()
+        chunks = iter(lambda: list(itertools.islice(items, self.chunk_size)), [])
+        for chunk in chunks:
+            pending.append(pool.submit(run_items, function, chunk))
+            if len(pending) >= self.workers * self.max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+#####################################################################
+# Define the parallel versions of the calculations
+#####################################################################
+
+# Calculate the operating values of a list of machines in parallel
+def calculate_operating_values_parallel(tasks: list[dict], workers: int | None = None, with_plot: bool = True, with_trace: bool = True, chunk_size: int = 1) -> list[tuple]:
+    '''
+    Inputs:\n
+    - tasks: List of keyword arguments of calculate_operating_values() (one dict per machine)\n
+    - workers: Number of worker processes (None = all CPU cores, <=1 = serial)\n
+    - with_plot: Generate the starting curves as PNG bytes\n
+    - with_trace: Render the calculation text (False: no trace records, for throughput runs)\n
+    Output: List of calculate_operating_values_task() results in the order of tasks
+    '''
+    with ParallelExecutor(workers=workers, chunk_size=chunk_size) as executor:
+        return list(executor.map(calculate_operating_values_task, tasks, itertools.repeat(with_plot), itertools.repeat(with_trace)))
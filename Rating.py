@@ -0,0 +1,132 @@
+import numpy as np
+
+from Fleet import MotorFleet, as_column, calculate_fleet_operating_values
+
+# Limits of the temperature rise [K] per thermal class (IEC 60034-1, resistance method, air cooled)
+insulation_class_limits = {"A": 60, "E": 75, "B": 80, "F": 105, "H": 125}
+
+#####################################################################
+# Define the inverse rating functions
+#####################################################################
+
+# Maximum power of every motor of a fleet for a temperature rise limit
+def get_max_power(
+        fleet_ini: MotorFleet,
+        Un_op: np.ndarray,
+        Freq_op: np.ndarray,
+        ambientTemp_op: np.ndarray,
+        ambientMeter_op: np.ndarray,
+        connection_op: np.ndarray,
+        no_parallel_op: np.ndarray,
+        deltaT_limit: np.ndarray | None = None,
+        method: str = 'closed'
+    ) -> dict[str, np.ndarray]:
+    """
+    Inverse of calculate_fleet_operating_values(): Highest Pn_op, for which the temperature rise stays below the limit \n
+    Operating values and limits may be scalars (same for every motor) or arrays (one value per motor) \n
+    - deltaT_limit: Allowed temperature rise [K] (e.g. insulation_class_limits["F"]). Default: temperature rise of the machine \n
+    - method: 'closed' (closed form of the stage relations) or 'bracket' (vectorized bisection of the forward calculation) \n
+      The closed form assumes In ~ Pn. Motors with part-load tables (η and cos(φ) depend on the power) are always bracketed \n
+
+    Output: <dict[str, np.ndarray]> \n
+    ---> "Pn max (~I^2) [kW]", "Pn max (~I) [kW]" (quadratic / linear temperature model) \n
+    """
+    operating = {
+        "Un_op": Un_op, "Freq_op": Freq_op, "ambientTemp_op": ambientTemp_op, "ambientMeter_op": ambientMeter_op,
+        "connection_op": connection_op, "no_parallel_op": no_parallel_op,
+    }
+    limit = fleet_ini.deltaT_q.copy() if deltaT_limit is None else as_column(deltaT_limit, len(fleet_ini))
+
+    if method == 'closed':
+        Pn_ref, deltaT_q, deltaT_l = get_reference_deltaT(fleet_ini, **operating)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = {
+                "Pn max (~I^2) [kW]": apply_power_window(Pn_ref, Pn_ref * np.sqrt(limit / deltaT_q)),
+                "Pn max (~I) [kW]": apply_power_window(Pn_ref, Pn_ref * limit / deltaT_l),
+            }
+
+        # Part-load tables: In ~ Pn / (η * cos(φ)) with η and cos(φ) of the table at Pn_op --> forward calculation
+        tables = fleet_ini.part_load
+        has_tables = (np.ptp(tables[:, :, 1], axis=1) > 0) | (np.ptp(tables[:, :, 2], axis=1) > 0) if tables.shape[1] > 0 else np.zeros(len(fleet_ini), dtype=bool)
+        if np.any(has_tables):
+            for name, quantity in [("Pn max (~I^2) [kW]", "Temp. Rise (~I^2) [K]"), ("Pn max (~I) [kW]", "Temp. Rise (~I) [K]")]:
+                result[name] = np.where(has_tables, bracket_max_power(fleet_ini, operating, limit, quantity), result[name])
+        return result
+    elif method == 'bracket':
+        return {
+            "Pn max (~I^2) [kW]": bracket_max_power(fleet_ini, operating, limit, "Temp. Rise (~I^2) [K]"),
+            "Pn max (~I) [kW]": bracket_max_power(fleet_ini, operating, limit, "Temp. Rise (~I) [K]"),
+        }
+    raise ValueError(f"ERROR: Function: get_max_power() --> Wrong method: {method}. Expected: 'closed', 'bracket'")
+
+# Temperature rise in the operating state before the power is changed
+def get_reference_deltaT(
+        fleet_ini: MotorFleet,
+        Un_op: np.ndarray,
+        Freq_op: np.ndarray,
+        ambientTemp_op: np.ndarray,
+        ambientMeter_op: np.ndarray,
+        connection_op: np.ndarray,
+        no_parallel_op: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    *** Return [np.ndarray, np.ndarray, np.ndarray]: Pn_ref, deltaT_q, deltaT_l *** \n
+    Apply all stages of calculate_fleet_operating_values() apart from variate_power(). \n
+    Without part-load tables variate_power() scales the temperature rise by (Pn_op/Pn_ref)^2 or Pn_op/Pn_ref (In ~ Pn, η and cos(φ) constant)
+    and variate_ambient_height() by a factor, which does not depend on the power. So the temperature rise at Pn_op is deltaT * (Pn_op/Pn_ref)^2 or deltaT * Pn_op/Pn_ref.
+    With part-load tables In depends on η and cos(φ) at Pn_op as well, this relation does not hold (get_max_power() brackets these motors)
+    """
+    fleet = fleet_ini.copy()
+    fleet.variate_connection(connection_op)
+    fleet.variate_number_of_parallel_circuits(no_parallel_op)
+    fleet.variate_ambient_temp(ambientTemp_op)
+    fleet.variate_freq_volt_konstMagnFlux(Freq_op)
+    fleet.variate_voltage(Un_op)
+    fleet.variate_ambient_height(ambientMeter_op)
+    return fleet.Pn, fleet.deltaT_q, fleet.deltaT_l
+
+# Consider the window, in which variate_power() leaves the motor unchanged
+def apply_power_window(Pn_ref: np.ndarray, Pn_max: np.ndarray) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: Highest power of the forward calculation *** \n
+    variate_power() is skipped for round(Pn_op) == round(Pn_ref), the temperature rise stays at its reference value in this window. \n
+    - Reference within the limit (Pn_max >= Pn_ref): the whole window is permissible --> at least the upper edge \n
+    - Reference above the limit: the whole window is not permissible --> at most the lower edge
+    """
+    Pn_round = np.round(Pn_ref)
+    return np.where(Pn_max >= Pn_ref, np.maximum(Pn_max, Pn_round + 0.5), np.minimum(Pn_max, Pn_round - 0.5))
+
+# Vectorized bisection of the forward calculation
+def bracket_max_power(fleet_ini: MotorFleet, operating: dict, limit: np.ndarray, quantity: str, rtol: float = 1e-10, max_iter: int = 200) -> np.ndarray:
+    '''
+    Return [np.ndarray]: Highest Pn_op with calculate_fleet_operating_values()[quantity] <= limit (NaN if no bracket was found)\n
+    The temperature rise increases with Pn_op. The upper bound is doubled until it exceeds the limit, then all motors are bisected at once
+    '''
+    fleet_ini = fleet_ini.copy()
+    fleet_ini.rotorVoltage = np.zeros(len(fleet_ini)) # The rotor does not afect the temperature rise
+
+    def get_deltaT(Pn_op: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            _, result = calculate_fleet_operating_values(fleet_ini, Pn_op=Pn_op, **operating, rotorChangeConnection='Do not change')
+        return result[quantity]
+
+    # Bracket: deltaT(low) <= limit < deltaT(high)
+    low = np.zeros(len(fleet_ini))
+    high = fleet_ini.Pn.copy()
+    for _ in range(64):
+        above = get_deltaT(high) > limit
+        if np.all(above | ~np.isfinite(high)):
+            break
+        low = np.where(above, low, high)
+        high = np.where(above, high, 2 * high)
+    found = get_deltaT(high) > limit
+
+    # Bisection
+    for _ in range(max_iter):
+        if np.all((high - low) <= rtol * high):
+            break
+        middle = (low + high) / 2
+        above = get_deltaT(middle) > limit
+        high = np.where(above, middle, high)
+        low = np.where(above, low, middle)
+    return np.where(found, low, np.nan)
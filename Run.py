@@ -1,5 +1,6 @@
 import subprocess
 import os
+import sys
 
 def run_streamlit():
     # Recieve route of the script
@@ -9,4 +10,13 @@ def run_streamlit():
     subprocess.run(["streamlit", "run", script_path])
 
 if __name__ == "__main__":
-    run_streamlit()
\ No newline at end of file
+    # Headless batch calculation: python Run.py batch <input> <output> [--errors <file>] [--chunk-size <rows>]
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from Batch import main
+        main(sys.argv[2:])
+    # Motor catalogue: python Run.py catalogue build <input> <dir> | python Run.py catalogue query <dir> --pn <kW> --un <V> [...]
+    elif len(sys.argv) > 1 and sys.argv[1] == "catalogue":
+        from Catalogue import main
+        main(sys.argv[2:])
+    else:
+        run_streamlit()
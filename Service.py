@@ -0,0 +1,455 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from Parallel import init_worker, calculate_operating_values_task, sample_curves_task
+from Cache import ResultCache, get_cache_key, get_calculation_kwargs, calculation_arguments
+from Fleet import MotorFleet, calculate_fleet_operating_values
+from Sweep import operating_defaults
+from Batch import machine_columns, operating_columns, operating_prefix, rotor_voltage_column, rotor_connection_column, format_chunk
+from Validation import extract_numeric_column
+
+# Allowed values of "rotorChangeConnection" (same as the streamlit radio buttons)
+rotor_connection_changes = ["Do not change", "Y --> D", "D --> Y"]
+
+# Reason phrases of the used HTTP status codes
+http_reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 422: "Unprocessable Entity", 503: "Service Unavailable"}
+
+#####################################################################
+# Define the worker functions (must be importable by the worker processes)
+#####################################################################
+
+# Apply a function to a batch of requests, errors are returned per request
+def run_requests(function: Callable, items: list[tuple]) -> list[tuple[bool, Any]]:
+    '''
+    Return [List]: (True, function(*item)) or (False, error text) for every item of the batch
+    '''
+    results = []
+    for item in items:
+        try:
+            results.append((True, function(*item)))
+        except (Exception, SystemExit) as error: # SystemExit: Core exits on some wrong inputs, which must not stop the worker or the event loop
+            results.append((False, f"{type(error).__name__}: {error}"))
+    return results
+
+# Validate the calculation arguments of a request
+def validate_calculation_request(request: dict) -> tuple[dict, str]:
+    '''
+    Same rules as the streamlit tables and the batch files (Batch.format_chunk())\n
+    Output:\n
+    - kwargs: Machine, operating and slip ring arguments converted to the validated values: float or 'Y'/'D' | <dict>\n
+    - error_txt: "Wrong Machine Inputs: Pn [kW] | Wrong Operating Inputs: Connection Y/D" ('' if all values are valid) | <str>
+    '''
+    chunk = pd.DataFrame({name: [request[arg]] for name, arg in machine_columns.items()})
+    for name, arg in operating_columns.items():
+        chunk[operating_prefix + name] = [request[arg]]
+    machine, operating, _, error_txt = format_chunk(chunk)
+    kwargs = {arg: values[0].item() for arg, values in (machine | operating).items()}
+
+    # Slip ring values
+    kwargs["rotorVoltage"] = extract_numeric_column(pd.Series([request["rotorVoltage"]])).iloc[0]
+    kwargs["rotorChangeConnection"] = request["rotorChangeConnection"]
+    wrong_rotor = [name for name, wrong in [(rotor_voltage_column, np.isnan(kwargs["rotorVoltage"])),
+                                            (rotor_connection_column, kwargs["rotorChangeConnection"] not in rotor_connection_changes)] if wrong]
+    error_txt = error_txt[0]
+    if len(wrong_rotor) > 0:
+        error_txt += (' | ' if error_txt != '' else '') + 'Wrong Slip Ring Inputs: ' + ', '.join(wrong_rotor)
+    return kwargs, error_txt
+
+# Vectorized calculation of the operating values (closed form, no plot and no text)
+def calculate_fleet_task(machine: dict, operating: dict) -> dict[str, list]:
+    '''
+    Return [dict[str, list]]: Columns of calculate_fleet_operating_values() for the MotorFleet arguments machine and the operating arguments\n
+    Missing operating arguments are taken from the machine (Sweep.operating_defaults)
+    '''
+    machine = dict(machine)
+    machine.setdefault("rotorVoltage", 0)
+    fleet_ini = MotorFleet(**machine)
+    operating = dict(operating)
+    operating.setdefault("rotorChangeConnection", 'Do not change')
+    for arg, machine_arg in operating_defaults.items():
+        operating.setdefault(arg, getattr(fleet_ini, machine_arg))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _, result = calculate_fleet_operating_values(fleet_ini, **operating)
+    return {name: np.where(np.isfinite(values), values, None).tolist() if values.dtype.kind == 'f' else values.tolist() for name, values in result.items()} # Not finite --> null
+
+
+#####################################################################
+# Define the service
+#####################################################################
+
+class ServiceBusy(Exception):
+    '''
+    The request queue of the service is full (answered with 503)
+    '''
+
+class CalculationService:
+    '''
+    HTTP/JSON service (asyncio) for the calculations of the streamlit app:\n
+    - GET /health: Status, queue length, request counters and cache statistics\n
+    - POST /calculate: calculate_operating_values() (JSON: the 25 arguments, optional "with_text") --> result, rotor, changes (and calculation text)\n
+    - POST /plot: Same arguments --> starting curves as PNG (shares the cache entry with /calculate)\n
+    - POST /curves: Same arguments (optional "curve_mode", "no_points", "tolerance": adaptive sampling, null = evenly spaced) --> sampled starting curves\n
+    - POST /operating: Closed form calculation of many machines (JSON: "machine", "operating" with MotorFleet arguments as scalars or lists)\n
+    The CPU work runs in a bounded worker pool. Requests are queued (max_queue, 503 if full) and sent to the workers in batches
+    (up to batch_size requests collected for batch_window seconds). Equal calculations in flight are done once
+    '''
+    def __init__(self,
+                 workers: int | None = None,      # Number of worker processes. None = all CPU cores, <=1 = one worker thread
+                 max_queue: int = 256,            # Requests waiting for a worker, before 503 is answered
+                 batch_size: int = 16,            # Requests sent to a worker at once
+                 batch_window: float = 0.002,     # Time [s] to collect a batch
+                 max_pending: int = 2,            # Batches in flight per worker
+                 inline_rows: int = 16,           # /operating requests up to this size are calculated in the event loop (< 1 ms, same as the queue round trip)
+                 max_body: int = 16 * 1024**2,    # Max. size of a request body [bytes]
+                 cache: ResultCache | None = None
+                 ):
+        self.workers = os.cpu_count() if workers is None else workers
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.inline_rows = inline_rows
+        self.max_body = max_body
+        self.cache = ResultCache() if cache is None else cache
+        self.requests = {}   # path --> number of requests
+        self.rejected = 0    # Requests answered with 503
+        self.batches = 0     # Batches sent to the workers
+        self.pool = None
+        self.queue = None
+        self.slots = None
+        self.in_flight = {}  # cache key --> future of the calculation
+        self.batch_tasks = set() # Running run_batch() tasks (the event loop keeps only weak references)
+        self.server = None
+        self.dispatcher = None
+
+    def get_pool(self) -> Executor:
+        if self.pool is None:
+            if self.workers <= 1:
+                self.pool = ThreadPoolExecutor(max_workers=1)
+            else:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, mp_context=multiprocessing.get_context())
+        return self.pool
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        '''
+        Start the worker pool, the batch dispatcher and the server (port=0: free port, see self.port)
+        '''
+        self.get_pool()
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.slots = asyncio.Semaphore(max(self.workers, 1) * self.max_pending)
+        self.dispatcher = asyncio.create_task(self.dispatch_batches())
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    # Queue a request for the worker pool
+    def submit(self, function: Callable, args: tuple) -> asyncio.Future:
+        '''
+        Return [asyncio.Future]: Result of function(*args). Raise ServiceBusy if the queue is full
+        '''
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((function, args, future))
+        except asyncio.QueueFull:
+            raise ServiceBusy()
+        return future
+
+    # Collect the queued requests into batches and send them to the workers
+    async def dispatch_batches(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            if self.queue.empty() and self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            # One batch per function (run_requests() applies a single function)
+            groups = {}
+            for function, args, future in batch:
+                groups.setdefault(function, []).append((args, future))
+            for function, items in groups.items():
+                await self.slots.acquire() # Backpressure: wait for a free worker, meanwhile the queue fills up
+                task = asyncio.create_task(self.run_batch(function, items))
+                self.batch_tasks.add(task)
+                task.add_done_callback(self.batch_tasks.discard)
+
+    async def run_batch(self, function: Callable, items: list[tuple]) -> None:
+        self.batches += 1
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.get_pool(), run_requests, function, [args for args, _ in items])
+        except Exception as error:
+            results = [(False, f"{type(error).__name__}: {error}")] * len(items)
+        finally:
+            self.slots.release()
+        for (_, future), (ok, value) in zip(items, results):
+            if not future.done():
+                future.set_result((ok, value))
+
+    # Calculate (or get from the cache) the result of calculate_operating_values()
+    async def get_calculation(self, kwargs: dict) -> tuple:
+        '''
+        Return [Tuple]: calculate_operating_values_task() result (raise ValueError with the error text of the calculation)
+        '''
+        key = get_cache_key(kwargs)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        if key not in self.in_flight:
+            self.in_flight[key] = self.submit(calculate_operating_values_task, (get_calculation_kwargs(kwargs),))
+            try:
+                ok, result = await self.in_flight[key]
+            finally:
+                del self.in_flight[key]
+            if ok:
+                self.cache.put(key, result)
+        else:
+            ok, result = await asyncio.shield(self.in_flight[key])
+        if not ok:
+            raise ValueError(result)
+        return result
+
+    # Route a request to its endpoint
+    async def route(self, method: str, path: str, body: bytes) -> tuple[int, str, bytes]:
+        '''
+        Return [Int, Str, Bytes]: HTTP status, content type, response body
+        '''
+        self.requests[path] = self.requests.get(path, 0) + 1
+        routes = {"/health": "GET", "/calculate": "POST", "/plot": "POST", "/curves": "POST", "/operating": "POST"}
+        if path not in routes:
+            return json_response(404, {"error": f"Unknown endpoint {path}. Expected: {list(routes)}"})
+        if method != routes[path]:
+            return json_response(405, {"error": f"{path} expects {routes[path]}"})
+        if path == "/health":
+            return json_response(200, self.health())
+
+        try:
+            request = json.loads(body or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError("Expected a JSON object")
+        except ValueError as error:
+            return json_response(400, {"error": f"Invalid JSON: {error}"})
+        if path in ["/calculate", "/plot", "/curves"]:
+            missing = [name for name in calculation_arguments if name not in request]
+            if missing:
+                return json_response(400, {"error": f"Missing arguments: {missing}"})
+
+            # Validated values before the cache key: equal inputs share the entry, wrong inputs never reach the workers
+            kwargs, error_txt = validate_calculation_request(request)
+            if error_txt != '':
+                return json_response(422, {"error": error_txt})
+            request = request | kwargs
+        elif path == "/operating":
+            if not isinstance(request.get("machine", {}), dict) or not isinstance(request.get("operating", {}), dict):
+                return json_response(400, {"error": "\"machine\" and \"operating\" must be JSON objects"})
+
+        try:
+            if path == "/calculate":
+                df_result, result_rotor_df, calc_str, _, _, change_df = await self.get_calculation(request)
+                response = {
+                    "result": dict(zip(df_result["Name"], df_result["Value"])),
+                    "rotor": dict(zip(result_rotor_df["Name"], result_rotor_df["Value"])),
+                    "changes": dict(zip(change_df["Variable"], change_df["Change"])),
+                }
+                if request.get("with_text", False):
+                    response["calculation"] = calc_str
+                return json_response(200, response)
+            elif path == "/plot":
+                png_bytes = (await self.get_calculation(request))[4]
+                return 200, "image/png", png_bytes
+            elif path == "/curves":
+                tolerance = request.get("tolerance", 0.002)
+                args = (get_calculation_kwargs(request), request.get("curve_mode", 'numeric'), int(request.get("no_points", 100)),
+                        None if tolerance is None else float(tolerance))
+                ok, result = await self.submit(sample_curves_task, args)
+            else:
+                machine, operating = request.get("machine", {}), request.get("operating", {})
+                if max((np.size(value) for value in machine.values()), default=0) <= self.inline_rows:
+                    ok, result = run_requests(calculate_fleet_task, [(machine, operating)])[0]
+                else:
+                    ok, result = await self.submit(calculate_fleet_task, (machine, operating))
+            if not ok:
+                raise ValueError(result)
+            return json_response(200, result)
+        except ServiceBusy:
+            self.rejected += 1
+            return json_response(503, {"error": "Queue is full, retry later"})
+        except (ValueError, TypeError, KeyError) as error:
+            return json_response(422, {"error": str(error)})
+
+    def health(self) -> dict:
+        '''
+        Return [Dict]: Status of the service
+        '''
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queue": self.queue.qsize(),
+            "max_queue": self.max_queue,
+            "in_flight": len(self.in_flight),
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "requests": self.requests,
+            "cache": self.cache.stats(),
+        }
+
+    # Read the requests of a connection (HTTP/1.1 with keep-alive) and answer them in order
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > self.max_body:
+                    writer.write(encode_response(*json_response(413, {"error": f"Body larger than {self.max_body} bytes"}), keep_alive=False))
+                    break
+                body = await reader.readexactly(length) if length > 0 else b''
+                status, content_type, payload = await self.route(method, path.split('?')[0], body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                writer.write(encode_response(status, content_type, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+#####################################################################
+# Define the functions that are not part of the service class
+#####################################################################
+
+# Convert numpy values for json.dumps()
+def to_json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# Build a JSON response
+def json_response(status: int, content: Any) -> tuple[int, str, bytes]:
+    '''
+    Return [Int, Str, Bytes]: HTTP status, content type, JSON body
+    '''
+    return status, "application/json", json.dumps(content, default=to_json_value).encode('utf-8')
+
+# Encode the HTTP response
+def encode_response(status: int, content_type: str, payload: bytes, keep_alive: bool = True) -> bytes:
+    header = (
+        f"HTTP/1.1 {status} {http_reasons.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+    )
+    if status == 503:
+        header += "Retry-After: 1\r\n"
+    return (header + "\r\n").encode('latin-1') + payload
+
+# Run the service until it is interrupted
+async def serve(host: str, port: int, **kwargs: Any) -> None:
+    service = CalculationService(**kwargs)
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{service.port} (workers: {service.workers})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+# Send one HTTP request to the service
+async def send_request(port: int, method: str, path: str, content: Any = None, host: str = '127.0.0.1') -> tuple[int, bytes]:
+    '''
+    Return [Int, Bytes]: HTTP status and response body (content is sent as JSON)
+    '''
+    body = b'' if content is None else json.dumps(content).encode('utf-8')
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    header, _, payload = response.partition(b'\r\n\r\n')
+    return int(header.split()[1]), payload
+
+# Check the service on localhost
+async def check_service() -> bool:
+    '''
+    Start the service on a free port and check /health, /calculate (valid and equal input as text), /operating and wrong inputs (400/422, the service keeps running)\n
+    Return [Bool]: True if every response has the expected status
+    '''
+    request = {"Pn": 100.0, "Un": 400.0, "Freq": 50.0, "ambientTemp": 40.0, "ambientMeter": 1000.0, "connection": "Y", "no_parallel": 1, "Ia": 600.0, "Ma": 200.0,
+               "Mk": 250.0, "eta": 95.0, "cosphi": 0.85, "n": 1480.0, "deltaT": 80.0, "rotorVoltage": 0, "rotorChangeConnection": "Do not change",
+               "motor_label_ini": "Machine", "Pn_op": 110.0, "Un_op": 440.0, "Freq_op": 60.0, "ambientTemp_op": 45.0, "ambientMeter_op": 1500.0,
+               "connection_op": "D", "no_parallel_op": 2, "motor_label_op": "Operating"}
+    checks = [
+        ("GET", "/health", None, 200),
+        ("POST", "/calculate", dict(request, Pn="75"), 200),
+        ("POST", "/calculate", dict(request, connection_op="X"), 422),
+        ("POST", "/calculate", dict(request, eta="abc", rotorChangeConnection="Y"), 422),
+        ("POST", "/calculate", request, 200),
+        ("POST", "/curves", dict(request, connection_op="X"), 422),
+        ("POST", "/operating", {"machine": [1, 2], "operating": {}}, 400),
+        ("POST", "/operating", {"machine": {name: request[name] for name in ["Pn", "Un", "Freq", "n", "eta", "cosphi", "Ia", "Ma", "Mk", "connection", "deltaT",
+                                                                          "ambientTemp", "ambientMeter", "no_parallel"]}, "operating": {"Un_op": 440}}, 200),
+        ("GET", "/health", None, 200),
+    ]
+    service = CalculationService(workers=1)
+    await service.start(port=0)
+    passed = True
+    try:
+        for method, path, content, expected in checks:
+            status, payload = await send_request(service.port, method, path, content)
+            ok = status == expected
+            passed &= ok
+            print(f"{method} {path}: {status} (expected {expected}) | {'OK' if ok else 'FAILED'} | {payload[:120].decode('utf-8', 'replace')}")
+    finally:
+        await service.close()
+    return passed
+
+# Command line entry point
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="HTTP/JSON calculation service (localhost)")
+    parser.add_argument("--host", default='127.0.0.1', help="Host address")
+    parser.add_argument("--port", type=int, default=8765, help="Port")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes (0 = all CPU cores, 1 = one worker thread)")
+    parser.add_argument("--max-queue", type=int, default=256, help="Queued requests before 503 is answered")
+    parser.add_argument("--batch-size", type=int, default=16, help="Requests sent to a worker at once")
+    parser.add_argument("--cache-dir", default=None, help="Directory of the disk tier of the result cache")
+    parser.add_argument("--check", action="store_true", help="Check the endpoints on a free localhost port and exit (non-zero on failure)")
+    args = parser.parse_args(argv)
+    if args.check:
+        sys.exit(0 if asyncio.run(check_service()) else 1)
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers or None, max_queue=args.max_queue, batch_size=args.batch_size, cache=ResultCache(disk_dir=args.cache_dir)))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import math
+import numpy as np
+
+from Fleet import MotorFleet, as_column, as_rows, get_fleet_n_synchrone
+
+# Load type --> exponent of the load torque: M_load(n) = M_0 + (M_L - M_0) * (n / n_nominal)^exponent
+load_exponents = {"constant": 0, "linear": 1, "quadratic": 2}
+
+# Results of simulate_start() with one value per motor (the profiles have the shape (len(fleet), no_points))
+start_quantities = [
+    "Starts",
+    "Operating Speed [RPM]",
+    "Run-up Time [s]",
+    "I²t [A²s]",
+    "I²t (per branch) [A²s]",
+    "Equivalent Time at In [s]",
+    "Rotor Heat [kJ]",
+]
+
+#####################################################################
+# Define the start-up functions
+#####################################################################
+
+# Simulate the run-up of every motor of a fleet against its load
+def simulate_start(
+        fleet: MotorFleet,
+        J: np.ndarray,
+        M_load: np.ndarray,
+        load_type: np.ndarray = 'quadratic',
+        M_breakaway: np.ndarray = 0,
+        no_points: int = 200,
+        end_ratio: float = 0.98,
+        curve_mode: str = 'numeric'
+    ) -> dict[str, np.ndarray]:
+    """
+    Run-up of the motors from standstill: J * dω/dt = M_motor(n) - M_load(n), with the M(n) and I(n) curves of MotorFleet.get_M_n_curve() / get_I_n_curve() \n
+    The equation is integrated over the speed (dt = J * 2π/60 / (M_motor - M_load) * dn) on no_points speeds per motor, all motors at once. \n
+    Inputs may be scalars (same for every motor) or arrays (one value per motor): \n
+    - J: Total inertia of motor and load [kgm²] \n
+    - M_load: Load torque at the nominal speed of the motor [Nm] \n
+    - load_type: 'constant', 'linear' or 'quadratic' (fan) \n
+    - M_breakaway: Load torque at standstill [Nm] (not used by 'constant') \n
+    - end_ratio: The run-up ends at end_ratio * operating speed (the acceleration vanishes at the operating speed) \n
+    - curve_mode: 'numeric' (Kloss-like curves) or 'circuit' (equivalent circuit fitted to the nameplate, Circuit.estimate_equivalent_circuit()) \n
+
+    Output: <dict[str, np.ndarray]> \n
+    ---> start_quantities: "Starts" is False if the motor torque does not exceed the load torque up to the end of the run-up (times and heat are inf) \n
+    ---> Profiles: "n [RPM]", "t [s]", "I [A]", "M motor [Nm]", "M load [Nm]" with the shape (len(fleet), no_points)
+    """
+    size = len(fleet)
+    J = as_column(J, size)
+    M_load = as_column(M_load, size)
+    M_breakaway = as_column(M_breakaway, size)
+    load_type = np.broadcast_to(np.asarray(load_type, dtype=str), (size,))
+    unknown = set(np.unique(load_type)) - set(load_exponents)
+    if unknown:
+        raise ValueError(f"ERROR: Function: simulate_start() --> Wrong load type: {sorted(unknown)}. Expected: {list(load_exponents)}")
+    exponent = np.select([load_type == name for name in load_exponents], list(load_exponents.values()))
+    M_breakaway = np.where(exponent == 0, M_load, M_breakaway)
+
+    circuit = None
+    if curve_mode == 'circuit':
+        from Circuit import estimate_equivalent_circuit
+        circuit = estimate_equivalent_circuit(fleet)
+    M_func = fleet.get_M_n_curve(curve_mode=curve_mode, circuit=circuit)
+    I_func = fleet.get_I_n_curve(curve_mode=curve_mode, circuit=circuit)
+    I_func_branch = fleet.get_I_n_curve(Ia_type='branch', curve_mode=curve_mode, circuit=circuit)
+    n_nominal = fleet.n
+
+    def get_M_load(x: np.ndarray) -> np.ndarray:
+        M_0, M_L, k, n_N = (as_rows(values, np.ndim(x)) for values in (M_breakaway, M_load, exponent, n_nominal))
+        return M_0 + (M_L - M_0) * (x / n_N)**k
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n_operating = get_operating_speed(fleet, M_func, get_M_load)
+
+        # Speed grid from standstill to the end of the run-up (denser towards the end, where the acceleration decreases)
+        n_end = end_ratio * n_operating
+        u = np.linspace(0, 1, no_points)
+        n_vals = 0.1 + (as_rows(n_end, 2) - 0.1) * (1 - (1 - u)**2)
+        M_vals = M_func(n_vals)
+        M_load_vals = get_M_load(n_vals)
+        M_acc = M_vals - M_load_vals
+        starts = np.all(M_acc > 0, axis=1) & np.isfinite(n_operating)
+
+        # Time: t(n) = ∫ J * 2π/60 / M_acc dn
+        dt_dn = as_rows(J, 2) * 2 * math.pi / 60 / M_acc
+        t_vals = np.concatenate([np.zeros((size, 1)), np.cumsum((dt_dn[:, 1:] + dt_dn[:, :-1]) / 2 * np.diff(n_vals, axis=1), axis=1)], axis=1)
+        t_vals = np.where(as_rows(starts, 2), t_vals, np.inf)
+
+        # Heat: ∫ I² dt and rotor losses ∫ M * ω_sync * s dt = ∫ M * 2π/60 * (n_sync - n) dt
+        I_vals = I_func(n_vals)
+        I_vals_branch = I_func_branch(n_vals)
+        I2t = integrate_over_time(I_vals**2, t_vals)
+        I2t_branch = integrate_over_time(I_vals_branch**2, t_vals)
+        n_sync = get_fleet_n_synchrone(fleet.n, fleet.Freq)
+        rotor_heat = integrate_over_time(M_vals * 2 * math.pi / 60 * (as_rows(n_sync, 2) - n_vals), t_vals) / 1000
+
+    return {
+        "Starts": starts,
+        "Operating Speed [RPM]": n_operating,
+        "Run-up Time [s]": np.where(starts, t_vals[:, -1], np.inf),
+        "I²t [A²s]": np.where(starts, I2t, np.inf),
+        "I²t (per branch) [A²s]": np.where(starts, I2t_branch, np.inf),
+        "Equivalent Time at In [s]": np.where(starts, I2t / fleet.In**2, np.inf),
+        "Rotor Heat [kJ]": np.where(starts, rotor_heat, np.inf),
+        "n [RPM]": n_vals,
+        "t [s]": t_vals,
+        "I [A]": I_vals,
+        "M motor [Nm]": M_vals,
+        "M load [Nm]": M_load_vals,
+    }
+
+# Stable operating point of motor and load
+def get_operating_speed(fleet: MotorFleet, M_func, get_M_load, max_iter: int = 60) -> np.ndarray:
+    '''
+    Return [np.ndarray]: Speed [RPM] between the maximum torque and the synchrone speed, where the motor torque equals the load torque\n
+    The motor torque decreases in this range and the load torque does not, so all motors are bisected at once. NaN if the load exceeds the maximum torque.
+    The speed of the maximum torque is taken from a coarse sampling of M_func, so that any curve mode can be used
+    '''
+    n_sync = get_fleet_n_synchrone(fleet.n, fleet.Freq)
+    n_grid = as_rows(n_sync, 2) * np.linspace(0, 0.9999, 256)
+    low = np.take_along_axis(n_grid, np.argmax(np.nan_to_num(M_func(n_grid), nan=-np.inf), axis=1)[:, None], axis=1)[:, 0]
+    high = n_sync.copy()
+    valid = M_func(low) > get_M_load(low)
+    for _ in range(max_iter):
+        middle = (low + high) / 2
+        above = M_func(middle) > get_M_load(middle)
+        low = np.where(above, middle, low)
+        high = np.where(above, high, middle)
+    return np.where(valid, low, np.nan)
+
+# Integrate sampled values over time
+def integrate_over_time(values: np.ndarray, t_vals: np.ndarray) -> np.ndarray:
+    '''
+    Return [np.ndarray]: Trapezoidal integral of every row of values over the row of t_vals
+    '''
+    return np.sum((values[:, 1:] + values[:, :-1]) / 2 * np.diff(t_vals, axis=1), axis=1)
@@ -0,0 +1,98 @@
+import numpy as np
+
+from Fleet import MotorFleet, calculate_fleet_operating_values
+
+#####################################################################
+# Define the sweep layout
+#####################################################################
+
+# Operating arguments, which can be swept: calculate_fleet_operating_values argument --> axis label
+sweep_axes = {
+    "Un_op": "Un [V]",
+    "Freq_op": "Freq [Hz]",
+    "Pn_op": "Pn [kW]",
+    "ambientTemp_op": "Ambient Temp. [°C]",
+    "ambientMeter_op": "Height (m.a.s.l.) [m]",
+    "no_parallel_op": "Parallel Branches (Stator)",
+}
+
+# Operating argument --> MotorFleet argument of the machine (used if an operating value is not given)
+operating_defaults = {
+    "Pn_op": "Pn",
+    "Un_op": "Un",
+    "Freq_op": "Freq",
+    "ambientTemp_op": "ambientTemp",
+    "ambientMeter_op": "ambientMeter",
+    "connection_op": "connection",
+    "no_parallel_op": "no_parallel",
+}
+
+# Results of a sweep (one array per quantity, shape of the grid)
+sweep_quantities = [
+    "Temp. Rise (~I^2) [K]",
+    "Temp. Rise (~I) [K]",
+    "In (per branch) [A]",
+    "Un (per branch) [V]",
+    "Pn", "B (~U/f)", "Un (per branch)", "In (per branch)", "Temp. Rise (~I^2)", "Temp. Rise (~I)", # Percentual changes [%]
+]
+
+
+#####################################################################
+# Define the sweep functions
+#####################################################################
+
+# Evaluate the operating values over a grid of operating points
+def sweep_operating_values(machine: dict, axes: dict[str, np.ndarray], operating: dict | None = None, chunk_size: int = 250000) -> dict[str, np.ndarray]:
+    '''
+    Same physics as calculate_operating_values() (vectorized by MotorFleet) for every point of an N-dimensional grid\n
+    Inputs:\n
+    - machine: Scalar MotorFleet arguments of the machine (Pn, Un, Freq, n, eta, cosphi, Ia, Ma, Mk, connection, deltaT, ambientTemp, ambientMeter, no_parallel, optional part_load table)\n
+    - axes: Operating argument (key of sweep_axes) --> 1D values. The grid is the cartesian product in the given order\n
+    - operating: Scalar values of the operating arguments, which are not swept (default: machine value)\n
+    - chunk_size: Number of grid points evaluated at once (bounds the memory of large grids)\n
+    Output: Quantity (sweep_quantities) --> array with the shape (len(axis_1), len(axis_2), ...) | <dict[str, np.ndarray]>
+    '''
+    for arg in axes:
+        if arg not in sweep_axes:
+            raise ValueError(f"ERROR: Function: sweep_operating_values() --> Axis {arg} can not be swept. Expected: {list(sweep_axes)}")
+    axes = {arg: np.asarray(values, dtype=float).reshape(-1) for arg, values in axes.items()}
+    operating = dict(operating or {})
+    for arg, machine_arg in operating_defaults.items():
+        if arg not in axes and arg not in operating:
+            operating[arg] = machine[machine_arg]
+
+    shape = tuple(len(values) for values in axes.values())
+    size = int(np.prod(shape))
+    results = {name: np.empty(size) for name in sweep_quantities}
+
+    # Evaluate the flattened grid chunk by chunk (the grid itself is not materialized)
+    for start in range(0, size, chunk_size):
+        index = np.unravel_index(np.arange(start, min(start + chunk_size, size)), shape)
+        points = {arg: values[idx] for (arg, values), idx in zip(axes.items(), index)}
+        chunk = evaluate_operating_points(machine, dict(operating, **points), len(index[0]))
+        for name in sweep_quantities:
+            results[name][start:start + len(index[0])] = chunk[name]
+    return {name: values.reshape(shape) for name, values in results.items()}
+
+# Evaluate a list of operating points of one machine
+def evaluate_operating_points(machine: dict, operating: dict, size: int) -> dict[str, np.ndarray]:
+    '''
+    Return [dict[str, np.ndarray]]: sweep_quantities of size operating points (operating values: scalars or arrays of the given size)
+    '''
+    fleet_ini = MotorFleet(**dict(machine, Pn=np.full(size, float(machine["Pn"])), rotorVoltage=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fleet, result = calculate_fleet_operating_values(fleet_ini, **operating, rotorChangeConnection='Do not change')
+    result["In (per branch) [A]"], result["Un (per branch) [V]"] = fleet.get_branch_voltage_current()
+    return result
+
+# Default limit of a quantity (contour line of the heatmap)
+def get_quantity_limit(machine: dict, quantity: str) -> float:
+    '''
+    Return [Float]: Value of the quantity at the nameplate of the machine (temperature class limit, nominal branch current/voltage), 0 for percentual changes
+    '''
+    if quantity in ["Temp. Rise (~I^2) [K]", "Temp. Rise (~I) [K]"]:
+        return float(machine["deltaT"])
+    elif quantity in ["In (per branch) [A]", "Un (per branch) [V]"]:
+        I_branch, U_branch = MotorFleet(**machine, rotorVoltage=0).get_branch_voltage_current()
+        return float((I_branch if quantity == "In (per branch) [A]" else U_branch)[0])
+    return 0.0
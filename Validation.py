@@ -0,0 +1,123 @@
+from typing import Any
+import numpy as np
+import pandas as pd
+
+from Fleet import resolve_synchrone_speed
+
+#####################################################################
+# Define the validation rules of the input tables
+#####################################################################
+
+# Rules per input (names of the streamlit tables). Evaluated column-wise by validate_columns()
+# - "type": "numeric" (first number-like pattern, made absolute) or "enum" (upper case text)
+# - "values": Allowed values of an "enum"
+# - "min" / "max_exclusive": Plausible range of a "numeric" (min <= value < max_exclusive)
+# - "poles_freq_column": A pole number must be detectable from the value (speed) and the frequency of that column
+#   (optional "slip_range" and "poles" of resolve_synchrone_speed(), default: same as get_n_synchrone())
+# - "default": Value used if the column is missing (batch files)
+input_rules = {
+    "Pn [kW]": {"type": "numeric"},
+    "Un [V]": {"type": "numeric"},
+    "Freq [Hz]": {"type": "numeric", "default": "50"},
+    "Ambient Temp. [°C]": {"type": "numeric", "default": "40"},
+    "Height (m.a.s.l.) [m]": {"type": "numeric", "default": "1000"},
+    "Connection Y/D": {"type": "enum", "values": ["Y", "D"], "default": "Y"},
+    "Parallel Branches (Stator)": {"type": "numeric", "default": "1"},
+    "Ia/In [%]": {"type": "numeric"},
+    "Ma/Mn [%]": {"type": "numeric"},
+    "Mk/Mn [%]": {"type": "numeric"},
+    "η [%]": {"type": "numeric", "min": 1, "max_exclusive": 100},
+    "cos(φ)": {"type": "numeric", "min": 0.1, "max_exclusive": 0.99},
+    "Nominal Speed [RPM]": {"type": "numeric", "poles_freq_column": "Freq [Hz]"},
+    "Temp. Rise [K]": {"type": "numeric", "default": "80"},
+}
+
+
+#####################################################################
+# Define the validation functions
+#####################################################################
+
+# Vectorized version of extract_numeric()
+def extract_numeric_column(values: pd.Series) -> pd.Series:
+    """
+    *** Return [pd.Series]: Absolute float values (NaN if no numerical data was extracted) *** \n
+    Same pattern as extract_numeric(): commas are replaced by dots and the first number-like pattern is taken
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float).abs()
+    values = values.astype(str).str.replace(',', '.', regex=False)
+    return values.str.extract(r"([-+]?\d*\.?\d+)", expand=False).astype(float).abs()
+
+# Check if a pole number can be detected for the nominal speed (same slip range as get_n_synchrone())
+def is_pole_detectable(n: np.ndarray, freq: np.ndarray, slip_range: tuple[float, float] = (0, 0.1), poles: Any = range(2, 16, 2)) -> np.ndarray:
+    """
+    *** Return [np.ndarray]: True if get_n_synchrone() finds a pole number *** \n
+    """
+    return resolve_synchrone_speed(n, freq, slip_range, poles)["valid"]
+
+# Convert and validate all columns of a DataFrame (one row per machine)
+def validate_columns(df: pd.DataFrame, rules: dict = input_rules) -> tuple[dict[str, np.ndarray], pd.DataFrame]:
+    '''
+    Evaluate the rules column-wise over the whole DataFrame. Only columns with a rule are validated\n
+    Output:\n
+    - values: Converted column values: float (NaN if wrong) or upper case str | <dict[str, np.ndarray]>\n
+    - error_mask: True for every wrong cell (same index as df, one column per validated column) | <pd.DataFrame>
+    '''
+    values = {}
+    error_mask = pd.DataFrame(index=df.index)
+    for name, rule in rules.items():
+        if name not in df:
+            continue
+        if rule["type"] == "enum":
+            column = df[name].astype(str).str.strip().str.upper()
+            values[name] = column.to_numpy(dtype=str)
+            is_valid = column.isin(rule["values"]).to_numpy()
+        else:
+            values[name] = extract_numeric_column(df[name]).to_numpy()
+            is_valid = ~np.isnan(values[name])
+            if "min" in rule:
+                is_valid &= values[name] >= rule["min"]
+            if "max_exclusive" in rule:
+                is_valid &= values[name] < rule["max_exclusive"]
+        error_mask[name] = ~is_valid
+
+    # Checks depending on other columns
+    for name, rule in rules.items():
+        if name in values and "poles_freq_column" in rule:
+            freq = values.get(rule["poles_freq_column"], np.full(len(df), np.nan))
+            window = {key: rule[key] for key in ["slip_range", "poles"] if key in rule}
+            error_mask[name] |= ~is_pole_detectable(values[name], freq, **window)
+
+    # Wrong values are set to NaN
+    for name in values:
+        if rules[name]["type"] == "numeric":
+            values[name] = np.where(error_mask[name].to_numpy(), np.nan, values[name])
+    return values, error_mask
+
+# Build the error text of every row
+def get_error_text(error_mask: pd.DataFrame, table_txt: str) -> np.ndarray:
+    '''
+    Return [np.ndarray]: "Wrong <table_txt> Inputs: <name>, <name>" for rows with wrong cells, '' otherwise
+    '''
+    names_txt = np.full(len(error_mask), '', dtype=object)
+    for name in error_mask.columns:
+        names_txt = names_txt + np.where(error_mask[name].to_numpy(), name + ', ', '')
+    has_error = names_txt != ''
+    error_txt = np.full(len(error_mask), '', dtype=object)
+    error_txt[has_error] = f'Wrong {table_txt} Inputs: ' + names_txt[has_error]
+    return np.array([txt.removesuffix(', ') for txt in error_txt], dtype=object)
+
+# Validate a streamlit input table (rows: "Name", "Value")
+def validate_table(df: pd.DataFrame, rules: dict = input_rules) -> tuple[pd.DataFrame, list[str]]:
+    '''
+    Same rules as validate_columns() for a single machine in the format of the streamlit tables\n
+    Output:\n
+    - df: Copy of df with converted values: float, 'Y'/'D' or None for wrong/empty values | <pd.DataFrame>\n
+    - wrong_names: Names of the wrong values in table order | <list[str]>
+    '''
+    wide = pd.DataFrame([df['Value'].tolist()], columns=df['Name'].tolist())
+    values, error_mask = validate_columns(wide, rules)
+    df = df.copy()
+    df['Value'] = pd.Series([None if error_mask[name].iloc[0] else values[name][0].item() for name in df['Name']], index=df.index, dtype=object)
+    wrong_names = [name for name in df['Name'] if error_mask[name].iloc[0]]
+    return df, wrong_names